@@ -1,67 +1,266 @@
+import os
+import json
+import glob
+import shutil
+import hashlib
+import argparse
 import pandas as pd
 import numpy as np
 import streamlit as st
+from utils.ingestao import read_source_tables, print_read_report
+from utils.codificacao import encode_columns
+
+# Dataset particionado por mês de compra (estilo Hive: purchase_month=AAAA-MM)
+PARTITIONED_DIR = "olist_merged_data"
+MANIFEST_FILE = "_manifest.json"
+# Arquivos em gravação (dentro do dataset, mas ignorados na leitura) e arquivo de cada partição
+STAGING_DIR = "_staging"
+PARTITION_FILE = "part-0.parquet"
+
+# Filtrar dados até julho de 2018
+CUTOFF_DATE = '2018-08-01'
+
+# Linhas por row group: grupos pequenos permitem descartar períodos na leitura
+ROW_GROUP_SIZE = 10_000
+
+def read_olist_tables():
+    """Lê os datasets brutos do Olist com tipos declarados e em paralelo."""
+    tables, stats = read_source_tables()
+    print_read_report(stats)
+
+    # Filtrar pedidos pela data de corte
+    orders = tables["orders"]
+    tables["orders"] = orders[orders['order_purchase_timestamp'] < pd.to_datetime(CUTOFF_DATE)]
+
+    return tables
+
+def merge_olist_tables(tables, orders=None):
+    """Junta as tabelas do Olist a partir dos pedidos informados (padrão: todos)."""
+    if orders is None:
+        orders = tables["orders"]
 
-@st.cache_data  
-def load_and_merge_olist_data():
-    # Carregar datasets
-    orders = pd.read_csv("olist_orders_dataset.csv")
-    customers = pd.read_csv("olist_customers_dataset.csv")
-    order_items = pd.read_csv("olist_order_items_dataset.csv")
-    payments = pd.read_csv("olist_order_payments_dataset.csv")
-    reviews = pd.read_csv("olist_order_reviews_dataset.csv")
-    products = pd.read_csv("olist_products_dataset.csv")
-    sellers = pd.read_csv("olist_sellers_dataset.csv")
-    geolocation = pd.read_csv("olist_geolocation_dataset.csv")
-    category_translation = pd.read_csv("product_category_name_translation.csv")
-    
-    # Converter coluna de data para datetime
-    orders['order_purchase_timestamp'] = pd.to_datetime(orders['order_purchase_timestamp'])
-    
-    # Filtrar dados até julho de 2018
-    cutoff_date = pd.to_datetime('2018-08-01')
-    orders = orders[orders['order_purchase_timestamp'] < cutoff_date]
-    
     # Merge principal: orders + customers
-    df = orders.merge(customers, on='customer_id', how='left')
-    
+    df = orders.merge(tables["customers"], on='customer_id', how='left')
+
     # Adicionar detalhes dos itens do pedido
-    df = df.merge(order_items, on='order_id', how='left')
-    
+    df = df.merge(tables["order_items"], on='order_id', how='left')
+
     # Adicionar pagamentos
-    df = df.merge(payments, on='order_id', how='left')
-    
+    df = df.merge(tables["payments"], on='order_id', how='left')
+
     # Adicionar avaliações
-    df = df.merge(reviews, on='order_id', how='left')
-    
+    df = df.merge(tables["reviews"], on='order_id', how='left')
+
     # Adicionar detalhes do produto
-    df = df.merge(products, on='product_id', how='left')
-    
+    df = df.merge(tables["products"], on='product_id', how='left')
+
     # Adicionar nome da categoria traduzido
-    df = df.merge(category_translation, on='product_category_name', how='left')
-    
+    df = df.merge(tables["category_translation"], on='product_category_name', how='left')
+
     # Adicionar informações dos vendedores
-    df = df.merge(sellers, on='seller_id', how='left')
+    df = df.merge(tables["sellers"], on='seller_id', how='left')
+
+    return df
+
+def add_simulated_columns(df, seed=42):
+    """Adiciona as colunas simuladas (cancelamento, abandono, CSAT)."""
+    rng = np.random.RandomState(seed)  # Garantir reprodutibilidade
 
     # Criar uma flag para identificar pedidos cancelados (aleatório)
-    np.random.seed(42)  # Garantir reprodutibilidade
-    df["pedido_cancelado"] = np.random.choice([0, 1], size=len(df), p=[0.9, 0.1])  # 10% cancelados
+    df["pedido_cancelado"] = rng.choice([0, 1], size=len(df), p=[0.9, 0.1])  # 10% cancelados
 
     # Simular uma coluna de carrinhos abandonados (aleatório, baseado nos clientes)
-    df["carrinho_abandonado"] = np.random.choice([0, 1], size=len(df), p=[0.85, 0.15])  # 15% abandonados
+    df["carrinho_abandonado"] = rng.choice([0, 1], size=len(df), p=[0.85, 0.15])  # 15% abandonados
 
     # Receita perdida com pedidos cancelados
     df["receita_perdida"] = df["price"] * df["pedido_cancelado"]
 
     # Simular valores de CSAT (Customer Satisfaction Score) entre 1 e 5
-    df["csat_score"] = np.random.randint(1, 6, size=len(df))
+    df["csat_score"] = rng.randint(1, 6, size=len(df))
+
+    return df
+
+def write_sorted_parquet(df, path):
+    """
+    Grava o Parquet ordenado pela data de compra, em row groups pequenos
+
+    Com os dados ordenados, as estatísticas min/max de cada row group cobrem
+    intervalos disjuntos de datas e a leitura com filtro de período descarta
+    os row groups fora do intervalo.
+    """
+    df = df.sort_values('order_purchase_timestamp', kind='stable')
+    df.to_parquet(path, index=False, row_group_size=ROW_GROUP_SIZE)
+
+@st.cache_data
+def load_and_merge_olist_data():
+    # Carregar datasets
+    tables = read_olist_tables()
 
-    
-    # Salvar como CSV e Parquet
+    df = merge_olist_tables(tables)
+    df = add_simulated_columns(df)
+
+    # Salvar como CSV (IDs originais) e Parquet (IDs inteiros e colunas categóricas)
     df.to_csv("olist_merged_data.csv", index=False)
-    df.to_parquet("olist_merged_data.parquet", index=False)
-    
+    write_sorted_parquet(encode_columns(df), "olist_merged_data.parquet")
+
+    # O dataset particionado de um build incremental anterior teria prioridade
+    # na leitura (ver utils.KPIs.merged_source) e esconderia este build
+    if os.path.isdir(PARTITIONED_DIR):
+        shutil.rmtree(PARTITIONED_DIR)
+        print(f"Dataset particionado anterior removido: {PARTITIONED_DIR}/")
+
     print("Dataset consolidado salvo com sucesso!")
 
+def _hash_rows(df):
+    """Hash estável (uint64) de cada linha do DataFrame."""
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def _digest(hashes):
+    """Resume um conjunto de hashes de linhas, independente da ordem."""
+    return hashlib.sha1(np.sort(hashes).tobytes()).hexdigest()
+
+def month_fingerprints(tables):
+    """
+    Calcula uma impressão digital por mês de compra a partir dos pedidos
+    e das linhas de itens, pagamentos e avaliações associadas a eles.
+
+    As tabelas de dimensão (clientes, produtos, vendedores, categorias) entram
+    em todas as impressões: uma alteração nelas invalida todas as partições.
+    """
+    orders = tables["orders"]
+    month_by_order = pd.Series(
+        orders['order_purchase_timestamp'].dt.strftime('%Y-%m').to_numpy(),
+        index=orders['order_id']
+    )
+
+    dimensions = _digest(np.concatenate([
+        _hash_rows(tables[name])
+        for name in ["customers", "products", "sellers", "category_translation"]
+    ]))
+
+    # Hash de cada linha de fato, rotulada com o mês do pedido
+    parts = [pd.DataFrame({'month': month_by_order.to_numpy(), 'hash': _hash_rows(orders)})]
+    for name in ["order_items", "payments", "reviews"]:
+        table = tables[name]
+        months = table['order_id'].map(month_by_order)
+        valid = months.notna().to_numpy()
+        parts.append(pd.DataFrame({'month': months[valid].to_numpy(), 'hash': _hash_rows(table)[valid]}))
+
+    rows = pd.concat(parts, ignore_index=True)
+    return {
+        month: hashlib.sha1((dimensions + _digest(group.to_numpy())).encode()).hexdigest()
+        for month, group in rows.groupby('month')['hash']
+    }
+
+def _month_seed(month):
+    """Semente determinística por mês para as colunas simuladas."""
+    return int(month.replace('-', ''))
+
+def _partition_dir(output_dir, month):
+    return os.path.join(output_dir, f"purchase_month={month}")
+
+def _read_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_manifest(output_dir, manifest):
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+def _staging_dir(output_dir):
+    # Prefixo "_": o pyarrow ignora o diretório ao ler o dataset (não vira partição)
+    return os.path.join(output_dir, STAGING_DIR)
+
+def _write_partition(df, output_dir, month):
+    """
+    Grava uma partição de forma atômica
+
+    O arquivo é gravado em `_staging/` e depois trocado pelo da partição com
+    `os.replace`: um build interrompido não deixa partições pela metade, e o
+    mês nunca fica ausente do dataset durante a troca.
+    """
+    staging = os.path.join(_staging_dir(output_dir), f"{month}.parquet")
+    write_sorted_parquet(df, staging)
+    target = _partition_dir(output_dir, month)
+    os.makedirs(target, exist_ok=True)
+    os.replace(staging, os.path.join(target, PARTITION_FILE))
+
+def build_partitioned_dataset(output_dir=PARTITIONED_DIR, full_rebuild=False):
+    """
+    Gera o dataset consolidado particionado por mês de compra
+
+    Apenas os meses cuja impressão digital mudou desde o último build são
+    recalculados e regravados. Meses que deixaram de existir são removidos.
+
+    Parâmetros:
+    -----------
+    output_dir : str
+        Diretório do dataset particionado (padrão: 'olist_merged_data')
+    full_rebuild : bool
+        Se True, ignora o manifesto e regrava todas as partições
+
+    Retorno:
+    --------
+    list
+        Meses (AAAA-MM) que foram regravados
+    """
+    tables = read_olist_tables()
+    fingerprints = month_fingerprints(tables)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = {} if full_rebuild else _read_manifest(output_dir)
+
+    # Restos de um build interrompido (inclusive diretórios "purchase_month=AAAA-MM.tmp"
+    # de versões anteriores, que seriam lidos como partições)
+    shutil.rmtree(_staging_dir(output_dir), ignore_errors=True)
+    for leftover in glob.glob(os.path.join(output_dir, "purchase_month=*.tmp")):
+        shutil.rmtree(leftover, ignore_errors=True)
+    os.makedirs(_staging_dir(output_dir))
+
+    changed = [
+        month for month, fingerprint in sorted(fingerprints.items())
+        if manifest.get(month) != fingerprint or not os.path.isdir(_partition_dir(output_dir, month))
+    ]
+    removed = [month for month in manifest if month not in fingerprints]
+
+    print(f"Partições: {len(fingerprints)} no total, {len(changed)} alteradas, {len(removed)} removidas")
+
+    orders = tables["orders"]
+    order_months = orders['order_purchase_timestamp'].dt.strftime('%Y-%m')
+
+    for month in changed:
+        df = merge_olist_tables(tables, orders[order_months == month])
+        df = add_simulated_columns(df, seed=_month_seed(month))
+        df = encode_columns(df)
+        _write_partition(df, output_dir, month)
+        manifest[month] = fingerprints[month]
+        print(f" - {month}: {len(df)} linhas")
+
+    for month in removed:
+        shutil.rmtree(_partition_dir(output_dir, month), ignore_errors=True)
+        del manifest[month]
+
+    _write_manifest(output_dir, manifest)
+    shutil.rmtree(_staging_dir(output_dir), ignore_errors=True)
+    print("Dataset particionado atualizado com sucesso!")
+
+    return changed
+
 if __name__ == "__main__":
-    load_and_merge_olist_data()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Consolidação dos datasets do Olist')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Gera o dataset particionado por mês, recalculando apenas os meses alterados')
+    parser.add_argument('--full_rebuild', action='store_true',
+                        help='Com --incremental, regrava todas as partições')
+
+    args = parser.parse_args()
+
+    if args.incremental:
+        build_partitioned_dataset(full_rebuild=args.full_rebuild)
+    else:
+        load_and_merge_olist_data()
@@ -1,10 +1,12 @@
+import time
+_startup = time.perf_counter()
+
+import sys
+import importlib
 import streamlit as st
-import pandas as pd
 from datetime import datetime, timedelta
-from utils.KPIs import load_data, calculate_kpis, calculate_acquisition_retention_kpis, filter_by_date_range
-import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
+from utils.KPIs import purchase_date_bounds, load_daily_sketches, KPI_COLUMNS
+from utils.grafo_kpis import load_kpi_graph
 
 # Configuração da página
 st.set_page_config(
@@ -13,10 +15,38 @@ st.set_page_config(
     layout="wide"
 )
 
-# Carregar dados para obter o período disponível
-df = load_data()
-min_date = pd.to_datetime(df['order_purchase_timestamp']).min()
-max_date = pd.to_datetime(df['order_purchase_timestamp']).max()
+# Colunas usadas pelas páginas do dashboard (apenas elas são lidas do Parquet)
+DASHBOARD_COLUMNS = KPI_COLUMNS + ['customer_state']
+
+# Período disponível (lido dos metadados do Parquet, sem carregar os dados)
+min_date, max_date = purchase_date_bounds()
+
+# Páginas do dashboard: módulo em paginas/ (importado só quando a página é
+# aberta) e se a página usa os dados filtrados pelo período da sidebar
+PAGES = {
+    "Visão Geral": ("paginas.visao_geral", True),
+    "Análise Estratégica": ("paginas.analise_estrategica", True),
+    "Aquisição e Retenção": ("paginas.aquisicao_retencao", True),
+    "Comportamento do Cliente": ("paginas.comportamento_cliente", True),
+    "Produtos e Categorias": ("paginas.produtos_categorias", True),
+    "Análise de Churn": ("paginas.analise_churn", False),
+}
+
+@st.cache_resource
+def import_timings():
+    """Tempos de importação (segundos) medidos na primeira carga de cada módulo, por processo."""
+    return {}
+
+def load_page(module_name):
+    """Importa o módulo da página na primeira vez em que é aberta e registra quanto levou."""
+    if module_name not in sys.modules:
+        start = time.perf_counter()
+        importlib.import_module(module_name)
+        import_timings()[module_name] = time.perf_counter() - start
+    return sys.modules[module_name]
+
+# Inicialização do app (importações na primeira execução do processo)
+import_timings().setdefault("app", time.perf_counter() - _startup)
 
 # Sidebar
 st.sidebar.title("Configurações")
@@ -51,9 +81,7 @@ def get_date_range(periodo):
     elif periodo == "Últimos 2 anos":
         return [hoje - timedelta(days=730), hoje]
 
-# Aplicar filtro de data
 date_range = get_date_range(periodo)
-filtered_df = filter_by_date_range(df, date_range)
 
 # Filtro de gasto com marketing
 st.sidebar.subheader("Total Gasto com Marketing")
@@ -66,1678 +94,49 @@ marketing_spend = st.sidebar.number_input(
     help="Digite o valor total gasto com marketing no período selecionado"
 )
 
+# Contagens distintas aproximadas (HyperLogLog) para históricos muito grandes
+approximate_counts = st.sidebar.checkbox(
+    "Contagens aproximadas (HyperLogLog)",
+    value=False,
+    help="Estima pedidos e clientes distintos a partir de sketches diários; o erro padrão aparece ao lado do valor"
+)
+
 # Navegação
 st.sidebar.markdown("---")
 st.sidebar.title("Navegação")
 pagina = st.sidebar.radio(
     "Selecione a página:",
-    ["Visão Geral", "Análise Estratégica", "Aquisição e Retenção", 
-     "Comportamento do Cliente", "Produtos e Categorias", "Análise de Churn"]
+    list(PAGES)
 )
 
-# Funções auxiliares
-def format_value(value, is_integer=False):
-    """Formata um valor numérico com separador de milhares e duas casas decimais."""
-    if is_integer:
-        return f"{int(value):,}"
-    return f"{value:,.2f}"
-
-def format_percentage(value):
-    """Formata um valor como porcentagem com duas casas decimais."""
-    return f"{value*100:.2f}%"
-
-# Exibir a página selecionada
-if pagina == "Visão Geral":
-    st.title("Visão Geral")
-    kpis = calculate_kpis(filtered_df, marketing_spend, date_range)
-    
-    # ===== SEÇÃO 1: KPIs PRINCIPAIS =====
-    st.header("📊 KPIs Principais")
-    
-    # Layout dos KPIs em 3 linhas de 3 colunas
-    col1, col2, col3 = st.columns(3)
-    
-    # Primeira linha de KPIs - Métricas de Receita
-    col1.metric("💰 Receita Total", f"R$ {format_value(kpis['total_revenue'])}")
-    col2.metric("📦 Total de Pedidos", format_value(kpis['total_orders'], is_integer=True))
-    col3.metric("👥 Total de Clientes", format_value(kpis['total_customers'], is_integer=True))
-    
-    # Segunda linha de KPIs - Métricas de Performance
-    col1, col2, col3 = st.columns(3)
-    col1.metric("🎯 Taxa de Abandono", format_percentage(kpis['abandonment_rate']))
-    col2.metric("😊 Satisfação do Cliente", format_value(kpis['csat']))
-    col3.metric("💰 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
-    
-    # Terceira linha de KPIs - Métricas de Entrega e Cancelamento
-    col1, col2, col3 = st.columns(3)
-    col1.metric("📦 Tempo Médio de Entrega", f"{int(kpis['avg_delivery_time'])} dias")
-    col2.metric("❌ Taxa de Cancelamento", format_percentage(kpis['cancellation_rate']))
-    col3.metric("💸 Receita Perdida", f"R$ {format_value(kpis['lost_revenue'])}")
-    
-    # ===== SEÇÃO 2: EVOLUÇÃO DA RECEITA =====
-    st.header("📈 Evolução da Receita")
-    
-    # Gráfico de Receita ao Longo do Tempo
-    monthly_revenue = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['price'].sum().reset_index()
-    monthly_revenue['order_purchase_timestamp'] = monthly_revenue['order_purchase_timestamp'].astype(str)
-    fig_revenue = px.line(
-        monthly_revenue,
-        x='order_purchase_timestamp',
-        y='price',
-        title="Evolução da Receita",
-        labels={'price': 'Receita (R$)', 'order_purchase_timestamp': 'Mês'}
+module_name, uses_dashboard_data = PAGES[pagina]
+context = {
+    'date_range': date_range,
+    'marketing_spend': marketing_spend,
+    'daily_sketches': None,
+}
+
+if uses_dashboard_data:
+    # KPIs e DataFrames intermediários memorizados por suas entradas: mudar só o
+    # gasto com marketing recalcula apenas os nós que dependem dele (ver utils/grafo_kpis.py)
+    kpi_graph = load_kpi_graph(DASHBOARD_COLUMNS)
+    kpi_inputs = {
+        'date_range': date_range,
+        'marketing_spend': marketing_spend,
+        'approximate': approximate_counts,
+    }
+    
+    context.update(
+        # Fatia do período no histórico compartilhado pelas sessões (somente leitura)
+        filtered_df=kpi_graph.get('period', kpi_inputs),
+        kpi_graph=kpi_graph,
+        kpi_inputs=kpi_inputs,
+        daily_sketches=load_daily_sketches(DASHBOARD_COLUMNS) if approximate_counts else None,
     )
-    fig_revenue.update_layout(showlegend=False)
-    fig_revenue.update_layout(dragmode=False, hovermode=False)
-    st.plotly_chart(fig_revenue, use_container_width=True)
-    
-    # Adicionar insights sobre a receita
-    col1, col2 = st.columns(2)
-    with col1:
-        # Calcular crescimento da receita
-        if len(monthly_revenue) >= 2:
-            first_month = monthly_revenue.iloc[0]['price']
-            last_month = monthly_revenue.iloc[-1]['price']
-            growth_rate = (last_month - first_month) / first_month * 100 if first_month > 0 else 0
-            
-            st.markdown(f"""
-            <div style="
-                background-color: #f0f2f6;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-            ">
-                <h3 style="margin-top: 0;">📈 Crescimento da Receita</h3>
-                <p>De <strong>{monthly_revenue.iloc[0]['order_purchase_timestamp']}</strong> a <strong>{monthly_revenue.iloc[-1]['order_purchase_timestamp']}</strong>, 
-                a receita <strong>{'aumentou' if growth_rate > 0 else 'diminuiu'}</strong> em <strong>{format_value(abs(growth_rate))}%</strong>.</p>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    with col2:
-        # Identificar mês com maior receita
-        max_month = monthly_revenue.loc[monthly_revenue['price'].idxmax()]
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">🏆 Melhor Mês</h3>
-            <p>O mês com maior receita foi <strong>{max_month['order_purchase_timestamp']}</strong>, 
-            com <strong>R$ {format_value(max_month['price'])}</strong>.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # ===== SEÇÃO 3: SATISFAÇÃO E CANCELAMENTO =====
-    st.header("😊 Satisfação e Cancelamento")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de Satisfação do Cliente
-        st.subheader("Satisfação do Cliente")
-        monthly_satisfaction = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['review_score'].mean().reset_index()
-        monthly_satisfaction['order_purchase_timestamp'] = monthly_satisfaction['order_purchase_timestamp'].astype(str)
-        fig_satisfaction = px.line(
-            monthly_satisfaction,
-            x='order_purchase_timestamp',
-            y='review_score',
-            title="Evolução da Satisfação",
-            labels={'review_score': 'Nota Média', 'order_purchase_timestamp': 'Mês'}
-        )
-        fig_satisfaction.update_layout(
-            yaxis=dict(range=[0, 5]),
-            showlegend=False
-        )
-        fig_satisfaction.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_satisfaction, use_container_width=True)
-        
-        # Adicionar insights sobre satisfação
-        avg_satisfaction = filtered_df['review_score'].mean()
-        satisfaction_distribution = filtered_df['review_score'].value_counts(normalize=True).sort_index()
-        
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">📊 Distribuição de Avaliações</h3>
-            <p>A nota média de satisfação é <strong>{format_value(avg_satisfaction)}</strong> em 5.</p>
-            <p><strong>{format_percentage(satisfaction_distribution.get(5, 0))}</strong> dos clientes deram nota 5.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        # Gráfico de Taxa de Cancelamento
-        st.subheader("Taxa de Cancelamento")
-        monthly_cancellation = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['pedido_cancelado'].mean().reset_index()
-        monthly_cancellation['order_purchase_timestamp'] = monthly_cancellation['order_purchase_timestamp'].astype(str)
-        fig_cancellation = px.line(
-            monthly_cancellation,
-            x='order_purchase_timestamp',
-            y='pedido_cancelado',
-            title="Evolução da Taxa de Cancelamento",
-            labels={'pedido_cancelado': 'Taxa de Cancelamento', 'order_purchase_timestamp': 'Mês'}
-        )
-        fig_cancellation.update_layout(
-            yaxis=dict(tickformat=".1%"),
-            showlegend=False
-        )
-        fig_cancellation.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_cancellation, use_container_width=True)
-        
-        # Adicionar insights sobre cancelamento
-        avg_cancellation = filtered_df['pedido_cancelado'].mean()
-        total_cancelled = filtered_df[filtered_df['pedido_cancelado'] == 1]['order_id'].nunique()
-        
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">❌ Impacto do Cancelamento</h3>
-            <p>A taxa média de cancelamento é <strong>{format_percentage(avg_cancellation)}</strong>.</p>
-            <p>Foram cancelados <strong>{format_value(total_cancelled, is_integer=True)}</strong> pedidos, 
-            resultando em <strong>R$ {format_value(kpis['lost_revenue'])}</strong> de receita perdida.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # ===== SEÇÃO 4: RESUMO E INSIGHTS =====
-    st.header("💡 Insights Principais")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">📊 Métricas de Negócio</h3>
-            <ul>
-                <li>Receita total: <strong>R$ {format_value(kpis['total_revenue'])}</strong></li>
-                <li>Ticket médio: <strong>R$ {format_value(kpis['average_ticket'])}</strong></li>
-                <li>Total de clientes: <strong>{format_value(kpis['total_customers'], is_integer=True)}</strong></li>
-                <li>Total de pedidos: <strong>{format_value(kpis['total_orders'], is_integer=True)}</strong></li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">🎯 Oportunidades de Melhoria</h3>
-            <ul>
-                <li>Reduzir taxa de cancelamento (atual: <strong>{format_percentage(kpis['cancellation_rate'])}</strong>)</li>
-                <li>Melhorar tempo de entrega (atual: <strong>{int(kpis['avg_delivery_time'])} dias</strong>)</li>
-                <li>Aumentar satisfação do cliente (atual: <strong>{format_value(kpis['csat'])}</strong>)</li>
-                <li>Reduzir taxa de abandono (atual: <strong>{format_percentage(kpis['abandonment_rate'])}</strong>)</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-
-elif pagina == "Análise Estratégica":
-    st.title("Análise Estratégica")
-    kpis = calculate_kpis(filtered_df, marketing_spend, date_range)
-    
-    # ===== SEÇÃO 1: VISÃO GERAL E KPIs PRINCIPAIS =====
-    st.header("📊 Visão Geral")
-    
-    # Layout dos KPIs
-    col1, col2, col3 = st.columns(3)
-    
-    # Primeira linha de KPIs - Métricas de Receita
-    col1.metric("💰 Receita Total", f"R$ {format_value(kpis['total_revenue'])}")
-    col2.metric("📈 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
-    col3.metric("👥 Total de Clientes", format_value(kpis['total_customers'], is_integer=True))
-    
-    # ===== SEÇÃO 2: PREVISÃO DE RECEITA =====
-    st.header("🔮 Previsão de Receita")
-    
-    # Calcular média diária de receita
-    filtered_df['date'] = pd.to_datetime(filtered_df['order_purchase_timestamp']).dt.date
-    daily_revenue = filtered_df.groupby('date')['price'].sum().reset_index()
-    
-    # Adicionar dia da semana para análise de sazonalidade
-    daily_revenue['day_of_week'] = pd.to_datetime(daily_revenue['date']).dt.day_name()
-    
-    # Calcular média móvel de 7 dias
-    daily_revenue['ma7'] = daily_revenue['price'].rolling(window=7).mean()
-    
-    # Calcular fatores de sazonalidade semanal
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    weekly_seasonality = daily_revenue.groupby('day_of_week')['price'].mean().reindex(day_order)
-    weekly_seasonality = weekly_seasonality / weekly_seasonality.mean()  # Normalizar
-    
-    # Calcular tendência de crescimento (últimos 30 dias)
-    recent_data = daily_revenue.tail(30)
-    if len(recent_data) >= 2:
-        x = np.arange(len(recent_data))
-        y = recent_data['price'].values
-        z = np.polyfit(x, y, 1)
-        growth_rate = z[0]  # Coeficiente de crescimento diário
-    else:
-        growth_rate = 0
-    
-    # Calcular previsão para os próximos 30 dias
-    last_date = daily_revenue['date'].iloc[-1]
-    forecast_dates = pd.date_range(start=last_date, periods=31, freq='D')[1:]
-    
-    # Criar DataFrame para previsão
-    forecast_df = pd.DataFrame({'date': forecast_dates})
-    forecast_df['day_of_week'] = forecast_df['date'].dt.day_name()
-    
-    # Aplicar fatores de sazonalidade
-    forecast_df['seasonality_factor'] = forecast_df['day_of_week'].map(weekly_seasonality)
-    
-    # Calcular previsão base
-    base_forecast = daily_revenue['ma7'].iloc[-1]
-    
-    # Aplicar tendência de crescimento e sazonalidade
-    for i in range(len(forecast_df)):
-        days_ahead = i + 1
-        forecast_df.loc[i, 'forecast'] = base_forecast * forecast_df.loc[i, 'seasonality_factor'] + (growth_rate * days_ahead)
-    
-    # Calcular intervalo de confiança (simplificado)
-    std_dev = daily_revenue['price'].std()
-    forecast_df['lower_bound'] = forecast_df['forecast'] - (1.96 * std_dev)
-    forecast_df['upper_bound'] = forecast_df['forecast'] + (1.96 * std_dev)
-    
-    # Criar gráfico de previsão
-    fig_forecast = go.Figure()
-    
-    # Adicionar dados históricos
-    fig_forecast.add_trace(go.Scatter(
-        x=daily_revenue['date'],
-        y=daily_revenue['price'],
-        name='Receita Real',
-        line=dict(color='#1f77b4')
-    ))
-    
-    # Adicionar média móvel
-    fig_forecast.add_trace(go.Scatter(
-        x=daily_revenue['date'],
-        y=daily_revenue['ma7'],
-        name='Média Móvel (7 dias)',
-        line=dict(color='#ff7f0e', dash='dash')
-    ))
-    
-    # Adicionar previsão
-    fig_forecast.add_trace(go.Scatter(
-        x=forecast_df['date'],
-        y=forecast_df['forecast'],
-        name='Previsão (30 dias)',
-        line=dict(color='#2ca02c', dash='dot')
-    ))
-    
-    # Adicionar intervalo de confiança
-    fig_forecast.add_trace(go.Scatter(
-        x=forecast_df['date'].tolist() + forecast_df['date'].tolist()[::-1],
-        y=forecast_df['upper_bound'].tolist() + forecast_df['lower_bound'].tolist()[::-1],
-        fill='toself',
-        fillcolor='rgba(44, 160, 44, 0.2)',
-        line=dict(color='rgba(44, 160, 44, 0)'),
-        name='Intervalo de Confiança (95%)',
-        showlegend=True
-    ))
-    
-    fig_forecast.update_layout(
-        title="Previsão de Receita para os Próximos 30 Dias",
-        xaxis_title="Data",
-        yaxis_title="Receita (R$)",
-        showlegend=True,
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    fig_forecast.update_layout(dragmode=False, hovermode=False)
-    st.plotly_chart(fig_forecast, use_container_width=True)
-    
-    # Adicionar métricas de previsão
-    col1_metrics, col2_metrics, col3_metrics = st.columns(3)
-    
-    # Calcular receita total prevista para os próximos 30 dias
-    total_forecast = forecast_df['forecast'].sum()
-    col1_metrics.metric("💰 Receita Total Prevista (30 dias)", f"R$ {format_value(total_forecast)}")
-    
-    # Calcular crescimento previsto em relação ao período anterior
-    previous_30_days = daily_revenue.tail(30)['price'].sum()
-    growth_percentage = (total_forecast - previous_30_days) / previous_30_days * 100 if previous_30_days > 0 else 0
-    col2_metrics.metric("📈 Crescimento Previsto", f"{format_value(growth_percentage)}%")
-    
-    # Calcular dia com maior receita prevista
-    max_day = forecast_df.loc[forecast_df['forecast'].idxmax()]
-    col3_metrics.metric("📅 Dia com Maior Receita Prevista", f"{max_day['date'].strftime('%d/%m/%Y')} ({max_day['day_of_week']})")
-    
-    # ===== SEÇÃO 3: SAZONALIDADE E PADRÕES DE VENDA =====
-    st.header("📅 Sazonalidade e Padrões de Venda")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Sazonalidade de Vendas
-        st.subheader("📅 Sazonalidade de Vendas")
-        
-        # Calcular vendas por dia da semana
-        filtered_df['day_of_week'] = pd.to_datetime(filtered_df['order_purchase_timestamp']).dt.day_name()
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        day_revenue = filtered_df.groupby('day_of_week')['price'].sum().reindex(day_order)
-        
-        # Calcular vendas por mês
-        filtered_df['month'] = pd.to_datetime(filtered_df['order_purchase_timestamp']).dt.month_name()
-        month_order = ['January', 'February', 'March', 'April', 'May', 'June', 
-                      'July', 'August', 'September', 'October', 'November', 'December']
-        month_revenue = filtered_df.groupby('month')['price'].sum().reindex(month_order)
-        
-        # Criar gráfico de sazonalidade
-        fig_seasonality = go.Figure()
-        
-        # Adicionar barras para dia da semana
-        fig_seasonality.add_trace(go.Bar(
-            x=day_revenue.index,
-            y=day_revenue.values,
-            name='Por Dia da Semana',
-            marker_color='#1f77b4'
-        ))
-        
-        # Adicionar barras para mês
-        fig_seasonality.add_trace(go.Bar(
-            x=month_revenue.index,
-            y=month_revenue.values,
-            name='Por Mês',
-            marker_color='#ff7f0e',
-            visible=False
-        ))
-        
-        # Adicionar botões para alternar entre visualizações
-        fig_seasonality.update_layout(
-            title="Sazonalidade de Vendas",
-            xaxis_title="Período",
-            yaxis_title="Receita (R$)",
-            updatemenus=[
-                dict(
-                    type="buttons",
-                    direction="down",
-                    buttons=[
-                        dict(
-                            args=[{"visible": [True, False]}],
-                            label="Por Dia da Semana",
-                            method="update"
-                        ),
-                        dict(
-                            args=[{"visible": [False, True]}],
-                            label="Por Mês",
-                            method="update"
-                        )
-                    ],
-                    x=0.1,
-                    y=1.1
-                )
-            ],
-            showlegend=False
-        )
-        fig_seasonality.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_seasonality, use_container_width=True)
-        
-        # Identificar o dia da semana com maior receita
-        best_day = day_revenue.idxmax()
-        best_day_revenue = day_revenue.max()
-        
-        # Identificar o mês com maior receita
-        best_month = month_revenue.idxmax()
-        best_month_revenue = month_revenue.max()
-        
-        st.markdown(f"""
-        **Insights de Sazonalidade:**
-        - **Melhor dia para vendas**: {best_day} (R$ {format_value(best_day_revenue)})
-        - **Melhor mês para vendas**: {best_month} (R$ {format_value(best_month_revenue)})
-        """)
-    
-    with col2:
-        # Ticket Médio por Perfil
-        st.subheader("💵 Ticket Médio por Estado")
-        
-        # Calcular ticket médio por estado
-        state_ticket = filtered_df.groupby('customer_state')['price'].mean().sort_values(ascending=False)
-        
-        # Criar gráfico de ticket médio
-        fig_ticket = go.Figure()
-        
-        fig_ticket.add_trace(go.Bar(
-            x=state_ticket.index,
-            y=state_ticket.values,
-            name='Ticket Médio',
-            marker_color='#1f77b4'
-        ))
-        
-        fig_ticket.update_layout(
-            title="Ticket Médio por Estado",
-            xaxis_title="Estado",
-            yaxis_title="Ticket Médio (R$)",
-            showlegend=False
-        )
-        fig_ticket.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_ticket, use_container_width=True)
-        
-        # Identificar o estado com maior ticket médio
-        best_state = state_ticket.idxmax()
-        best_state_ticket = state_ticket.max()
-        
-        st.markdown(f"""
-        **Insights de Ticket Médio:**
-        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(best_state_ticket)})
-        """)
-    
-    # ===== SEÇÃO 4: RENTABILIDADE E ANÁLISE DE CATEGORIAS =====
-    st.header("💰 Rentabilidade e Análise de Categorias")
-    
-    # Preparar dados para análise
-    filtered_df['month'] = pd.to_datetime(filtered_df['order_purchase_timestamp']).dt.to_period('M')
-    monthly_category_sales = filtered_df.groupby(['month', 'product_category_name']).agg({
-        'price': 'sum',
-        'order_id': 'count',
-        'pedido_cancelado': 'mean'
-    }).reset_index()
-    monthly_category_sales['month'] = monthly_category_sales['month'].astype(str)
-    
-    # Identificar as 5 categorias com maior volume de vendas
-    top_categories = filtered_df.groupby('product_category_name')['order_id'].count().sort_values(ascending=False).head(5).index.tolist()
-    
-    # Filtrar apenas as categorias principais
-    top_category_sales = monthly_category_sales[monthly_category_sales['product_category_name'].isin(top_categories)]
-    
-    # Layout em duas colunas para os gráficos
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Top 10 Categorias por Rentabilidade
-        st.subheader("📈 Top 10 Categorias por Rentabilidade")
-        
-        # Calcular rentabilidade por categoria
-        category_profit = filtered_df.groupby('product_category_name').agg({
-            'price': 'sum',
-            'order_id': 'count'
-        }).reset_index()
-        
-        category_profit['avg_price'] = category_profit['price'] / category_profit['order_id']
-        category_profit['profit_margin'] = 0.3  # Simulando margem de 30%
-        category_profit['profit'] = category_profit['price'] * category_profit['profit_margin']
-        
-        # Ordenar por lucro
-        category_profit = category_profit.sort_values('profit', ascending=False).head(10)
-        
-        # Identificar a categoria mais rentável
-        best_category = category_profit.iloc[0]['product_category_name']
-        best_category_profit = category_profit.iloc[0]['profit']
-        
-        # Criar gráfico de rentabilidade
-        fig_profit = go.Figure()
-        
-        fig_profit.add_trace(go.Bar(
-            x=category_profit['product_category_name'],
-            y=category_profit['profit'],
-            name='Lucro',
-            marker_color='#2ca02c'
-        ))
-        
-        fig_profit.update_layout(
-            xaxis_title="Categoria",
-            yaxis_title="Lucro (R$)",
-            showlegend=False,
-            xaxis_tickangle=45
-        )
-        fig_profit.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_profit, use_container_width=True)
-    
-    with col2:
-        # Taxa de Crescimento por Categoria
-        st.subheader("📊 Taxa de Crescimento por Categoria")
-        
-        # Calcular taxa de crescimento para cada categoria
-        category_growth = {}
-        for category in top_categories:
-            category_data = top_category_sales[top_category_sales['product_category_name'] == category]
-            if len(category_data) >= 2:
-                first_month = category_data.iloc[0]['order_id']
-                last_month = category_data.iloc[-1]['order_id']
-                growth_rate = (last_month - first_month) / first_month * 100 if first_month > 0 else 0
-                category_growth[category] = growth_rate
-        
-        # Ordenar categorias por taxa de crescimento
-        sorted_categories = sorted(category_growth.items(), key=lambda x: x[1], reverse=True)
-        
-        # Criar gráfico de barras para taxa de crescimento
-        fig_growth = go.Figure()
-        
-        fig_growth.add_trace(go.Bar(
-            x=[cat[0] for cat in sorted_categories],
-            y=[cat[1] for cat in sorted_categories],
-            name='Taxa de Crescimento',
-            marker_color='#2ca02c'
-        ))
-        
-        fig_growth.update_layout(
-            xaxis_title="Categoria",
-            yaxis_title="Taxa de Crescimento (%)",
-            showlegend=False
-        )
-        fig_growth.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_growth, use_container_width=True)
-    
-    # ===== SEÇÃO 5: PREVISÃO DE DEMANDA POR CATEGORIA =====
-    st.header("📈 Previsão de Demanda por Categoria")
-    
-    # Criar DataFrame para previsão
-    last_month = pd.to_datetime(monthly_category_sales['month'].iloc[-1])
-    forecast_months = pd.date_range(start=last_month, periods=4, freq='M')[1:]
-    
-    # Calcular previsão para cada categoria
-    forecast_data = []
-    
-    for category in top_categories:
-        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
-        
-        if len(category_data) >= 3:
-            # Calcular média móvel de 3 meses
-            ma3 = category_data['order_id'].rolling(window=3).mean().iloc[-1]
-            
-            # Calcular tendência (últimos 3 meses)
-            recent_data = category_data.tail(3)
-            x = np.arange(len(recent_data))
-            y = recent_data['order_id'].values
-            z = np.polyfit(x, y, 1)
-            trend = z[0]  # Coeficiente de crescimento mensal
-            
-            # Calcular previsão para os próximos 3 meses
-            for i, month in enumerate(forecast_months):
-                forecast = ma3 + (trend * (i + 1))
-                forecast_data.append({
-                    'month': month,
-                    'product_category_name': category,
-                    'forecast': max(0, forecast)  # Garantir que a previsão não seja negativa
-                })
-    
-    forecast_df = pd.DataFrame(forecast_data)
-    
-    # Criar gráfico de previsão
-    fig_forecast = go.Figure()
-    
-    # Adicionar dados históricos
-    for category in top_categories:
-        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
-        fig_forecast.add_trace(go.Scatter(
-            x=category_data['month'],
-            y=category_data['order_id'],
-            name=f'{category} (Histórico)',
-            line=dict(width=2)
-        ))
-    
-    # Adicionar previsão
-    for category in top_categories:
-        category_forecast = forecast_df[forecast_df['product_category_name'] == category]
-        if not category_forecast.empty:
-            fig_forecast.add_trace(go.Scatter(
-                x=category_forecast['month'],
-                y=category_forecast['forecast'],
-                name=f'{category} (Previsão)',
-                line=dict(dash='dash', width=2)
-            ))
-    
-    fig_forecast.update_layout(
-        title="Previsão de Demanda para os Próximos 3 Meses",
-        xaxis_title="Mês",
-        yaxis_title="Quantidade de Pedidos",
-        showlegend=True,
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
-    )
-    fig_forecast.update_layout(dragmode=False, hovermode=False)
-    st.plotly_chart(fig_forecast, use_container_width=True)
-    
-    # ===== SEÇÃO 6: RECOMENDAÇÕES E INSIGHTS =====
-    st.header("💡 Recomendações e Insights")
-    
-    # Calcular métricas avançadas para recomendações
-    recommendations = []
-    
-    # Definir limites mínimos
-    MIN_MONTHLY_ORDERS = 10  # Mínimo de pedidos mensais para análise
-    MIN_TOTAL_REVENUE = 5000  # Mínimo de receita total para análise
-    
-    for category in top_categories:
-        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
-        category_revenue = filtered_df[filtered_df['product_category_name'] == category]['price'].sum()
-        avg_monthly_orders = category_data['order_id'].mean()
-        
-        # Verificar volumes mínimos
-        if avg_monthly_orders >= MIN_MONTHLY_ORDERS and category_revenue >= MIN_TOTAL_REVENUE:
-            if not category_data.empty and not category_forecast.empty:
-                # Calcular métricas de tendência
-                last_month_sales = category_data.iloc[-1]['order_id']
-                next_month_forecast = category_forecast.iloc[0]['forecast']
-                
-                # Calcular variação percentual
-                variation = (next_month_forecast - last_month_sales) / last_month_sales * 100 if last_month_sales > 0 else 0
-                
-                # Calcular giro de estoque (simulado)
-                inventory_turnover = avg_monthly_orders / 30  # Média diária de vendas
-                
-                # Calcular estoque ideal baseado na previsão e lead time
-                lead_time_days = 15  # Tempo médio de reposição em dias
-                safety_stock_days = 7  # Estoque de segurança em dias
-                ideal_stock = (next_month_forecast / 30) * (lead_time_days + safety_stock_days)
-                
-                # Determinar ação baseada em múltiplos fatores
-                if variation > 20 and inventory_turnover > 1:
-                    action = "Aumentar significativamente"
-                    reason = "Alto crescimento previsto com bom giro de estoque"
-                elif variation > 10 and inventory_turnover > 0.5:
-                    action = "Aumentar moderadamente"
-                    reason = "Crescimento moderado com giro adequado"
-                elif variation < -20 and inventory_turnover < 0.3:
-                    action = "Reduzir significativamente"
-                    reason = "Queda significativa nas vendas e baixo giro"
-                elif variation < -10 and inventory_turnover < 0.5:
-                    action = "Reduzir moderadamente"
-                    reason = "Queda moderada nas vendas"
-                else:
-                    action = "Manter"
-                    reason = "Demanda estável"
-                
-                recommendations.append({
-                    'category': category,
-                    'variation': variation,
-                    'action': action,
-                    'reason': reason,
-                    'ideal_stock': ideal_stock,
-                    'inventory_turnover': inventory_turnover
-                })
-    
-    # Ordenar recomendações por variação absoluta
-    recommendations.sort(key=lambda x: abs(x['variation']), reverse=True)
-    
-    # Exibir recomendações em um formato mais visual
-    st.subheader("📦 Recomendações de Estoque")
-    
-    # Criar colunas para as recomendações
-    rec_cols = st.columns(3)
-    
-    for i, rec in enumerate(recommendations):
-        col_idx = i % 3
-        with rec_cols[col_idx]:
-            # Definir cor de fundo com base na variação
-            bg_color = "rgba(46, 204, 113, 0.2)" if rec['variation'] > 0 else "rgba(231, 76, 60, 0.2)" if rec['variation'] < 0 else "rgba(52, 152, 219, 0.2)"
-            
-            # Definir cor do texto com base na variação
-            text_color = "#2ecc71" if rec['variation'] > 0 else "#e74c3c" if rec['variation'] < 0 else "#3498db"
-            
-            st.markdown(f"""
-            <div style="
-                backdrop-filter: blur(10px);
-                background: {bg_color};
-                border-radius: 20px;
-                padding: 30px;
-                margin: 10px 0;
-                border: 1px solid {text_color};
-                box-shadow: 0 4px 30px rgba(0, 0, 0, 0.1);
-                color: #333;
-                text-align: center;
-            ">
-                <h3 style="margin: 0; color: {text_color};">{rec['category']}</h3>
-                <h1 style="margin: 10px 0; color: {text_color};">{rec['action']}</h1>
-                <p style="opacity: 0.8; margin: 0;">Variação prevista: {format_value(rec['variation'])}%</p>
-                <p style="opacity: 0.8; margin: 5px 0;">Giro de estoque: {format_value(rec['inventory_turnover'])} un/dia</p>
-                <p style="opacity: 0.8; margin: 5px 0;">Estoque ideal: {format_value(rec['ideal_stock'], is_integer=True)} un</p>
-                <p style="font-size: 0.9em; margin-top: 10px; font-style: italic;">{rec['reason']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    # Resumo dos insights principais
-    st.subheader("📊 Resumo dos Insights Principais")
-    
-    # Garantir que todas as variáveis necessárias estejam definidas
-    best_day = day_revenue.idxmax() if 'day_revenue' in locals() else "N/A"
-    best_month = month_revenue.idxmax() if 'month_revenue' in locals() else "N/A"
-    best_state = state_ticket.idxmax() if 'state_ticket' in locals() else "N/A"
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        **Insights de Receita:**
-        - **Receita Total**: R$ {format_value(kpis['total_revenue'])}
-        - **Crescimento Previsto**: {format_value(growth_percentage)}%
-        - **Melhor dia para vendas**: {best_day}
-        - **Melhor mês para vendas**: {best_month}
-        """)
-    
-    with col2:
-        st.markdown(f"""
-        **Insights de Produtos:**
-        - **Categoria mais rentável**: {best_category} (Lucro: R$ {format_value(best_category_profit)})
-        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(state_ticket.max() if 'state_ticket' in locals() else 0)})
-        - **Categoria com maior crescimento**: {sorted_categories[0][0] if sorted_categories else "N/A"} ({format_value(sorted_categories[0][1] if sorted_categories else 0)}%)
-        """)
-
-elif pagina == "Aquisição e Retenção":
-    st.title("Aquisição e Retenção")
-    kpis = calculate_kpis(filtered_df, marketing_spend, date_range)
-    acquisition_kpis = calculate_acquisition_retention_kpis(filtered_df, marketing_spend, date_range)
-    
-    # 📊 Visão Geral dos KPIs
-    st.header("📊 Visão Geral")
-    
-    # Primeira linha - Métricas de Clientes
-    st.subheader("👥 Métricas de Clientes")
-    col1, col2, col3 = st.columns(3)
-    col1.metric("Novos Clientes (Período)", format_value(acquisition_kpis['total_new_customers'], is_integer=True))
-    col2.metric("Taxa de Recompra", format_percentage(acquisition_kpis['repurchase_rate']))
-    col3.metric("Tempo até 2ª Compra", f"{int(acquisition_kpis['avg_time_to_second'])} dias")
-    
-    # Segunda linha - Métricas Financeiras
-    st.subheader("💰 Métricas Financeiras")
-    col1, col2, col3 = st.columns(3)
-    col1.metric("CAC", f"R$ {format_value(acquisition_kpis['cac'])}")
-    col2.metric("LTV", f"R$ {format_value(acquisition_kpis['ltv'])}")
-    col3.metric("LTV/CAC", format_value(acquisition_kpis['ltv'] / acquisition_kpis['cac'] if acquisition_kpis['cac'] > 0 else 0))
-    
-    st.markdown("---")
-    
-    # 📈 Análise de Aquisição
-    st.header("📈 Análise de Aquisição")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de Novos vs Retornando
-        st.subheader("👥 Evolução de Clientes")
-        fig_customers = go.Figure()
-        
-        fig_customers.add_trace(go.Bar(
-            x=acquisition_kpis['new_customers']['month'],
-            y=acquisition_kpis['new_customers']['customer_unique_id'],
-            name='Novos Clientes',
-            marker_color='#1f77b4'
-        ))
-        
-        fig_customers.add_trace(go.Bar(
-            x=acquisition_kpis['returning_customers']['month'],
-            y=acquisition_kpis['returning_customers']['customer_unique_id'],
-            name='Clientes Retornando',
-            marker_color='#2ca02c'
-        ))
-        
-        fig_customers.update_layout(
-            title="Evolução de Novos e Clientes Retornando",
-            barmode='stack',
-            xaxis_title="Mês",
-            yaxis_title="Número de Clientes",
-            yaxis=dict(tickformat=",d"),
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            )
-        )
-        fig_customers.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_customers, use_container_width=True)
-    
-    with col2:
-        # Funil de Status dos Pedidos
-        st.subheader("🔄 Funil de Pedidos")
-        
-        # Preparar dados para o funil
-        # Primeiro, vamos ordenar os pedidos por data para garantir a sequência correta
-        funnel_df = filtered_df.sort_values('order_purchase_timestamp')
-        
-        # Calcular quantidade de pedidos em cada etapa
-        funnel_counts = {
-            'created': len(funnel_df),
-            'approved': len(funnel_df[funnel_df['order_status'].isin(['approved', 'shipped', 'delivered'])]),
-            'shipped': len(funnel_df[funnel_df['order_status'].isin(['shipped', 'delivered'])]),
-            'delivered': len(funnel_df[funnel_df['order_status'] == 'delivered'])
-        }
-        
-        # Criar DataFrame para o funil
-        funnel_data = pd.DataFrame({
-            'status': list(funnel_counts.keys()),
-            'count': list(funnel_counts.values())
-        })
-        
-        # Definir labels em português
-        status_labels = {
-            'created': 'Pedidos Criados',
-            'approved': 'Pedidos Aprovados',
-            'shipped': 'Pedidos Enviados',
-            'delivered': 'Pedidos Entregues'
-        }
-        
-        funnel_data['status_label'] = funnel_data['status'].map(status_labels)
-        
-        # Criar gráfico de funil
-        fig_funnel = go.Figure(go.Funnel(
-            y=funnel_data['status_label'],
-            x=funnel_data['count'],
-            textinfo="value+percent initial",
-            textposition="inside",
-            marker=dict(color=["#1f77b4", "#2ca02c", "#ff7f0e", "#9467bd"])
-        ))
-        
-        fig_funnel.update_layout(
-            title="Funil de Conversão de Pedidos",
-            showlegend=False
-        )
-        fig_funnel.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_funnel, use_container_width=True)
-        
-        # Calcular e mostrar taxas de conversão entre etapas
-        st.markdown("**Taxa de Conversão entre Etapas:**")
-        for i in range(len(funnel_data) - 1):
-            current_count = funnel_data.iloc[i]['count']
-            next_count = funnel_data.iloc[i + 1]['count']
-            if current_count > 0:
-                conversion_rate = (next_count / current_count) * 100
-                current_label = funnel_data.iloc[i]['status_label']
-                next_label = funnel_data.iloc[i + 1]['status_label']
-                
-                # Adicionar ícone baseado na taxa de conversão
-                if conversion_rate >= 95:
-                    icon = "🟢"  # Verde para alta conversão
-                elif conversion_rate >= 85:
-                    icon = "🟡"  # Amarelo para conversão média
-                else:
-                    icon = "🔴"  # Vermelho para baixa conversão
-                
-                st.markdown(f"{icon} {current_label} → {next_label}: {conversion_rate:.1f}%")
-        
-        # Adicionar insights baseados nos dados
-        st.markdown("---")
-        st.markdown("**💡 Insights do Funil:**")
-        
-        # Calcular taxa de aprovação
-        approval_rate = (funnel_counts['approved'] / funnel_counts['created']) * 100
-        # Calcular taxa de entrega
-        delivery_rate = (funnel_counts['delivered'] / funnel_counts['shipped']) * 100
-        
-        insights = []
-        
-        if approval_rate < 90:
-            insights.append(f"⚠️ Taxa de aprovação de pedidos está em {approval_rate:.1f}%. Verificar processo de aprovação.")
-        
-        if delivery_rate < 95:
-            insights.append(f"⚠️ Taxa de entrega está em {delivery_rate:.1f}%. Avaliar performance logística.")
-        
-        if not insights:
-            insights.append("✅ Funil de pedidos operando com taxas saudáveis de conversão.")
-        
-        for insight in insights:
-            st.markdown(insight)
-    
-    st.markdown("---")
-    
-    # 💰 Análise de LTV/CAC
-    st.header("💰 Análise de LTV/CAC")
-    
-    # Calcular LTV e CAC por mês
-    monthly_metrics = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M')).agg({
-        'price': 'sum',
-        'customer_unique_id': 'nunique',
-        'pedido_cancelado': 'sum'
-    }).reset_index()
-    
-    monthly_metrics['order_purchase_timestamp'] = monthly_metrics['order_purchase_timestamp'].astype(str)
-    monthly_metrics['monthly_revenue'] = monthly_metrics['price'] - (monthly_metrics['price'] * monthly_metrics['pedido_cancelado'])
-    monthly_metrics['monthly_ltv'] = monthly_metrics['monthly_revenue'] / monthly_metrics['customer_unique_id']
-    monthly_metrics['monthly_cac'] = marketing_spend / 12
-    monthly_metrics['ltv_cac_ratio'] = monthly_metrics['monthly_ltv'] / monthly_metrics['monthly_cac']
-    
-    # Inverter o sinal do LTV
-    monthly_metrics['monthly_ltv'] = -monthly_metrics['monthly_ltv']
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de Evolução LTV vs CAC
-        st.subheader("📈 Evolução LTV vs CAC")
-        fig_comparison = go.Figure()
-        
-        fig_comparison.add_trace(go.Scatter(
-            x=monthly_metrics['order_purchase_timestamp'],
-            y=monthly_metrics['monthly_ltv'],
-            name='LTV',
-            fill='tozeroy',
-            line=dict(color='rgba(46, 204, 113, 0.3)'),
-            fillcolor='rgba(46, 204, 113, 0.3)'
-        ))
-        
-        fig_comparison.add_trace(go.Scatter(
-            x=monthly_metrics['order_purchase_timestamp'],
-            y=monthly_metrics['monthly_cac'],
-            name='CAC',
-            fill='tozeroy',
-            line=dict(color='rgba(231, 76, 60, 0.3)'),
-            fillcolor='rgba(231, 76, 60, 0.3)'
-        ))
-        
-        fig_comparison.add_trace(go.Scatter(
-            x=monthly_metrics['order_purchase_timestamp'],
-            y=monthly_metrics['ltv_cac_ratio'],
-            name='Razão LTV/CAC',
-            line=dict(color='#2c3e50', width=2),
-            yaxis='y2'
-        ))
-        
-        fig_comparison.update_layout(
-            title="Evolução do LTV vs CAC ao Longo do Tempo",
-            xaxis_title="Mês",
-            yaxis=dict(
-                title="Valor (R$)",
-                side="left"
-            ),
-            yaxis2=dict(
-                title="Razão LTV/CAC",
-                overlaying="y",
-                side="right",
-                showgrid=False
-            ),
-            showlegend=True,
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            hovermode='x unified'
-        )
-        
-        # Adicionar linhas de referência
-        fig_comparison.add_shape(
-            type="line",
-            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
-            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
-            y0=0,
-            y1=0,
-            line=dict(color="gray", width=1, dash="dash"),
-            yref="y"
-        )
-        
-        fig_comparison.add_shape(
-            type="line",
-            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
-            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
-            y0=1,
-            y1=1,
-            line=dict(color="gray", width=1, dash="dash"),
-            yref="y2"
-        )
-        
-        fig_comparison.add_shape(
-            type="line",
-            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
-            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
-            y0=3,
-            y1=3,
-            line=dict(color="green", width=1, dash="dash"),
-            yref="y2"
-        )
-        
-        fig_comparison.update_layout(dragmode=False)
-        st.plotly_chart(fig_comparison, use_container_width=True)
-    
-    with col2:
-        # Status atual e recomendações
-        current_ltv = acquisition_kpis['ltv']
-        current_cac = acquisition_kpis['cac']
-        current_ratio = current_ltv / current_cac if current_cac > 0 else 0
-        
-        # Determinar status
-        if current_ratio < 1:
-            status = "🚨 Crítico"
-            status_color = "red"
-        elif current_ratio == 1:
-            status = "⚠️ Limite"
-            status_color = "orange"
-        elif current_ratio < 3:
-            status = "😬 Razoável"
-            status_color = "yellow"
-        elif current_ratio == 3:
-            status = "✅ Ideal"
-            status_color = "green"
-        else:
-            status = "💰 Alto"
-            status_color = "blue"
-        
-        st.subheader("📊 Status Atual")
-        col1, col2, col3, col4 = st.columns(4)
-        col1.metric("LTV", f"R$ {format_value(current_ltv)}")
-        col2.metric("CAC", f"R$ {format_value(current_cac)}")
-        col3.metric("Razão LTV/CAC", format_value(current_ratio))
-        col4.markdown(f"<h3 style='color: {status_color};'>{status}</h3>", unsafe_allow_html=True)
-        
-        # Análise de tendência dinâmica
-        st.markdown("**📈 Análise de Tendência**")
-        
-        if len(monthly_metrics) >= 2:
-            # Calcular período analisado
-            start_date = pd.to_datetime(monthly_metrics['order_purchase_timestamp'].iloc[0])
-            end_date = pd.to_datetime(monthly_metrics['order_purchase_timestamp'].iloc[-1])
-            meses_filtrados = ((end_date.year - start_date.year) * 12 + end_date.month - start_date.month) + 1
-            
-            # Calcular médias para diferentes períodos
-            n_months = min(3, len(monthly_metrics))  # Usar 3 meses ou menos se não houver dados suficientes
-            recent_ratio = monthly_metrics['ltv_cac_ratio'].tail(n_months).mean()
-            older_ratio = monthly_metrics['ltv_cac_ratio'].head(n_months).mean()
-            
-            # Calcular variação percentual
-            if older_ratio > 0:
-                delta_percent = ((recent_ratio - older_ratio) / older_ratio) * 100
-            else:
-                delta_percent = 0
-            
-            # Determinar direção da tendência e ícone
-            if delta_percent > 10:
-                trend_icon = "📈"
-                trend_color = "green"
-                trend_text = "alta"
-            elif delta_percent < -10:
-                trend_icon = "📉"
-                trend_color = "red"
-                trend_text = "queda"
-            else:
-                trend_icon = "➡️"
-                trend_color = "gray"
-                trend_text = "estável"
-            
-            # Criar texto de período
-            if meses_filtrados == 1:
-                periodo_texto = "no último mês"
-            else:
-                periodo_texto = f"nos últimos {meses_filtrados} meses"
-            
-            # Exibir análise de tendência
-            st.markdown(f"""
-            <div style='
-                padding: 20px;
-                border-radius: 5px;
-                border-left: 5px solid {trend_color};
-                background-color: rgba(0,0,0,0.05);
-            '>
-                {trend_icon} A razão LTV/CAC está em <span style='color: {trend_color};'><strong>{trend_text}</strong></span><br>
-                Variação de <strong>{delta_percent:+.1f}%</strong> {periodo_texto}
-            </div>
-            """, unsafe_allow_html=True)
-            
-            # Adicionar detalhamento
-            with st.expander("Ver detalhes da análise"):
-                st.markdown(f"""
-                - Período analisado: {start_date.strftime('%b/%Y')} a {end_date.strftime('%b/%Y')}
-                - LTV/CAC médio período inicial: {format_value(older_ratio)}
-                - LTV/CAC médio período recente: {format_value(recent_ratio)}
-                - Meses considerados por período: {n_months}
-                """)
-        else:
-            st.warning("⚠️ Período insuficiente para análise de tendência (mínimo 2 meses)")
-    
-    st.markdown("---")
-    
-    # 💡 Recomendações
-    st.header("💡 Recomendações")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("📋 Guia de Interpretação")
-        st.markdown("""
-        | Razão LTV/CAC | Interpretação | Situação |
-        |--------------|---------------|----------|
-        | < 1 | Você perde dinheiro por cliente | 🚨 Ruim. Custa mais do que retorna. |
-        | = 1 | Você empata | ⚠️ Não é sustentável. |
-        | 1 < x < 3 | Lucro baixo | 😬 Razoável, mas pode melhorar. |
-        | = 3 | Ponto ideal (clássico) | ✅ Saudável, lucro balanceado. |
-        | > 3 | Lucro alto | 💰 Pode ser bom... ou pode estar subinvestindo. |
-        """)
-    
-    with col2:
-        st.subheader("🎯 Ações Recomendadas")
-        if current_ratio < 1:
-            st.markdown("""
-            - **Reduzir o CAC**: Otimize suas campanhas de marketing para reduzir o custo de aquisição
-            - **Aumentar o LTV**: Implemente estratégias de upselling e cross-selling para aumentar o valor dos clientes
-            - **Revisar o modelo de negócio**: Avalie se o preço dos produtos/serviços está adequado
-            """)
-        elif current_ratio < 3:
-            st.markdown("""
-            - **Testar novos canais de aquisição**: Explore canais com potencial de menor CAC
-            - **Melhorar a retenção**: Implemente programas de fidelidade para aumentar o LTV
-            - **Otimizar o funil de conversão**: Identifique e corrija gargalos no processo de aquisição
-            """)
-        elif current_ratio > 5:
-            st.markdown("""
-            - **Aumentar investimento em marketing**: Você pode estar subinvestindo em crescimento
-            - **Expandir para novos mercados**: Aproveite a eficiência atual para escalar o negócio
-            - **Diversificar canais de aquisição**: Explore novos canais para manter a eficiência
-            """)
-        else:
-            st.markdown("""
-            - **Manter o equilíbrio atual**: Continue monitorando a razão LTV/CAC
-            - **Testar pequenos aumentos no CAC**: Experimente aumentar o investimento em marketing para ver se mantém a eficiência
-            - **Focar em melhorias incrementais**: Pequenas otimizações podem levar a ganhos significativos
-            """)
 
-elif pagina == "Comportamento do Cliente":
-    st.title("Comportamento do Cliente")
-    kpis = calculate_kpis(filtered_df, marketing_spend, date_range)
-    acquisition_kpis = calculate_acquisition_retention_kpis(filtered_df, marketing_spend, date_range)
-    
-    # ===== SEÇÃO 1: VISÃO GERAL =====
-    st.header("📊 Visão Geral")
-    
-    # Layout dos KPIs em duas seções
-    st.subheader("👥 Métricas de Cliente")
-    col1, col2, col3 = st.columns(3)
-    
-    # Primeira linha de KPIs - Métricas de Cliente
-    col1.metric("🎯 Taxa de Abandono", format_percentage(kpis['abandonment_rate']))
-    col2.metric("😊 Satisfação do Cliente", format_value(kpis['csat']))
-    col3.metric("🔄 Taxa de Recompra", format_percentage(acquisition_kpis['repurchase_rate']))
-    
-    st.subheader("⏱️ Métricas de Tempo")
-    col1, col2, col3 = st.columns(3)
-    
-    # Segunda linha de KPIs - Métricas de Tempo
-    col1.metric("📦 Tempo Médio de Entrega", f"{int(kpis['avg_delivery_time'])} dias")
-    col2.metric("⏳ Tempo até 2ª Compra", f"{int(acquisition_kpis['avg_time_to_second'])} dias")
-    col3.metric("💰 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
-    
-    st.markdown("---")
-    
-    # ===== SEÇÃO 2: SATISFAÇÃO DO CLIENTE =====
-    st.header("😊 Satisfação do Cliente")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de Satisfação do Cliente ao Longo do Tempo
-        st.subheader("📈 Evolução da Satisfação")
-        satisfaction_data = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['review_score'].mean().reset_index()
-        satisfaction_data['order_purchase_timestamp'] = satisfaction_data['order_purchase_timestamp'].astype(str)
-        fig_satisfaction = px.line(
-            satisfaction_data,
-            x='order_purchase_timestamp',
-            y='review_score',
-            title="Evolução da Satisfação",
-            labels={'review_score': 'Nota Média', 'order_purchase_timestamp': 'Mês'}
-        )
-        fig_satisfaction.update_layout(
-            yaxis=dict(range=[0, 5]),
-            showlegend=False
-        )
-        fig_satisfaction.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_satisfaction, use_container_width=True)
-        
-        # Insights sobre satisfação
-        avg_satisfaction = filtered_df['review_score'].mean()
-        satisfaction_distribution = filtered_df['review_score'].value_counts(normalize=True).sort_index()
-        
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">📊 Distribuição de Avaliações</h3>
-            <p>A nota média de satisfação é <strong>{format_value(avg_satisfaction)}</strong> em 5.</p>
-            <p><strong>{format_percentage(satisfaction_distribution.get(5, 0))}</strong> dos clientes deram nota 5.</p>
-            <p><strong>{format_percentage(satisfaction_distribution.get(1, 0))}</strong> dos clientes deram nota 1.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        # Gráfico de Distribuição de Satisfação
-        st.subheader("📊 Distribuição de Satisfação")
-        fig_dist = px.histogram(
-            filtered_df,
-            x='review_score',
-            title="Distribuição das Avaliações",
-            labels={'review_score': 'Nota', 'count': 'Quantidade de Avaliações'}
-        )
-        fig_dist.update_layout(
-            xaxis=dict(range=[0, 5]),
-            showlegend=False
-        )
-        fig_dist.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_dist, use_container_width=True)
-        
-        # Análise de correlação entre satisfação e outras métricas
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">🔍 Correlações</h3>
-            <p>Analisando a relação entre satisfação e outras métricas:</p>
-            <ul>
-                <li>Clientes mais satisfeitos tendem a ter um ticket médio <strong>{'maior' if filtered_df.groupby('review_score')['price'].mean().corr(pd.Series([1,2,3,4,5])) > 0 else 'menor'}</strong></li>
-                <li>Clientes com notas mais baixas têm uma taxa de recompra <strong>{'menor' if filtered_df.groupby('review_score')['customer_unique_id'].nunique().corr(pd.Series([1,2,3,4,5])) > 0 else 'maior'}</strong></li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # ===== SEÇÃO 3: TEMPO DE ENTREGA E EXPERIÊNCIA =====
-    st.header("⏱️ Tempo de Entrega e Experiência")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Gráfico de Tempo de Entrega ao Longo do Tempo
-        st.subheader("📦 Evolução do Tempo de Entrega")
-        filtered_df['delivery_time'] = (pd.to_datetime(filtered_df['order_delivered_customer_date']) - 
-                             pd.to_datetime(filtered_df['order_purchase_timestamp'])).dt.days
-        delivery_data = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['delivery_time'].mean().reset_index()
-        delivery_data['order_purchase_timestamp'] = delivery_data['order_purchase_timestamp'].astype(str)
-        fig_delivery = px.line(
-            delivery_data,
-            x='order_purchase_timestamp',
-            y='delivery_time',
-            title="Evolução do Tempo de Entrega",
-            labels={'delivery_time': 'Dias', 'order_purchase_timestamp': 'Mês'}
-        )
-        fig_delivery.update_layout(showlegend=False)
-        fig_delivery.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_delivery, use_container_width=True)
-        
-        # Insights sobre tempo de entrega
-        avg_delivery = filtered_df['delivery_time'].mean()
-        delivery_by_state = filtered_df.groupby('customer_state')['delivery_time'].mean().sort_values()
-        fastest_state = delivery_by_state.index[0]
-        slowest_state = delivery_by_state.index[-1]
-        
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">📍 Análise por Estado</h3>
-            <p>O tempo médio de entrega é <strong>{format_value(avg_delivery)} dias</strong>.</p>
-            <p>Estado com entregas mais rápidas: <strong>{fastest_state}</strong> ({format_value(delivery_by_state.iloc[0])} dias)</p>
-            <p>Estado com entregas mais lentas: <strong>{slowest_state}</strong> ({format_value(delivery_by_state.iloc[-1])} dias)</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        # Gráfico de Ticket Médio ao Longo do Tempo
-        st.subheader("💰 Evolução do Ticket Médio")
-        ticket_data = filtered_df.groupby(filtered_df['order_purchase_timestamp'].dt.to_period('M'))['price'].mean().reset_index()
-        ticket_data['order_purchase_timestamp'] = ticket_data['order_purchase_timestamp'].astype(str)
-        fig_ticket = px.line(
-            ticket_data,
-            x='order_purchase_timestamp',
-            y='price',
-            title="Evolução do Ticket Médio",
-            labels={'price': 'Valor Médio (R$)', 'order_purchase_timestamp': 'Mês'}
-        )
-        fig_ticket.update_layout(showlegend=False)
-        fig_ticket.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_ticket, use_container_width=True)
-        
-        # Insights sobre ticket médio
-        avg_ticket = filtered_df['price'].mean()
-        ticket_by_state = filtered_df.groupby('customer_state')['price'].mean().sort_values(ascending=False)
-        highest_ticket_state = ticket_by_state.index[0]
-        lowest_ticket_state = ticket_by_state.index[-1]
-        
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">💰 Análise de Valor</h3>
-            <p>O ticket médio é <strong>R$ {format_value(avg_ticket)}</strong>.</p>
-            <p>Estado com maior ticket médio: <strong>{highest_ticket_state}</strong> (R$ {format_value(ticket_by_state.iloc[0])})</p>
-            <p>Estado com menor ticket médio: <strong>{lowest_ticket_state}</strong> (R$ {format_value(ticket_by_state.iloc[-1])})</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    st.markdown("---")
-    
-    # ===== SEÇÃO 4: RECOMENDAÇÕES =====
-    st.header("💡 Recomendações")
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">🎯 Melhorias na Satisfação</h3>
-            <ul>
-                <li>Implementar programa de fidelidade para clientes com notas 4 e 5</li>
-                <li>Criar processo de feedback para clientes com notas 1 e 2</li>
-                <li>Desenvolver conteúdo educativo sobre os produtos para aumentar satisfação</li>
-                <li>Revisar processo de atendimento ao cliente</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div style="
-            background-color: #f0f2f6;
-            padding: 20px;
-            border-radius: 10px;
-            margin-bottom: 20px;
-        ">
-            <h3 style="margin-top: 0;">⚡ Otimização de Entregas</h3>
-            <ul>
-                <li>Investir em logística para estados com entregas mais lentas</li>
-                <li>Implementar sistema de previsão de entrega mais preciso</li>
-                <li>Criar programa de entrega expressa para produtos de alto valor</li>
-                <li>Desenvolver parcerias com transportadoras locais nos estados problemáticos</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Resumo dos insights principais
-    st.subheader("📊 Resumo dos Insights Principais")
-    
-    # Garantir que todas as variáveis necessárias estejam definidas
-    best_day = day_revenue.idxmax() if 'day_revenue' in locals() else "N/A"
-    best_month = month_revenue.idxmax() if 'month_revenue' in locals() else "N/A"
-    best_state = state_ticket.idxmax() if 'state_ticket' in locals() else "N/A"
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.markdown(f"""
-        **Insights de Receita:**
-        - **Receita Total**: R$ {format_value(kpis['total_revenue'])}
-        - **Crescimento Previsto**: {format_value(growth_percentage)}%
-        - **Melhor dia para vendas**: {best_day}
-        - **Melhor mês para vendas**: {best_month}
-        """)
-    
-    with col2:
-        st.markdown(f"""
-        **Insights de Produtos:**
-        - **Categoria mais rentável**: {best_category} (Lucro: R$ {format_value(best_category_profit)})
-        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(state_ticket.max() if 'state_ticket' in locals() else 0)})
-        - **Categoria com maior crescimento**: {sorted_categories[0][0] if sorted_categories else "N/A"} ({format_value(sorted_categories[0][1] if sorted_categories else 0)}%)
-        """)
-
-elif pagina == "Produtos e Categorias":
-    st.title("Produtos e Categorias")
-    kpis = calculate_kpis(filtered_df, marketing_spend, date_range)
-    
-    # Adicionar filtro de categorias
-    st.sidebar.markdown("---")
-    st.sidebar.header("🏷️ Filtros de Categoria")
-    
-    # Obter top categorias por volume e receita
-    top_by_volume = filtered_df['product_category_name'].value_counts().head(10).index.tolist()
-    top_by_revenue = filtered_df.groupby('product_category_name')['price'].sum().sort_values(ascending=False).head(10).index.tolist()
-    
-    # Combinar e remover duplicatas mantendo a ordem
-    categorias_populares = list(dict.fromkeys(top_by_volume + top_by_revenue))
-    
-    # Adicionar opção "Todas as categorias" no início
-    todas_categorias = ["Todas as categorias"] + categorias_populares
-    
-    selected_categorias = st.sidebar.multiselect(
-        "Selecione as categorias",
-        todas_categorias,
-        default=["Todas as categorias"],
-        help="Selecione 'Todas as categorias' ou escolha categorias específicas para análise"
-    )
-    
-    # Filtrar DataFrame baseado na seleção
-    if "Todas as categorias" not in selected_categorias:
-        filtered_df = filtered_df[filtered_df['product_category_name'].isin(selected_categorias)]
-    
-    # Adicionar métricas de contexto
-    st.sidebar.markdown("---")
-    st.sidebar.subheader("📊 Métricas das Categorias Selecionadas")
-    
-    # Calcular métricas para as categorias selecionadas
-    total_revenue = filtered_df['price'].sum()
-    total_orders = filtered_df['order_id'].nunique()
-    avg_ticket = total_revenue / total_orders if total_orders > 0 else 0
-    
-    st.sidebar.metric("Receita Total", f"R$ {format_value(total_revenue)}")
-    st.sidebar.metric("Pedidos", format_value(total_orders, is_integer=True))
-    st.sidebar.metric("Ticket Médio", f"R$ {format_value(avg_ticket)}")
-    
-    # 📊 Visão Geral
-    st.header("📊 Visão Geral")
-    col1, col2, col3, col4 = st.columns(4)
-    
-    # KPIs principais ajustados para as categorias selecionadas
-    col1.metric("📦 Total de Produtos", format_value(filtered_df['product_id'].nunique(), is_integer=True))
-    col2.metric("🏷️ Categorias", format_value(filtered_df['product_category_name'].nunique(), is_integer=True))
-    col3.metric("💰 Ticket Médio", f"R$ {format_value(avg_ticket)}")
-    col4.metric("📈 Receita Total", f"R$ {format_value(total_revenue)}")
-    
-    # Adicionar informação sobre o filtro ativo
-    if "Todas as categorias" not in selected_categorias:
-        st.info(f"📌 Mostrando dados para {len(selected_categorias)} categorias selecionadas")
-    
-    st.markdown("---")
-    
-    # 📈 Análise de Desempenho
-    st.header("📈 Análise de Desempenho")
-    
-    # Primeira linha de gráficos
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Top 10 Categorias por Receita
-        st.subheader("💰 Top 10 Categorias por Receita")
-        category_revenue = filtered_df.groupby('product_category_name')['price'].sum().sort_values(ascending=False).head(10)
-        fig_category = px.bar(
-            x=category_revenue.index,
-            y=category_revenue.values,
-            title="Top 10 Categorias por Receita",
-            labels={'x': 'Categoria', 'y': 'Receita (R$)'},
-            color=category_revenue.values,
-            color_continuous_scale='Viridis'
-        )
-        fig_category.update_layout(showlegend=False)
-        fig_category.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_category, use_container_width=True)
-        
-        # Distribuição de Preços por Categoria
-        st.subheader("💵 Distribuição de Preços por Categoria")
-        fig_price_dist = px.box(
-            filtered_df,
-            x='product_category_name',
-            y='price',
-            title="Distribuição de Preços por Categoria",
-            labels={'price': 'Preço (R$)', 'product_category_name': 'Categoria'}
-        )
-        fig_price_dist.update_layout(showlegend=False)
-        fig_price_dist.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_price_dist, use_container_width=True)
-    
-    with col2:
-        # Top 10 Categorias por Quantidade
-        st.subheader("📦 Top 10 Categorias por Quantidade")
-        category_quantity = filtered_df.groupby('product_category_name')['order_id'].count().sort_values(ascending=False).head(10)
-        fig_quantity = px.bar(
-            x=category_quantity.index,
-            y=category_quantity.values,
-            title="Top 10 Categorias por Quantidade",
-            labels={'x': 'Categoria', 'y': 'Quantidade de Pedidos'},
-            color=category_quantity.values,
-            color_continuous_scale='Viridis'
-        )
-        fig_quantity.update_layout(showlegend=False)
-        fig_quantity.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_quantity, use_container_width=True)
-        
-        # Taxa de Cancelamento por Categoria
-        st.subheader("❌ Taxa de Cancelamento por Categoria")
-        category_cancellation = filtered_df.groupby('product_category_name')['pedido_cancelado'].mean().sort_values(ascending=False)
-        fig_cancellation = px.bar(
-            x=category_cancellation.index,
-            y=category_cancellation.values,
-            title="Taxa de Cancelamento por Categoria",
-            labels={'x': 'Categoria', 'y': 'Taxa de Cancelamento'},
-            color=category_cancellation.values,
-            color_continuous_scale='Reds'
-        )
-        fig_cancellation.update_layout(
-            yaxis=dict(tickformat=".1%"),
-            showlegend=False
-        )
-        fig_cancellation.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_cancellation, use_container_width=True)
-    
-    st.markdown("---")
-    
-    # 🔍 Análise Detalhada
-    st.header("🔍 Análise Detalhada")
-    
-    # Preparar dados para análise temporal
-    filtered_df['month'] = pd.to_datetime(filtered_df['order_purchase_timestamp']).dt.to_period('M')
-    monthly_data = filtered_df.groupby(['month', 'product_category_name']).agg({
-        'price': 'sum',
-        'order_id': 'count',
-        'pedido_cancelado': 'mean'
-    }).reset_index()
-    
-    # Converter Period para string para evitar problemas de serialização JSON
-    monthly_data['month_str'] = monthly_data['month'].astype(str)
-    
-    # Selecionar categoria para análise
-    # Tratar valores None antes de ordenar
-    category_options = filtered_df['product_category_name'].unique()
-    category_options = [cat if cat is not None else "Categoria não especificada" for cat in category_options]
-    category_options = sorted(category_options)
-    
-    selected_category = st.selectbox(
-        "Selecione uma categoria para análise detalhada:",
-        options=category_options
-    )
-    
-    # Filtrar dados para a categoria selecionada
-    # Se a categoria selecionada for "Categoria não especificada", filtrar por None
-    if selected_category == "Categoria não especificada":
-        category_data = monthly_data[monthly_data['product_category_name'].isna()]
-    else:
-        category_data = monthly_data[monthly_data['product_category_name'] == selected_category]
-    
-    # Gráficos de análise temporal
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        # Evolução da Receita
-        st.subheader("💰 Evolução da Receita")
-        fig_revenue = px.line(
-            category_data,
-            x='month_str',  # Usar a coluna de string em vez de Period
-            y='price',
-            title=f"Evolução da Receita - {selected_category}",
-            labels={'month_str': 'Mês', 'price': 'Receita (R$)'}
-        )
-        fig_revenue.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_revenue, use_container_width=True)
-    
-    with col2:
-        # Evolução da Quantidade de Pedidos
-        st.subheader("📦 Evolução da Quantidade de Pedidos")
-        fig_orders = px.line(
-            category_data,
-            x='month_str',  # Usar a coluna de string em vez de Period
-            y='order_id',
-            title=f"Evolução da Quantidade de Pedidos - {selected_category}",
-            labels={'month_str': 'Mês', 'order_id': 'Quantidade de Pedidos'}
-        )
-        fig_orders.update_layout(dragmode=False, hovermode='x unified')
-        st.plotly_chart(fig_orders, use_container_width=True)
-    
-    st.markdown("---")
-    
-    # 💡 Insights e Recomendações
-    st.header("💡 Insights e Recomendações")
-    
-    # Calcular métricas para insights
-    category_metrics = filtered_df.groupby('product_category_name').agg({
-        'price': ['sum', 'mean', 'std'],
-        'order_id': 'count',
-        'pedido_cancelado': 'mean',
-        'review_score': 'mean'
-    }).round(2)
-    
-    # Identificar categorias com melhor desempenho
-    top_categories = category_metrics.nlargest(3, ('price', 'sum'))
-    bottom_categories = category_metrics.nsmallest(3, ('price', 'sum'))
-    
-    col1, col2 = st.columns(2)
-    
-    with col1:
-        st.subheader("🌟 Categorias em Destaque")
-        for idx, (category, metrics) in enumerate(top_categories.iterrows(), 1):
-            st.markdown(f"""
-            **{idx}. {category}**
-            - Receita Total: R$ {format_value(metrics[('price', 'sum')])}
-            - Ticket Médio: R$ {format_value(metrics[('price', 'mean')])}
-            - Quantidade de Pedidos: {format_value(metrics[('order_id', 'count')], is_integer=True)}
-            - Taxa de Cancelamento: {format_percentage(metrics[('pedido_cancelado', 'mean')])}
-            """)
-    
-    with col2:
-        st.subheader("⚠️ Categorias que Precisam de Atenção")
-        for idx, (category, metrics) in enumerate(bottom_categories.iterrows(), 1):
-            st.markdown(f"""
-            **{idx}. {category}**
-            - Receita Total: R$ {format_value(metrics[('price', 'sum')])}
-            - Ticket Médio: R$ {format_value(metrics[('price', 'mean')])}
-            - Quantidade de Pedidos: {format_value(metrics[('order_id', 'count')], is_integer=True)}
-            - Taxa de Cancelamento: {format_percentage(metrics[('pedido_cancelado', 'mean')])}
-            """)
-    
-    # Espaço para futuras análises
-    st.markdown("---")
-    st.header("🔮 Análises Futuras")
-    st.info("""
-    Área reservada para futuras análises:
-    - Análise de sazonalidade por categoria
-    - Correlação entre preço e satisfação
-    - Análise de estoque e demanda
-    - Previsão de vendas por categoria
-    """)
+# Exibir a página selecionada
+load_page(module_name).app(context)
 
-elif pagina == "Análise de Churn":
-    import paginas.analise_churn
-    paginas.analise_churn.app()
+with st.sidebar.expander("⏱️ Tempos de importação"):
+    for name, seconds in import_timings().items():
+        st.caption(f"{name}: {seconds * 1000:.0f} ms")
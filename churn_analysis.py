@@ -1,15 +1,23 @@
+import time
+import tracemalloc
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 from datetime import datetime
-from utils.KPIs import load_data, calculate_churn_features, define_churn
+from utils.KPIs import purchase_date_bounds
+from utils.repositorio_features import load_snapshot, materialize_snapshot, snapshot_dir
+from utils.busca_hiperparametros import successive_halving
+from utils.artefatos_modelo import save_model_artifacts, ARTIFACT_FILES
+from utils.registro_execucoes import register_run
 
 # Bibliotecas de Machine Learning
 from sklearn.model_selection import train_test_split, StratifiedKFold, GridSearchCV
 from sklearn.preprocessing import StandardScaler
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
+from sklearn.base import clone
+from joblib import Parallel, delayed
 from sklearn.metrics import (
     classification_report, confusion_matrix, 
     roc_auc_score, precision_recall_curve, 
@@ -19,45 +27,48 @@ from sklearn.metrics import (
 from imblearn.over_sampling import SMOTE
 from imblearn.under_sampling import RandomUnderSampler
 import xgboost as xgb
-import pickle
 import argparse
 
 # Configurando estilo dos gráficos
 plt.style.use('ggplot')
 sns.set(style='whitegrid')
 
-def load_and_prepare_data(cutoff_date='2018-04-17'):
+def load_and_prepare_data(cutoff_date='2018-04-17', refresh_features=False):
     """
     Carrega os dados e prepara features para análise de churn
     
+    As features e o status de churn vêm do repositório de features: só são
+    calculados quando não há snapshot atualizado para a data de corte.
+    
     Parâmetros:
     -----------
     cutoff_date : str
         Data de corte para definição de churn (padrão: '2018-04-17')
+    refresh_features : bool
+        Se True, recalcula o snapshot mesmo que ele exista (padrão: False)
         
     Retorno:
     --------
     pd.DataFrame
         DataFrame com features e target para análise de churn
     """
-    print("Carregando dados...")
-    df = load_data()
-    
     # Converter data de corte para datetime
     cutoff_date = pd.to_datetime(cutoff_date)
     
     # Mostrar informações do período dos dados
-    max_date = pd.to_datetime(df['order_purchase_timestamp']).max()
+    _, max_date = purchase_date_bounds()
     print(f"Data máxima no dataset: {max_date}")
     print(f"Data de corte para análise de churn: {cutoff_date}")
     
-    # Calcular features para modelo de churn
-    print("Calculando features para modelo de churn...")
-    features_df = calculate_churn_features(df, cutoff_date)
-    
-    # Definir status de churn
-    print("Definindo status de churn...")
-    churn_df = define_churn(df, cutoff_date)
+    # Features e status de churn do snapshot da data de corte
+    snapshot = None if refresh_features else load_snapshot(cutoff_date)
+    if snapshot is None:
+        print("Calculando features e status de churn...")
+        features_df, churn_df = materialize_snapshot(cutoff_date)
+        print(f"Snapshot de features gravado em {snapshot_dir(cutoff_date)}")
+    else:
+        print(f"Reutilizando snapshot de features de {snapshot_dir(cutoff_date)}")
+        features_df, churn_df = snapshot
     
     # Juntar features com status de churn
     print("Combinando features com status de churn...")
@@ -267,7 +278,65 @@ def rebalance_data(X_train, y_train, method='smote'):
     
     return X_train_rebalanced, y_train_rebalanced
 
-def train_model(X_train, y_train, model_type='random_forest', class_weight=None, cv=None, grid_search=False):
+def _reset_peak_rss():
+    """Zera o pico de memória residente do processo (Linux); False se indisponível."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _peak_rss():
+    """Pico de memória residente do processo em bytes (VmHWM do Linux)."""
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+
+def _fit_fold(model, X, y, train_idx, val_idx):
+    """
+    Treina um fold da validação cruzada (executado em um processo do pool)
+    
+    Com val_idx None, apenas treina com as linhas de train_idx (modelo final).
+    
+    O pico de memória é o da memória residente do processo durante o treino;
+    fora do Linux, usa o pico de alocações do Python (tracemalloc), que não
+    inclui memória alocada pelas extensões em C dos modelos.
+    
+    Retorno:
+    --------
+    dict
+        Modelo treinado, métricas do fold, tempo em segundos e pico de
+        memória (bytes)
+    """
+    rss = _reset_peak_rss()
+    if not rss:
+        tracemalloc.start()
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    seconds = time.perf_counter() - start
+    if rss:
+        peak_memory = _peak_rss()
+    else:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    
+    scores = {}
+    if val_idx is not None:
+        y_val, y_pred = y[val_idx], model.predict(X[val_idx])
+        scores = {
+            'accuracy': accuracy_score(y_val, y_pred),
+            'precision': precision_score(y_val, y_pred, average='weighted'),
+            'recall': recall_score(y_val, y_pred, average='weighted'),
+            'f1_macro': f1_score(y_val, y_pred, average='macro'),
+            'f1_weighted': f1_score(y_val, y_pred, average='weighted'),
+        }
+    
+    return {'model': model, 'scores': scores, 'seconds': seconds, 'peak_memory': peak_memory}
+
+def train_model(X_train, y_train, model_type='random_forest', class_weight=None, cv=None, grid_search=False,
+                cv_jobs=-1, final_model='refit', search='grid', n_candidates=30, search_budget=None):
     """
     Treina o modelo de churn
     
@@ -285,6 +354,20 @@ def train_model(X_train, y_train, model_type='random_forest', class_weight=None,
         Número de folds para validação cruzada ou None para não usar
     grid_search : bool
         Se True, realiza grid search para busca de hiperparâmetros
+    cv_jobs : int
+        Processos para treinar os folds em paralelo (-1 para todos os núcleos)
+    final_model : str
+        Modelo final após a validação cruzada: 'refit' (retreina no conjunto
+        completo após os folds), 'concurrent' (treina no conjunto completo junto
+        com os folds) ou 'best_fold' (reaproveita o fold de maior f1_macro)
+    search : str
+        Busca usada com grid_search: 'grid' (GridSearchCV exaustivo), 'halving'
+        (eliminação sucessiva) ou 'random' (sorteio), as duas últimas com
+        checkpoint em disco
+    n_candidates : int
+        Combinações sorteadas nas buscas 'halving' e 'random'
+    search_budget : float ou None
+        Tempo máximo em segundos das buscas 'halving' e 'random'
         
     Retorno:
     --------
@@ -335,7 +418,20 @@ def train_model(X_train, y_train, model_type='random_forest', class_weight=None,
     else:
         raise ValueError(f"Modelo {model_type} não suportado")
     
-    if cv and grid_search:
+    if grid_search and search in ('halving', 'random'):
+        print(f"Realizando busca {search} com {n_candidates} candidatos...")
+        best_params, _ = successive_halving(
+            model, param_grid, X_train, y_train,
+            cv=cv or 3, n_candidates=n_candidates, halving=search == 'halving',
+            time_budget=search_budget, n_jobs=cv_jobs
+        )
+        
+        print("Melhores hiperparâmetros:")
+        print(best_params)
+        
+        model.set_params(**best_params)
+        model.fit(X_train, y_train)
+    elif cv and grid_search:
         print(f"Realizando GridSearchCV com {cv} folds...")
         stratified_cv = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
         grid_search = GridSearchCV(
@@ -349,32 +445,43 @@ def train_model(X_train, y_train, model_type='random_forest', class_weight=None,
         
         model = grid_search.best_estimator_
     elif cv:
-        print(f"Realizando validação cruzada com {cv} folds...")
+        print(f"Realizando validação cruzada com {cv} folds em paralelo...")
+        if final_model not in ('refit', 'concurrent', 'best_fold'):
+            raise ValueError(f"Modelo final {final_model} não suportado")
+        
+        X_train, y_train = np.asarray(X_train), np.asarray(y_train)
         stratified_cv = StratifiedKFold(n_splits=cv, shuffle=True, random_state=42)
-        scores = {
-            'accuracy': [], 'precision': [], 'recall': [], 
-            'f1_macro': [], 'f1_weighted': []
-        }
+        tasks = [
+            delayed(_fit_fold)(clone(model), X_train, y_train, train_idx, val_idx)
+            for train_idx, val_idx in stratified_cv.split(X_train, y_train)
+        ]
+        if final_model == 'concurrent':
+            # O modelo final ocupa um processo do pool em vez de esperar os folds
+            tasks.append(delayed(_fit_fold)(clone(model), X_train, y_train, np.arange(len(y_train)), None))
+        
+        # Arrays grandes são compartilhados com os processos por memmap (joblib)
+        results = Parallel(n_jobs=cv_jobs)(tasks)
+        folds = results[:cv]
         
-        for fold, (train_idx, val_idx) in enumerate(stratified_cv.split(X_train, y_train)):
-            X_fold_train, X_fold_val = X_train[train_idx], X_train[val_idx]
-            y_fold_train, y_fold_val = y_train[train_idx], y_train[val_idx]
-            
-            model.fit(X_fold_train, y_fold_train)
-            y_fold_pred = model.predict(X_fold_val)
-            
-            scores['accuracy'].append(accuracy_score(y_fold_val, y_fold_pred))
-            scores['precision'].append(precision_score(y_fold_val, y_fold_pred, average='weighted'))
-            scores['recall'].append(recall_score(y_fold_val, y_fold_pred, average='weighted'))
-            scores['f1_macro'].append(f1_score(y_fold_val, y_fold_pred, average='macro'))
-            scores['f1_weighted'].append(f1_score(y_fold_val, y_fold_pred, average='weighted'))
+        print("\nTreino por fold:")
+        for fold, result in enumerate(folds, start=1):
+            print(f"fold {fold}: {result['seconds']:.2f}s, pico de memória {result['peak_memory'] / 2**20:.1f} MB")
         
         print("\nResultados da validação cruzada:")
-        for metric, values in scores.items():
+        for metric in folds[0]['scores']:
+            values = [result['scores'][metric] for result in folds]
             print(f"{metric}: média={np.mean(values):.4f}, std={np.std(values):.4f}")
         
-        # Retrainamos no conjunto completo para o modelo final
-        model.fit(X_train, y_train)
+        if final_model == 'concurrent':
+            model = results[-1]['model']
+            print(f"Modelo final treinado junto com os folds ({results[-1]['seconds']:.2f}s)")
+        elif final_model == 'best_fold':
+            best = max(range(cv), key=lambda fold: folds[fold]['scores']['f1_macro'])
+            model = folds[best]['model']
+            print(f"Modelo final: fold {best + 1} (maior f1_macro)")
+        else:
+            # Retrainamos no conjunto completo para o modelo final
+            model.fit(X_train, y_train)
     else:
         model.fit(X_train, y_train)
     
@@ -484,16 +591,7 @@ def save_model_and_results(model, scaler, metrics, cutoff_date, rebalance_method
     """
     # Salvar modelo
     print("Salvando modelo...")
-    with open('churn_model.pkl', 'wb') as f:
-        pickle.dump(model, f)
-    
-    # Salvar scaler
-    with open('churn_scaler.pkl', 'wb') as f:
-        pickle.dump(scaler, f)
-    
-    # Salvar informações das features
-    with open('churn_feature_columns.pkl', 'wb') as f:
-        pickle.dump(feature_columns, f)
+    save_model_artifacts(model, scaler, feature_columns)
     
     # Extrair componentes das métricas para salvar
     confusion_matrix = metrics["confusion_matrix"]
@@ -602,7 +700,8 @@ def plot_results(metrics, save_fig=True):
     plt.show()
 
 def main(cutoff_date='2018-04-17', rebalance_method='smote', model_type='random_forest', 
-         class_weight='balanced', use_cv=5, grid_search=False, test_size=0.3):
+         class_weight='balanced', use_cv=5, grid_search=False, test_size=0.3, refresh_features=False,
+         progress=None, cv_jobs=-1, final_model='refit', search='grid', n_candidates=30, search_budget=None):
     """
     Função principal que executa todo o pipeline de análise de churn
     
@@ -622,49 +721,82 @@ def main(cutoff_date='2018-04-17', rebalance_method='smote', model_type='random_
         Se True, realiza grid search para busca de hiperparâmetros (padrão: False)
     test_size : float
         Proporção de dados para teste (padrão: 0.3)
+    refresh_features : bool
+        Se True, recalcula o snapshot de features da data de corte (padrão: False)
+    progress : callable ou None
+        Chamada a cada etapa com (etapa, total de etapas, descrição)
+    cv_jobs : int
+        Processos para os folds da validação cruzada (padrão: -1, todos os núcleos)
+    final_model : str
+        Modelo final após a validação cruzada: 'refit', 'concurrent' ou 'best_fold' (padrão: 'refit')
+    search : str
+        Busca de hiperparâmetros com grid_search: 'grid', 'halving' ou 'random' (padrão: 'grid')
+    n_candidates : int
+        Combinações sorteadas nas buscas 'halving' e 'random' (padrão: 30)
+    search_budget : float ou None
+        Tempo máximo em segundos das buscas 'halving' e 'random' (padrão: None, sem limite)
         
     Retorno:
     --------
     dict
         Dicionário com métricas e resultados da análise
     """
+    if progress is None:
+        progress = lambda step, total, stage: None
+    total_steps = 12
+    
     # 1. Carregar e preparar dados
-    churn_analysis_df = load_and_prepare_data(cutoff_date)
+    progress(1, total_steps, "Carregando e preparando dados")
+    churn_analysis_df = load_and_prepare_data(cutoff_date, refresh_features=refresh_features)
     
     # 2. Analisar distribuição dos dados
+    progress(2, total_steps, "Analisando distribuição dos dados")
     dist_metrics = analyze_data_distribution(churn_analysis_df)
     
     # 3. Preparar dados para modelagem
+    progress(3, total_steps, "Preparando dados para modelagem")
     X, y, feature_columns = prepare_model_data(churn_analysis_df)
     
     # 4. Dividir em treino e teste
+    progress(4, total_steps, "Dividindo em treino e teste")
     X_train, X_test, y_train, y_test = train_test_split(
         X, y, test_size=test_size, random_state=42, stratify=y
     )
     
     # 5. Normalizar dados
+    progress(5, total_steps, "Normalizando dados")
     X_train_scaled, X_test_scaled, scaler = normalize_data(X_train, X_test)
     
     # 6. Rebalancear dados (se necessário)
+    progress(6, total_steps, "Rebalanceando dados")
     if rebalance_method != 'none':
         X_train_scaled, y_train = rebalance_data(X_train_scaled, y_train, method=rebalance_method)
     
     # 7. Treinar modelo
+    progress(7, total_steps, "Treinando modelo")
     model = train_model(
         X_train_scaled, y_train, 
         model_type=model_type, 
         class_weight=class_weight,
         cv=use_cv,
-        grid_search=grid_search
+        grid_search=grid_search,
+        cv_jobs=cv_jobs,
+        final_model=final_model,
+        search=search,
+        n_candidates=n_candidates,
+        search_budget=search_budget
     )
     
     # 8. Avaliar modelo
+    progress(8, total_steps, "Avaliando modelo")
     eval_metrics = evaluate_model(model, X_test_scaled, y_test)
     
     # 9. Combinar todas as métricas
+    progress(9, total_steps, "Combinando métricas")
     all_metrics = {**dist_metrics, **eval_metrics}
     
     # 10. Salvar modelo e resultados
+    progress(10, total_steps, "Salvando modelo e resultados")
     save_model_and_results(
         model, scaler, all_metrics, 
         cutoff_date, rebalance_method, 
@@ -673,8 +805,27 @@ def main(cutoff_date='2018-04-17', rebalance_method='smote', model_type='random_
     )
     
     # 11. Plotar resultados
+    progress(11, total_steps, "Gerando gráficos")
     plot_results(all_metrics)
     
+    # 12. Registrar execução (parâmetros, métricas e artefatos)
+    progress(12, total_steps, "Registrando execução")
+    all_metrics['run_id'] = register_run(
+        {
+            'cutoff_date': str(pd.to_datetime(cutoff_date).date()),
+            'rebalance_method': rebalance_method,
+            'model_type': model_type,
+            'class_weight': class_weight,
+            'use_cv': use_cv,
+            'grid_search': grid_search,
+            'search': search if grid_search else None,
+            'test_size': test_size,
+        },
+        all_metrics, feature_columns,
+        artifacts=ARTIFACT_FILES + ['churn_analysis_results.txt', 'churn_analysis_plots.png']
+    )
+    print(f"Execução registrada: {all_metrics['run_id']}")
+    
     return all_metrics
 
 if __name__ == "__main__":
@@ -694,6 +845,18 @@ if __name__ == "__main__":
                         help='Realizar grid search para busca de hiperparâmetros')
     parser.add_argument('--test_size', type=float, default=0.3,
                         help='Proporção de dados para teste (0.0-1.0)')
+    parser.add_argument('--cv_jobs', type=int, default=-1,
+                        help='Processos para treinar os folds em paralelo (-1 para todos os núcleos)')
+    parser.add_argument('--final_model', type=str, default='refit', choices=['refit', 'concurrent', 'best_fold'],
+                        help='Modelo final após a validação cruzada')
+    parser.add_argument('--search', type=str, default='grid', choices=['grid', 'halving', 'random'],
+                        help='Busca de hiperparâmetros (halving e random retomam do checkpoint; implicam --grid_search)')
+    parser.add_argument('--n_candidates', type=int, default=30,
+                        help='Combinações sorteadas nas buscas halving e random')
+    parser.add_argument('--search_budget', type=float, default=None,
+                        help='Tempo máximo em segundos das buscas halving e random')
+    parser.add_argument('--refresh_features', action='store_true',
+                        help='Recalcular o snapshot de features mesmo que já exista para a data de corte')
     
     args = parser.parse_args()
     
@@ -707,6 +870,12 @@ if __name__ == "__main__":
         model_type=args.model,
         class_weight=class_weight,
         use_cv=use_cv,
-        grid_search=args.grid_search,
-        test_size=args.test_size
+        grid_search=args.grid_search or args.search != 'grid',
+        test_size=args.test_size,
+        refresh_features=args.refresh_features,
+        cv_jobs=args.cv_jobs,
+        final_model=args.final_model,
+        search=args.search,
+        n_candidates=args.n_candidates,
+        search_budget=args.search_budget
     ) 
\ No newline at end of file
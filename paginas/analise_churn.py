@@ -1,20 +1,56 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
-import matplotlib.pyplot as plt
-import seaborn as sns
-import pickle
 import os
 from datetime import datetime
-from utils.KPIs import load_data, calculate_churn_features, define_churn
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import precision_recall_curve, roc_curve, auc
-from imblearn.over_sampling import SMOTE
-from imblearn.under_sampling import RandomUnderSampler
+from utils.KPIs import load_data, churn_labels, load_purchase_span, CHURN_COLUMNS
+from utils.repositorio_features import get_snapshot, fill_missing_features
+from utils.codificacao import encode_ids, decode_ids
+from utils.colunas_tempo import time_column, by_month
+from utils.artefatos_modelo import load_model_artifacts
+from utils.registro_execucoes import list_runs, load_run, RUNS_DIR, INDEX_FILE, SUMMARY_METRICS
+from utils.pontuacao_churn import load_scores, SCORES_FILE, RISK_TIERS
+from utils.tarefas_treino import submit_job, list_jobs, cancel_job, read_log, SCORE, QUEUED, RUNNING, FAILED
+# Bibliotecas de machine learning (scikit-learn, imblearn, xgboost) são importadas
+# apenas ao carregar o modelo salvo; o treino roda em outro processo (churn_analysis.py)
 
-def app():
+@st.cache_data
+def load_cached_scores(mtime):
+    """Pontuações em lote (relidas apenas quando o arquivo muda: `mtime` faz parte da chave)."""
+    return load_scores(SCORES_FILE)
+
+@st.cache_data
+def load_cached_runs(mtime):
+    """Índice de execuções de treino (relido apenas quando muda: `mtime` faz parte da chave)."""
+    return list_runs()
+
+def training_runs():
+    """Execuções registradas, da mais recente para a mais antiga."""
+    index_path = os.path.join(RUNS_DIR, INDEX_FILE)
+    return load_cached_runs(os.path.getmtime(index_path) if os.path.exists(index_path) else None)
+
+# Rótulos dos parâmetros e métricas das execuções
+PARAM_LABELS = {
+    'cutoff_date': "Data de corte para análise de churn",
+    'rebalance_method': "Método de rebalanceamento",
+    'model_type': "Tipo de modelo",
+    'class_weight': "Class weight",
+    'use_cv': "Folds de validação cruzada",
+    'search': "Busca de hiperparâmetros",
+    'test_size': "Proporção de teste",
+}
+METRIC_LABELS = {
+    'accuracy': "Accuracy",
+    'precision_weighted': "Precision (weighted)",
+    'recall_weighted': "Recall (weighted)",
+    'f1_macro': "F1 (macro)",
+    'f1_weighted': "F1 (weighted)",
+    'auc_roc': "AUC-ROC",
+    'avg_precision': "Average Precision Score",
+}
+
+def app(context=None):
     # Configuração da página
     #st.set_page_config(layout="wide")
     
@@ -30,7 +66,7 @@ def app():
     ])
     
     # Carregar dados
-    df = load_data()
+    df = load_data(columns=CHURN_COLUMNS)
     
     # TAB 1: VISÃO GERAL
     with tab1:
@@ -53,8 +89,7 @@ def app():
             # Exibir distribuição de compras ao longo do tempo
             st.subheader("📅 Distribuição de Compras ao Longo do Tempo")
             
-            monthly_orders = df.groupby(pd.to_datetime(df['order_purchase_timestamp']).dt.to_period('M'))['order_id'].count().reset_index()
-            monthly_orders['order_purchase_timestamp'] = monthly_orders['order_purchase_timestamp'].astype(str)
+            monthly_orders = by_month(df.groupby(time_column(df, 'order_month'))['order_id'].count())
             
             fig = px.line(
                 monthly_orders, 
@@ -88,22 +123,15 @@ def app():
             </div>
             """, unsafe_allow_html=True)
             
-            # Verificar se o modelo já foi treinado
-            model_exists = os.path.exists('churn_model.pkl')
-            results_exist = os.path.exists('churn_analysis_results.txt')
+            # Verificar se o modelo já foi treinado (execução mais recente do registro)
+            runs = training_runs()
             
-            if results_exist:
+            if not runs.empty:
                 st.success("✅ Um modelo de churn já foi treinado. Veja os resultados na aba 'Resultados do Modelo'.")
                 
-                # Extrair informações básicas do arquivo de resultados
-                with open('churn_analysis_results.txt', 'r') as f:
-                    results_text = f.read()
-                    
-                # Procurar taxa de churn
-                churn_rate_line = [line for line in results_text.split('\n') if "Taxa de churn:" in line]
-                if churn_rate_line:
-                    churn_rate = churn_rate_line[0].split(": ")[1]
-                    st.info(f"📊 A taxa de churn atual é de {churn_rate}")
+                churn_rate = runs.iloc[0].get('churn_rate')
+                if pd.notna(churn_rate):
+                    st.info(f"📊 A taxa de churn atual é de {churn_rate:.2%}")
             else:
                 st.warning("⚠️ Nenhum modelo de churn foi treinado ainda. Acesse a aba 'Configurar Análise' para criar um modelo.")
             
@@ -224,12 +252,30 @@ def app():
                         help="Porcentagem dos dados que será usada para teste"
                     )
                 
-                # Opção de grid search
-                grid_search = st.checkbox(
-                    "Realizar Grid Search",
-                    value=False,
-                    help="Busca exaustiva pelos melhores hiperparâmetros (pode demorar)"
-                )
+                # Busca de hiperparâmetros
+                col1, col2 = st.columns(2)
+                with col1:
+                    search = st.selectbox(
+                        "Busca de Hiperparâmetros",
+                        options=["none", "halving", "random", "grid"],
+                        help="""
+                        - None: Usa os hiperparâmetros padrão
+                        - Halving: Sorteia combinações e elimina as piores em amostras crescentes
+                        - Random: Avalia combinações sorteadas com todos os dados
+                        - Grid: Busca exaustiva (pode demorar)
+                        
+                        Halving e Random guardam o progresso e retomam de onde pararam.
+                        """
+                    )
+                
+                with col2:
+                    search_budget = st.number_input(
+                        "Tempo Máximo da Busca (minutos)",
+                        min_value=0,
+                        max_value=600,
+                        value=0,
+                        help="0 para não limitar (vale para Halving e Random)"
+                    )
                 
                 # Botão para executar a análise
                 submit_button = st.form_submit_button("🚀 Executar Análise de Churn")
@@ -255,9 +301,10 @@ def app():
             
             st.subheader("📊 Distribuição Atual")
             
-            # Calcular distribuição atual de churn
+            # Calcular distribuição atual de churn (primeira/última compra calculadas uma vez)
             cutoff_date_obj = datetime.combine(cutoff_date, datetime.min.time())
-            churn_df = define_churn(df, cutoff_date_obj)
+            purchase_span = load_purchase_span(CHURN_COLUMNS)
+            churn_df = churn_labels(purchase_span, [cutoff_date_obj]).iloc[:, 0].dropna().rename('churn').to_frame()
             
             if 'churn' in churn_df.columns:
                 churn_counts = churn_df['churn'].value_counts()
@@ -278,111 +325,102 @@ def app():
                 
                 churn_rate = churn_counts.get(1, 0) / total * 100 if total > 0 else 0
                 st.info(f"Taxa de churn atual: {churn_rate:.2f}%")
+            
+            # Taxa de churn para várias datas de corte (rotuladas de uma vez)
+            sweep_cutoffs = pd.date_range(purchase_span['first_purchase'].min(), max_date, freq='MS')[1:]
+            if len(sweep_cutoffs) > 0:
+                sweep = churn_labels(purchase_span, sweep_cutoffs).astype('float').mean()
+                fig_sweep = px.line(
+                    x=sweep.index,
+                    y=sweep.values * 100,
+                    title="Taxa de Churn por Data de Corte",
+                    labels={'x': 'Data de Corte', 'y': 'Taxa de Churn (%)'}
+                )
+                fig_sweep.update_layout(dragmode=False, hovermode=False)
+                st.plotly_chart(fig_sweep, use_container_width=True)
         
         if submit_button:
-            # Formatar data e parâmetros
-            cutoff_date_str = cutoff_date.strftime("%Y-%m-%d")
-            class_weight_param = "None" if class_weight == "none" else class_weight
-            cv_param = 0 if use_cv == 0 else use_cv
-            
-            # Construir comando para executar o script
-            grid_search_param = "--grid_search" if grid_search else ""
-            
-            command = f"""python churn_analysis.py \
-                --cutoff_date {cutoff_date_str} \
-                --rebalance {rebalance_method} \
-                --model {model_type} \
-                --class_weight {class_weight} \
-                --cv {cv_param} \
-                --test_size {test_size} \
-                {grid_search_param}"""
+            # Parâmetros de churn_analysis.main (mesmas conversões da linha de comando)
+            params = {
+                'cutoff_date': cutoff_date.strftime("%Y-%m-%d"),
+                'rebalance_method': rebalance_method,
+                'model_type': model_type,
+                'class_weight': None if class_weight == "none" else class_weight,
+                'use_cv': None if use_cv == 0 else int(use_cv),
+                'grid_search': search != "none",
+                'search': search if search != "none" else 'grid',
+                'search_budget': search_budget * 60 if search_budget > 0 else None,
+                'test_size': test_size,
+            }
             
-            st.info(f"Executando análise com o comando: `{command}`")
-            
-            # Aqui você pode executar o comando via subprocess, mas como estamos no Streamlit,
-            # vamos apenas mostrar uma mensagem de progresso para simular a execução
-            
-            with st.spinner("Executando análise de churn... (Este processo pode demorar alguns minutos)"):
-                st.markdown("""
-                <div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
-                    <p><strong>Nota:</strong> Em um ambiente de produção, este comando seria executado em segundo plano.</p>
-                    <p>Para fins de demonstração, acesse o terminal e execute o comando acima manualmente.</p>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                # Aqui você pode implementar a chamada real para o script de análise
-                # Por exemplo:
-                # import subprocess
-                # result = subprocess.run(command, shell=True, capture_output=True, text=True)
-                # st.code(result.stdout)
-                
-                st.success("✅ Análise concluída! Navegue para a aba 'Resultados do Modelo' para ver os resultados.")
-                st.balloons()
+            # O treinamento roda em outro processo: a página (e as outras sessões) não ficam bloqueadas
+            job_id = submit_job(params)
+            st.success(f"✅ Treinamento enviado (tarefa `{job_id}`). Acompanhe o andamento abaixo.")
+        
+        # Fila de treinamentos
+        st.subheader("🗂️ Tarefas de Treinamento")
+        st.button("🔄 Atualizar status")
+        
+        jobs = list_jobs()
+        if not jobs:
+            st.info("Nenhum treinamento enviado ainda.")
+        
+        status_labels = {
+            'queued': "⏳ Na fila",
+            'running': "⚙️ Em execução",
+            'done': "✅ Concluída",
+            'failed': "❌ Falhou",
+            'cancelled': "🚫 Cancelada",
+        }
+        
+        for job in jobs[:10]:
+            params = job['params']
+            description = "pontuação em lote" if job.get('kind') == SCORE else params['model_type']
+            title = f"{status_labels[job['status']]} · {job['id']} · {description} · corte {params['cutoff_date']}"
+            with st.expander(title, expanded=job['status'] in ('queued', 'running')):
+                st.progress(job.get('progress', 0.0))
+                st.caption(job.get('stage', ''))
+                
+                if job['status'] in ('queued', 'running'):
+                    # Callback: executa antes do próximo rerun, que já mostra o novo estado
+                    st.button("Cancelar", key=f"cancel_{job['id']}", on_click=cancel_job, args=(job['id'],))
+                
+                if job['status'] == 'failed' and job.get('error'):
+                    st.error(job['error'])
+                
+                if job.get('metrics'):
+                    st.json(job['metrics'])
+                
+                log = read_log(job['id'])
+                if log:
+                    st.code(log, language="text")
 
     # TAB 3: RESULTADOS DO MODELO
     with tab3:
         st.header("📈 Resultados do Modelo de Churn")
         
+        runs = training_runs()
+        
         # Verificar se existe um modelo treinado
-        if not os.path.exists('churn_analysis_results.txt'):
+        if runs.empty:
             st.warning("⚠️ Nenhum modelo foi treinado ainda. Acesse a aba 'Configurar Análise' para criar um modelo.")
         else:
-            # Carregar resultados do arquivo
-            with open('churn_analysis_results.txt', 'r') as f:
-                results_text = f.read()
-            
-            # Extrair informações principais
-            lines = results_text.split('\n')
-            
-            # Configurações
-            config_section = False
-            configs = {}
-            
-            # Métricas de performance
-            metrics_section = False
-            metrics = {}
-            
-            # Distribuição
-            dist_section = False
-            distribution = {}
-            
-            # Processar linhas do arquivo para extrair informações
-            for line in lines:
-                if line.startswith("Configurações:"):
-                    config_section = True
-                    dist_section = False
-                    metrics_section = False
-                    continue
-                elif line.startswith("Distribuição de churn:"):
-                    config_section = False
-                    dist_section = True
-                    metrics_section = False
-                    continue
-                elif line.startswith("Métricas de performance:"):
-                    config_section = False
-                    dist_section = False
-                    metrics_section = True
-                    continue
-                elif line.strip() == "" or ":" not in line:
-                    continue
-                
-                # Processar configurações
-                if config_section and ":" in line:
-                    key, value = line.split(":", 1)
-                    configs[key.strip()] = value.strip()
-                
-                # Processar distribuição
-                if dist_section and ":" in line:
-                    key, value = line.split(":", 1)
-                    if key.strip() in ["Não-churn (0)", "Churn (1)", "Taxa de churn"]:
-                        distribution[key.strip()] = value.strip()
-                
-                # Processar métricas
-                if metrics_section and ":" in line:
-                    key, value = line.split(":", 1)
-                    if key.strip() in ["Accuracy", "Precision (weighted)", "Recall (weighted)", 
-                                       "F1 (macro)", "F1 (weighted)", "AUC-ROC", "Average Precision Score"]:
-                        metrics[key.strip()] = float(value.strip())
+            # Execução exibida (padrão: a mais recente)
+            run_id = st.selectbox(
+                "Execução",
+                options=runs['run_id'].tolist(),
+                format_func=lambda run_id: f"{run_id} · {runs.set_index('run_id').at[run_id, 'model_type']}"
+            )
+            run = load_run(run_id)
+            configs = {
+                PARAM_LABELS[key]: value for key, value in run['metadata']['params'].items() if key in PARAM_LABELS
+            }
+            metrics = {
+                METRIC_LABELS[key]: value for key, value in run['metrics'].items() if key in METRIC_LABELS
+            }
+            distribution = run['metadata']['distribution']
+            plots_path = os.path.join(run['path'], 'churn_analysis_plots.png')
+            report_path = os.path.join(run['path'], 'churn_analysis_results.txt')
             
             # Layout em duas colunas para os resultados
             col1, col2 = st.columns([1, 1])
@@ -392,7 +430,7 @@ def app():
                 st.subheader("⚙️ Configurações Utilizadas")
                 config_df = pd.DataFrame({
                     "Parâmetro": list(configs.keys()),
-                    "Valor": list(configs.values())
+                    "Valor": [str(value) for value in configs.values()]
                 })
                 st.table(config_df)
                 
@@ -423,45 +461,35 @@ def app():
                 st.subheader("📈 Distribuição de Churn")
                 
                 if distribution:
-                    # Extrair valores numéricos
-                    try:
-                        non_churn = int(distribution.get('Não-churn (0)', '0').replace(',', ''))
-                        churn = int(distribution.get('Churn (1)', '0').replace(',', ''))
-                        
-                        # Criar gráfico de pizza
-                        fig = go.Figure(data=[go.Pie(
-                            labels=['Não Churn', 'Churn'],
-                            values=[non_churn, churn],
-                            hole=.3,
-                            marker_colors=['#3366CC', '#DC3912']
-                        )])
-                        
-                        fig.update_layout(
-                            title_text=f"Distribuição de Churn ({distribution.get('Taxa de churn', '')})",
-                        )
-                        
-                        st.plotly_chart(fig, use_container_width=True)
-                    except Exception as e:
-                        st.error(f"Erro ao criar gráfico de distribuição: {e}")
-                        st.write(distribution)
+                    fig = go.Figure(data=[go.Pie(
+                        labels=['Não Churn', 'Churn'],
+                        values=[distribution['non_churn'], distribution['churn']],
+                        hole=.3,
+                        marker_colors=['#3366CC', '#DC3912']
+                    )])
+                    
+                    fig.update_layout(
+                        title_text=f"Distribuição de Churn ({distribution['churn_rate']:.2%})",
+                    )
+                    
+                    st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                # Verificar se os arquivos de modelo existem
-                if not os.path.exists('churn_model.pkl') or not os.path.exists('churn_analysis_plots.png'):
-                    st.warning("⚠️ Arquivos do modelo ou gráficos não encontrados. Alguns resultados podem estar incompletos.")
+                # Gráficos e relatório guardados com a execução
+                if not os.path.exists(plots_path):
+                    st.warning("⚠️ Gráficos não encontrados para esta execução. Alguns resultados podem estar incompletos.")
                 else:
                     # Exibir gráficos salvos
                     st.subheader("📊 Gráficos de Avaliação")
-                    
-                    try:
-                        # Tentar carregar e exibir a imagem dos gráficos
-                        st.image('churn_analysis_plots.png', use_column_width=True)
-                    except Exception as e:
-                        st.error(f"Erro ao carregar gráficos: {e}")
+                    st.image(plots_path, use_column_width=True)
                 
                 # Exibir relatório completo
                 with st.expander("📄 Ver Relatório Completo"):
-                    st.text(results_text)
+                    if os.path.exists(report_path):
+                        with open(report_path, 'r', encoding='utf-8') as f:
+                            st.text(f.read())
+                    else:
+                        st.text(run['metrics'].get('classification_report') or "")
                 
                 # Adicionar insights baseados nas métricas
                 st.subheader("💡 Insights")
@@ -490,6 +518,28 @@ def app():
                         st.info("ℹ️ O modelo tem alta sensibilidade, mas baixa precisão. Considere ajustar o threshold para reduzir falsos positivos.")
                     elif precision < 0.6 and recall < 0.6:
                         st.warning("⚠️ O modelo tem baixa precisão e sensibilidade. Considere usar um algoritmo diferente ou ajustar os parâmetros.")
+            
+            # Comparação entre execuções (apenas o índice é lido)
+            st.subheader("🆚 Comparar Execuções")
+            selected_runs = st.multiselect(
+                "Execuções",
+                options=runs['run_id'].tolist(),
+                default=runs['run_id'].head(5).tolist()
+            )
+            if selected_runs:
+                comparison = runs[runs['run_id'].isin(selected_runs)].set_index('run_id')
+                comparison_columns = [c for c in list(PARAM_LABELS) + ['churn_rate'] + SUMMARY_METRICS if c in comparison.columns]
+                st.dataframe(comparison[comparison_columns], use_container_width=True)
+                
+                metric_columns = [c for c in SUMMARY_METRICS if c in comparison.columns]
+                fig = px.bar(
+                    comparison[metric_columns].rename(columns=METRIC_LABELS).reset_index().melt(
+                        id_vars='run_id', var_name='Métrica', value_name='Valor'
+                    ),
+                    x='Métrica', y='Valor', color='run_id', barmode='group',
+                    title="Métricas por Execução"
+                )
+                st.plotly_chart(fig, use_container_width=True)
 
     # TAB 4: PREVISÃO
     with tab4:
@@ -506,17 +556,10 @@ def app():
                 st.subheader("📊 Prever Churn para Novos Clientes")
                 
                 # Formulário para entrada de dados
+                # Modelo e scaler lidos uma vez por processo (relidos só após um novo treino)
+                model, scaler, feature_columns = load_model_artifacts()
+                
                 with st.form("prediction_form"):
-                    # Carregar o modelo e o scaler
-                    with open('churn_model.pkl', 'rb') as f:
-                        model = pickle.load(f)
-                    
-                    with open('churn_scaler.pkl', 'rb') as f:
-                        scaler = pickle.load(f)
-                    
-                    with open('churn_feature_columns.pkl', 'rb') as f:
-                        feature_columns = pickle.load(f)
-                    
                     # Criar campos para entrada de dados
                     st.markdown("""
                     <div style="background-color: #f0f2f6; padding: 20px; border-radius: 10px; margin-bottom: 20px;">
@@ -634,6 +677,31 @@ def app():
                             st.warning(f"⚠️ Probabilidade moderada de churn ({churn_probability:.2%}). Considere ações de retenção preventiva.")
                         else:
                             st.error(f"❌ Alta probabilidade de churn ({churn_probability:.2%}). Ações imediatas de retenção são recomendadas.")
+                
+                # Previsão para clientes da base, com as features do snapshot mais recente
+                st.subheader("👤 Prever Churn para um Cliente Existente")
+                customer_id = st.text_input(
+                    "ID do cliente (customer_unique_id)",
+                    help="As features são as do cliente até a última data do dataset (repositório de features)"
+                )
+                
+                if customer_id:
+                    latest_cutoff = (max_date + pd.Timedelta(days=1)).normalize()
+                    features_df, _ = get_snapshot(latest_cutoff)
+                    features_df = fill_missing_features(features_df)
+                    
+                    customer_key = customer_id.strip()
+                    if pd.api.types.is_integer_dtype(features_df['customer_unique_id']):
+                        customer_key = encode_ids([customer_key], 'customer_unique_id').iloc[0]
+                    customer_features = features_df[features_df['customer_unique_id'].isin([customer_key])]
+                    
+                    if customer_features.empty:
+                        st.error("Cliente não encontrado no repositório de features.")
+                    else:
+                        customer_scaled = scaler.transform(customer_features[feature_columns])
+                        churn_probability = model.predict_proba(customer_scaled)[0][1]
+                        st.metric("Probabilidade de Churn", f"{churn_probability:.2%}")
+                        st.dataframe(customer_features[feature_columns], use_container_width=True)
             
             with col2:
                 st.subheader("ℹ️ Sobre a Previsão")
@@ -670,6 +738,66 @@ def app():
                     </ul>
                 </div>
                 """, unsafe_allow_html=True)
+            
+            # Pontuação em lote de toda a base (também disponível em `python -m utils.pontuacao_churn`)
+            st.subheader("📋 Clientes com Maior Risco de Churn")
+            
+            # A pontuação roda na mesma fila dos treinamentos, em outro processo
+            scoring_jobs = [job for job in list_jobs() if job.get('kind') == SCORE]
+            pending = [job for job in scoring_jobs if job['status'] in (QUEUED, RUNNING)]
+            
+            if st.button("⚡ Pontuar todos os clientes", disabled=bool(pending)):
+                cutoff = (max_date + pd.Timedelta(days=1)).normalize()
+                job_id = submit_job({'cutoff_date': cutoff.strftime("%Y-%m-%d")}, kind=SCORE)
+                st.success(f"✅ Pontuação enviada (tarefa `{job_id}`). Atualize a página para acompanhar.")
+                scoring_jobs = [job for job in list_jobs() if job.get('kind') == SCORE]
+            
+            if scoring_jobs:
+                latest = scoring_jobs[0]
+                if latest['status'] in (QUEUED, RUNNING):
+                    st.progress(latest.get('progress', 0.0))
+                    st.caption(f"Pontuação em andamento: {latest.get('stage', '')}")
+                elif latest['status'] == FAILED and latest.get('error'):
+                    st.error(f"A última pontuação falhou: {latest['error']}")
+            
+            if not os.path.exists(SCORES_FILE):
+                st.info("Nenhuma pontuação em lote encontrada. Clique em 'Pontuar todos os clientes'.")
+            else:
+                scores, scores_metadata = load_cached_scores(os.path.getmtime(SCORES_FILE))
+                
+                st.caption(
+                    f"Pontuado em {scores_metadata.get('scored_at', '?')} com features até "
+                    f"{scores_metadata.get('cutoff_date', '?')}"
+                )
+                if scores_metadata.get('model_mtime', 0) < os.path.getmtime('churn_model.pkl'):
+                    st.warning("⚠️ O modelo foi treinado novamente depois desta pontuação. Pontue os clientes de novo.")
+                
+                tier_counts = scores['risk_tier'].value_counts()
+                tier_cols = st.columns(len(RISK_TIERS))
+                for tier_col, tier in zip(tier_cols, RISK_TIERS):
+                    tier_col.metric(f"Risco {tier}", f"{tier_counts.get(tier, 0):,}")
+                
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    top_n = st.number_input("Quantidade de clientes", min_value=10, max_value=5000, value=50, step=10)
+                with col2:
+                    sort_column = st.selectbox(
+                        "Ordenar por",
+                        options=['churn_probability'] + [c for c in scores.columns if c not in ('customer_unique_id', 'churn_probability', 'risk_tier')]
+                    )
+                with col3:
+                    tiers = st.multiselect("Faixas de risco", options=RISK_TIERS, default=['Alto', 'Moderado'])
+                
+                top = scores[scores['risk_tier'].isin(tiers)].nlargest(int(top_n), sort_column)
+                
+                # Apenas os clientes exibidos têm o ID convertido de volta para o original
+                if pd.api.types.is_integer_dtype(top['customer_unique_id']):
+                    top = top.assign(customer_unique_id=decode_ids(top['customer_unique_id'].to_numpy(), 'customer_unique_id').to_numpy())
+                
+                st.dataframe(
+                    top.set_index('customer_unique_id').style.format({'churn_probability': '{:.1%}'}),
+                    use_container_width=True
+                )
 
 if __name__ == "__main__":
     app() 
\ No newline at end of file
@@ -0,0 +1,516 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from utils.colunas_tempo import WEEKDAY_NAMES, MONTH_NAMES, month_labels
+from utils.formatacao import format_value, format_count
+
+def app(context):
+    # Dados e filtros compartilhados pelo dashboard (ver app.py)
+    filtered_df = context['filtered_df']
+    kpi_graph = context['kpi_graph']
+    kpi_inputs = context['kpi_inputs']
+    
+    st.title("Análise Estratégica")
+    kpis = kpi_graph.get('kpis', kpi_inputs)
+    
+    # ===== SEÇÃO 1: VISÃO GERAL E KPIs PRINCIPAIS =====
+    st.header("📊 Visão Geral")
+    
+    # Layout dos KPIs
+    col1, col2, col3 = st.columns(3)
+    
+    # Primeira linha de KPIs - Métricas de Receita
+    col1.metric("💰 Receita Total", f"R$ {format_value(kpis['total_revenue'])}")
+    col2.metric("📈 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
+    col3.metric("👥 Total de Clientes", format_count(kpis, 'total_customers'))
+    
+    # ===== SEÇÃO 2: PREVISÃO DE RECEITA =====
+    st.header("🔮 Previsão de Receita")
+    
+    # Receita diária do período (dias sem pedidos entram com receita zero)
+    daily_revenue = kpi_graph.get('daily_revenue', kpi_inputs).reset_index()
+    
+    if daily_revenue.empty:
+        st.info("Não há receita no período selecionado para calcular a previsão.")
+    else:
+        # Calcular média móvel de 7 dias
+        daily_revenue['ma7'] = daily_revenue['price'].rolling(window=7).mean()
+    
+        # Previsão para os próximos 30 dias: Holt-Winters com sazonalidade semanal e
+        # intervalo de previsão de 95% (ajustado uma vez por período, ver utils/previsao.py)
+        forecast_df = kpi_graph.get('revenue_forecast', kpi_inputs)
+    
+        # Criar gráfico de previsão
+        fig_forecast = go.Figure()
+    
+        # Adicionar dados históricos
+        fig_forecast.add_trace(go.Scatter(
+            x=daily_revenue['date'],
+            y=daily_revenue['price'],
+            name='Receita Real',
+            line=dict(color='#1f77b4')
+        ))
+    
+        # Adicionar média móvel
+        fig_forecast.add_trace(go.Scatter(
+            x=daily_revenue['date'],
+            y=daily_revenue['ma7'],
+            name='Média Móvel (7 dias)',
+            line=dict(color='#ff7f0e', dash='dash')
+        ))
+    
+        # Adicionar previsão
+        fig_forecast.add_trace(go.Scatter(
+            x=forecast_df['date'],
+            y=forecast_df['forecast'],
+            name='Previsão (30 dias)',
+            line=dict(color='#2ca02c', dash='dot')
+        ))
+    
+        # Adicionar intervalo de confiança
+        fig_forecast.add_trace(go.Scatter(
+            x=forecast_df['date'].tolist() + forecast_df['date'].tolist()[::-1],
+            y=forecast_df['upper_bound'].tolist() + forecast_df['lower_bound'].clip(lower=0).tolist()[::-1],
+            fill='toself',
+            fillcolor='rgba(44, 160, 44, 0.2)',
+            line=dict(color='rgba(44, 160, 44, 0)'),
+            name='Intervalo de Previsão (95%)',
+            showlegend=True
+        ))
+    
+        fig_forecast.update_layout(
+            title="Previsão de Receita para os Próximos 30 Dias",
+            xaxis_title="Data",
+            yaxis_title="Receita (R$)",
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
+        )
+        fig_forecast.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_forecast, use_container_width=True)
+    
+        # Adicionar métricas de previsão
+        col1_metrics, col2_metrics, col3_metrics = st.columns(3)
+    
+        # Calcular receita total prevista para os próximos 30 dias
+        total_forecast = forecast_df['forecast'].sum()
+        col1_metrics.metric("💰 Receita Total Prevista (30 dias)", f"R$ {format_value(total_forecast)}")
+    
+        # Calcular crescimento previsto em relação ao período anterior
+        previous_30_days = daily_revenue.tail(30)['price'].sum()
+        growth_percentage = (total_forecast - previous_30_days) / previous_30_days * 100 if previous_30_days > 0 else 0
+        col2_metrics.metric("📈 Crescimento Previsto", f"{format_value(growth_percentage)}%")
+    
+        # Calcular dia com maior receita prevista
+        max_day = forecast_df.loc[forecast_df['forecast'].idxmax()]
+        col3_metrics.metric("📅 Dia com Maior Receita Prevista", f"{max_day['date'].strftime('%d/%m/%Y')} ({WEEKDAY_NAMES[max_day['date'].dayofweek]})")
+    
+    # ===== SEÇÃO 3: SAZONALIDADE E PADRÕES DE VENDA =====
+    st.header("📅 Sazonalidade e Padrões de Venda")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Sazonalidade de Vendas
+        st.subheader("📅 Sazonalidade de Vendas")
+        
+        # Calcular vendas por dia da semana
+        day_revenue = filtered_df.groupby('order_weekday')['price'].sum().reindex(range(7)).set_axis(WEEKDAY_NAMES)
+        
+        # Calcular vendas por mês
+        month_revenue = filtered_df['price'].groupby(filtered_df['order_month'] % 12).sum().reindex(range(12)).set_axis(MONTH_NAMES)
+        
+        # Criar gráfico de sazonalidade
+        fig_seasonality = go.Figure()
+        
+        # Adicionar barras para dia da semana
+        fig_seasonality.add_trace(go.Bar(
+            x=day_revenue.index,
+            y=day_revenue.values,
+            name='Por Dia da Semana',
+            marker_color='#1f77b4'
+        ))
+        
+        # Adicionar barras para mês
+        fig_seasonality.add_trace(go.Bar(
+            x=month_revenue.index,
+            y=month_revenue.values,
+            name='Por Mês',
+            marker_color='#ff7f0e',
+            visible=False
+        ))
+        
+        # Adicionar botões para alternar entre visualizações
+        fig_seasonality.update_layout(
+            title="Sazonalidade de Vendas",
+            xaxis_title="Período",
+            yaxis_title="Receita (R$)",
+            updatemenus=[
+                dict(
+                    type="buttons",
+                    direction="down",
+                    buttons=[
+                        dict(
+                            args=[{"visible": [True, False]}],
+                            label="Por Dia da Semana",
+                            method="update"
+                        ),
+                        dict(
+                            args=[{"visible": [False, True]}],
+                            label="Por Mês",
+                            method="update"
+                        )
+                    ],
+                    x=0.1,
+                    y=1.1
+                )
+            ],
+            showlegend=False
+        )
+        fig_seasonality.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_seasonality, use_container_width=True)
+        
+        # Identificar o dia da semana com maior receita
+        best_day = day_revenue.idxmax()
+        best_day_revenue = day_revenue.max()
+        
+        # Identificar o mês com maior receita
+        best_month = month_revenue.idxmax()
+        best_month_revenue = month_revenue.max()
+        
+        st.markdown(f"""
+        **Insights de Sazonalidade:**
+        - **Melhor dia para vendas**: {best_day} (R$ {format_value(best_day_revenue)})
+        - **Melhor mês para vendas**: {best_month} (R$ {format_value(best_month_revenue)})
+        """)
+    
+    with col2:
+        # Ticket Médio por Perfil
+        st.subheader("💵 Ticket Médio por Estado")
+        
+        # Calcular ticket médio por estado
+        state_ticket = filtered_df.groupby('customer_state', observed=True)['price'].mean().sort_values(ascending=False)
+        
+        # Criar gráfico de ticket médio
+        fig_ticket = go.Figure()
+        
+        fig_ticket.add_trace(go.Bar(
+            x=state_ticket.index,
+            y=state_ticket.values,
+            name='Ticket Médio',
+            marker_color='#1f77b4'
+        ))
+        
+        fig_ticket.update_layout(
+            title="Ticket Médio por Estado",
+            xaxis_title="Estado",
+            yaxis_title="Ticket Médio (R$)",
+            showlegend=False
+        )
+        fig_ticket.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_ticket, use_container_width=True)
+        
+        # Identificar o estado com maior ticket médio
+        best_state = state_ticket.idxmax()
+        best_state_ticket = state_ticket.max()
+        
+        st.markdown(f"""
+        **Insights de Ticket Médio:**
+        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(best_state_ticket)})
+        """)
+    
+    # ===== SEÇÃO 4: RENTABILIDADE E ANÁLISE DE CATEGORIAS =====
+    st.header("💰 Rentabilidade e Análise de Categorias")
+    
+    # Preparar dados para análise
+    monthly_category_sales = filtered_df.groupby(['order_month', 'product_category_name'], observed=True).agg({
+        'price': 'sum',
+        'order_id': 'count',
+        'pedido_cancelado': 'mean'
+    }).reset_index().rename(columns={'order_month': 'month'})
+    monthly_category_sales['month'] = month_labels(monthly_category_sales['month'])
+    
+    # Identificar as 5 categorias com maior volume de vendas
+    top_categories = filtered_df.groupby('product_category_name', observed=True)['order_id'].count().sort_values(ascending=False).head(5).index.tolist()
+    
+    # Filtrar apenas as categorias principais
+    top_category_sales = monthly_category_sales[monthly_category_sales['product_category_name'].isin(top_categories)]
+    
+    # Layout em duas colunas para os gráficos
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Top 10 Categorias por Rentabilidade
+        st.subheader("📈 Top 10 Categorias por Rentabilidade")
+        
+        # Calcular rentabilidade por categoria
+        category_profit = filtered_df.groupby('product_category_name', observed=True).agg({
+            'price': 'sum',
+            'order_id': 'count'
+        }).reset_index()
+        
+        category_profit['avg_price'] = category_profit['price'] / category_profit['order_id']
+        category_profit['profit_margin'] = 0.3  # Simulando margem de 30%
+        category_profit['profit'] = category_profit['price'] * category_profit['profit_margin']
+        
+        # Ordenar por lucro
+        category_profit = category_profit.sort_values('profit', ascending=False).head(10)
+        
+        # Identificar a categoria mais rentável
+        best_category = category_profit.iloc[0]['product_category_name']
+        best_category_profit = category_profit.iloc[0]['profit']
+        
+        # Criar gráfico de rentabilidade
+        fig_profit = go.Figure()
+        
+        fig_profit.add_trace(go.Bar(
+            x=category_profit['product_category_name'],
+            y=category_profit['profit'],
+            name='Lucro',
+            marker_color='#2ca02c'
+        ))
+        
+        fig_profit.update_layout(
+            xaxis_title="Categoria",
+            yaxis_title="Lucro (R$)",
+            showlegend=False,
+            xaxis_tickangle=45
+        )
+        fig_profit.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_profit, use_container_width=True)
+    
+    with col2:
+        # Taxa de Crescimento por Categoria
+        st.subheader("📊 Taxa de Crescimento por Categoria")
+        
+        # Calcular taxa de crescimento para cada categoria
+        category_growth = {}
+        for category in top_categories:
+            category_data = top_category_sales[top_category_sales['product_category_name'] == category]
+            if len(category_data) >= 2:
+                first_month = category_data.iloc[0]['order_id']
+                last_month = category_data.iloc[-1]['order_id']
+                growth_rate = (last_month - first_month) / first_month * 100 if first_month > 0 else 0
+                category_growth[category] = growth_rate
+        
+        # Ordenar categorias por taxa de crescimento
+        sorted_categories = sorted(category_growth.items(), key=lambda x: x[1], reverse=True)
+        
+        # Criar gráfico de barras para taxa de crescimento
+        fig_growth = go.Figure()
+        
+        fig_growth.add_trace(go.Bar(
+            x=[cat[0] for cat in sorted_categories],
+            y=[cat[1] for cat in sorted_categories],
+            name='Taxa de Crescimento',
+            marker_color='#2ca02c'
+        ))
+        
+        fig_growth.update_layout(
+            xaxis_title="Categoria",
+            yaxis_title="Taxa de Crescimento (%)",
+            showlegend=False
+        )
+        fig_growth.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_growth, use_container_width=True)
+    
+    # ===== SEÇÃO 5: PREVISÃO DE DEMANDA POR CATEGORIA =====
+    st.header("📈 Previsão de Demanda por Categoria")
+    
+    # Criar DataFrame para previsão
+    last_month = pd.to_datetime(monthly_category_sales['month'].iloc[-1])
+    forecast_months = pd.date_range(start=last_month, periods=4, freq='M')[1:]
+    
+    # Calcular previsão para cada categoria
+    forecast_data = []
+    
+    for category in top_categories:
+        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
+        
+        if len(category_data) >= 3:
+            # Calcular média móvel de 3 meses
+            ma3 = category_data['order_id'].rolling(window=3).mean().iloc[-1]
+            
+            # Calcular tendência (últimos 3 meses)
+            recent_data = category_data.tail(3)
+            x = np.arange(len(recent_data))
+            y = recent_data['order_id'].values
+            z = np.polyfit(x, y, 1)
+            trend = z[0]  # Coeficiente de crescimento mensal
+            
+            # Calcular previsão para os próximos 3 meses
+            for i, month in enumerate(forecast_months):
+                forecast = ma3 + (trend * (i + 1))
+                forecast_data.append({
+                    'month': month,
+                    'product_category_name': category,
+                    'forecast': max(0, forecast)  # Garantir que a previsão não seja negativa
+                })
+    
+    forecast_df = pd.DataFrame(forecast_data)
+    
+    # Criar gráfico de previsão
+    fig_forecast = go.Figure()
+    
+    # Adicionar dados históricos
+    for category in top_categories:
+        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
+        fig_forecast.add_trace(go.Scatter(
+            x=category_data['month'],
+            y=category_data['order_id'],
+            name=f'{category} (Histórico)',
+            line=dict(width=2)
+        ))
+    
+    # Adicionar previsão
+    for category in top_categories:
+        category_forecast = forecast_df[forecast_df['product_category_name'] == category]
+        if not category_forecast.empty:
+            fig_forecast.add_trace(go.Scatter(
+                x=category_forecast['month'],
+                y=category_forecast['forecast'],
+                name=f'{category} (Previsão)',
+                line=dict(dash='dash', width=2)
+            ))
+    
+    fig_forecast.update_layout(
+        title="Previsão de Demanda para os Próximos 3 Meses",
+        xaxis_title="Mês",
+        yaxis_title="Quantidade de Pedidos",
+        showlegend=True,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    fig_forecast.update_layout(dragmode=False, hovermode=False)
+    st.plotly_chart(fig_forecast, use_container_width=True)
+    
+    # ===== SEÇÃO 6: RECOMENDAÇÕES E INSIGHTS =====
+    st.header("💡 Recomendações e Insights")
+    
+    # Calcular métricas avançadas para recomendações
+    recommendations = []
+    
+    # Definir limites mínimos
+    MIN_MONTHLY_ORDERS = 10  # Mínimo de pedidos mensais para análise
+    MIN_TOTAL_REVENUE = 5000  # Mínimo de receita total para análise
+    
+    for category in top_categories:
+        category_data = top_category_sales[top_category_sales['product_category_name'] == category]
+        category_revenue = filtered_df[filtered_df['product_category_name'] == category]['price'].sum()
+        avg_monthly_orders = category_data['order_id'].mean()
+        
+        # Verificar volumes mínimos
+        if avg_monthly_orders >= MIN_MONTHLY_ORDERS and category_revenue >= MIN_TOTAL_REVENUE:
+            if not category_data.empty and not category_forecast.empty:
+                # Calcular métricas de tendência
+                last_month_sales = category_data.iloc[-1]['order_id']
+                next_month_forecast = category_forecast.iloc[0]['forecast']
+                
+                # Calcular variação percentual
+                variation = (next_month_forecast - last_month_sales) / last_month_sales * 100 if last_month_sales > 0 else 0
+                
+                # Calcular giro de estoque (simulado)
+                inventory_turnover = avg_monthly_orders / 30  # Média diária de vendas
+                
+                # Calcular estoque ideal baseado na previsão e lead time
+                lead_time_days = 15  # Tempo médio de reposição em dias
+                safety_stock_days = 7  # Estoque de segurança em dias
+                ideal_stock = (next_month_forecast / 30) * (lead_time_days + safety_stock_days)
+                
+                # Determinar ação baseada em múltiplos fatores
+                if variation > 20 and inventory_turnover > 1:
+                    action = "Aumentar significativamente"
+                    reason = "Alto crescimento previsto com bom giro de estoque"
+                elif variation > 10 and inventory_turnover > 0.5:
+                    action = "Aumentar moderadamente"
+                    reason = "Crescimento moderado com giro adequado"
+                elif variation < -20 and inventory_turnover < 0.3:
+                    action = "Reduzir significativamente"
+                    reason = "Queda significativa nas vendas e baixo giro"
+                elif variation < -10 and inventory_turnover < 0.5:
+                    action = "Reduzir moderadamente"
+                    reason = "Queda moderada nas vendas"
+                else:
+                    action = "Manter"
+                    reason = "Demanda estável"
+                
+                recommendations.append({
+                    'category': category,
+                    'variation': variation,
+                    'action': action,
+                    'reason': reason,
+                    'ideal_stock': ideal_stock,
+                    'inventory_turnover': inventory_turnover
+                })
+    
+    # Ordenar recomendações por variação absoluta
+    recommendations.sort(key=lambda x: abs(x['variation']), reverse=True)
+    
+    # Exibir recomendações em um formato mais visual
+    st.subheader("📦 Recomendações de Estoque")
+    
+    # Criar colunas para as recomendações
+    rec_cols = st.columns(3)
+    
+    for i, rec in enumerate(recommendations):
+        col_idx = i % 3
+        with rec_cols[col_idx]:
+            # Definir cor de fundo com base na variação
+            bg_color = "rgba(46, 204, 113, 0.2)" if rec['variation'] > 0 else "rgba(231, 76, 60, 0.2)" if rec['variation'] < 0 else "rgba(52, 152, 219, 0.2)"
+            
+            # Definir cor do texto com base na variação
+            text_color = "#2ecc71" if rec['variation'] > 0 else "#e74c3c" if rec['variation'] < 0 else "#3498db"
+            
+            st.markdown(f"""
+            <div style="
+                backdrop-filter: blur(10px);
+                background: {bg_color};
+                border-radius: 20px;
+                padding: 30px;
+                margin: 10px 0;
+                border: 1px solid {text_color};
+                box-shadow: 0 4px 30px rgba(0, 0, 0, 0.1);
+                color: #333;
+                text-align: center;
+            ">
+                <h3 style="margin: 0; color: {text_color};">{rec['category']}</h3>
+                <h1 style="margin: 10px 0; color: {text_color};">{rec['action']}</h1>
+                <p style="opacity: 0.8; margin: 0;">Variação prevista: {format_value(rec['variation'])}%</p>
+                <p style="opacity: 0.8; margin: 5px 0;">Giro de estoque: {format_value(rec['inventory_turnover'])} un/dia</p>
+                <p style="opacity: 0.8; margin: 5px 0;">Estoque ideal: {format_value(rec['ideal_stock'], is_integer=True)} un</p>
+                <p style="font-size: 0.9em; margin-top: 10px; font-style: italic;">{rec['reason']}</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Resumo dos insights principais
+    st.subheader("📊 Resumo dos Insights Principais")
+    
+    # Garantir que todas as variáveis necessárias estejam definidas
+    best_day = day_revenue.idxmax() if 'day_revenue' in locals() else "N/A"
+    best_month = month_revenue.idxmax() if 'month_revenue' in locals() else "N/A"
+    best_state = state_ticket.idxmax() if 'state_ticket' in locals() else "N/A"
+    predicted_growth = f"{format_value(growth_percentage)}%" if 'growth_percentage' in locals() else "N/A"
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        **Insights de Receita:**
+        - **Receita Total**: R$ {format_value(kpis['total_revenue'])}
+        - **Crescimento Previsto**: {predicted_growth}
+        - **Melhor dia para vendas**: {best_day}
+        - **Melhor mês para vendas**: {best_month}
+        """)
+    
+    with col2:
+        st.markdown(f"""
+        **Insights de Produtos:**
+        - **Categoria mais rentável**: {best_category} (Lucro: R$ {format_value(best_category_profit)})
+        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(state_ticket.max() if 'state_ticket' in locals() else 0)})
+        - **Categoria com maior crescimento**: {sorted_categories[0][0] if sorted_categories else "N/A"} ({format_value(sorted_categories[0][1] if sorted_categories else 0)}%)
+        """)
@@ -1,68 +1,59 @@
 import streamlit as st
 import pandas as pd
-from utils.KPIs import calculate_kpis, load_data
-import plotly.express as px
 import plotly.graph_objects as go
+from utils.colunas_tempo import by_month
+from utils.formatacao import format_value, format_percentage
 
-def format_value(value, is_integer=False):
-    """Formata valores numéricos ou Series para exibição."""
-    if isinstance(value, pd.Series):
-        value = value.sum()
-    if isinstance(value, (int, float)):
-        if is_integer:
-            return f"{int(value):,}".replace(",", ".")
-        return f"{value:,.2f}".replace(",", ".")
-    return str(value)
-
-def format_percentage(value):
-    """Formata valores como porcentagem."""
-    if isinstance(value, pd.Series):
-        value = value.sum()
-    if isinstance(value, (int, float)):
-        return f"{value:.2%}"
-    return str(value)
-
-def show(marketing_spend=50000, date_range=None):
-    df = load_data()
-    kpis = calculate_kpis(df, marketing_spend, date_range)
-
+def app(context):
+    # Dados e filtros compartilhados pelo dashboard (ver app.py)
+    filtered_df = context['filtered_df']
+    kpi_graph = context['kpi_graph']
+    kpi_inputs = context['kpi_inputs']
+    marketing_spend = context['marketing_spend']
+    
     st.title("Aquisição e Retenção")
-
-    # Layout dos KPIs
+    kpis = kpi_graph.get('kpis', kpi_inputs)
+    acquisition_kpis = kpi_graph.get('acquisition_kpis', kpi_inputs)
+    
+    # 📊 Visão Geral dos KPIs
+    st.header("📊 Visão Geral")
+    
+    # Primeira linha - Métricas de Clientes
+    st.subheader("👥 Métricas de Clientes")
     col1, col2, col3 = st.columns(3)
-
-    # Primeira linha de KPIs
-    col1.metric("👥 Novos Clientes (Mês)", format_value(kpis['new_customers']['customer_unique_id'].iloc[-1], is_integer=True))
-    col2.metric("🔄 Taxa de Recompra", format_percentage(kpis['repurchase_rate']))
-    col3.metric("⏳ Tempo até 2ª Compra", f"{format_value(kpis['avg_time_to_second'])} dias")
-
-    # Segunda linha de KPIs
-    col1.metric("💰 CAC", f"R$ {format_value(kpis['cac'])}")
-    col2.metric("🔁 LTV", f"R$ {format_value(kpis['ltv'])}")
-    col3.metric("📈 LTV/CAC", format_value(kpis['ltv'] / kpis['cac'] if kpis['cac'] > 0 else 0))
-
+    col1.metric("Novos Clientes (Período)", format_value(acquisition_kpis['total_new_customers'], is_integer=True))
+    col2.metric("Taxa de Recompra", format_percentage(acquisition_kpis['repurchase_rate']))
+    col3.metric("Tempo até 2ª Compra", f"{int(acquisition_kpis['avg_time_to_second'])} dias")
+    
+    # Segunda linha - Métricas Financeiras
+    st.subheader("💰 Métricas Financeiras")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("CAC", f"R$ {format_value(acquisition_kpis['cac'])}")
+    col2.metric("LTV", f"R$ {format_value(acquisition_kpis['ltv'])}")
+    col3.metric("LTV/CAC", format_value(acquisition_kpis['ltv'] / acquisition_kpis['cac'] if acquisition_kpis['cac'] > 0 else 0))
+    
     st.markdown("---")
-
-    # Gráficos
+    
+    # 📈 Análise de Aquisição
+    st.header("📈 Análise de Aquisição")
+    
     col1, col2 = st.columns(2)
-
+    
     with col1:
         # Gráfico de Novos vs Retornando
-        st.subheader("👥 Novos vs Clientes Retornando")
+        st.subheader("👥 Evolução de Clientes")
         fig_customers = go.Figure()
         
-        # Adicionar novos clientes
         fig_customers.add_trace(go.Bar(
-            x=kpis['new_customers']['month'],
-            y=kpis['new_customers']['customer_unique_id'],
+            x=acquisition_kpis['new_customers']['month'],
+            y=acquisition_kpis['new_customers']['customer_unique_id'],
             name='Novos Clientes',
             marker_color='#1f77b4'
         ))
         
-        # Adicionar clientes retornando
         fig_customers.add_trace(go.Bar(
-            x=kpis['returning_customers']['month'],
-            y=kpis['returning_customers']['customer_unique_id'],
+            x=acquisition_kpis['returning_customers']['month'],
+            y=acquisition_kpis['returning_customers']['customer_unique_id'],
             name='Clientes Retornando',
             marker_color='#2ca02c'
         ))
@@ -72,61 +63,357 @@ def show(marketing_spend=50000, date_range=None):
             barmode='stack',
             xaxis_title="Mês",
             yaxis_title="Número de Clientes",
-            yaxis=dict(tickformat=",d")  # Formato inteiro para o eixo Y
+            yaxis=dict(tickformat=",d"),
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            )
         )
-        fig_customers.update_layout(dragmode=False, hovermode=False)
+        fig_customers.update_layout(dragmode=False, hovermode='x unified')
         st.plotly_chart(fig_customers, use_container_width=True)
-
-        # Gráfico de Evolução dos Novos Clientes
-        st.subheader("📈 Evolução dos Novos Clientes")
-        fig_new = px.line(kpis['new_customers'],
-                         x='month',
-                         y='customer_unique_id',
-                         title="Evolução Mensal de Novos Clientes",
-                         labels={'customer_unique_id': 'Novos Clientes', 'month': 'Mês'})
-        fig_new.update_layout(
-            yaxis=dict(tickformat=",d"),  # Formato inteiro para o eixo Y
-            showlegend=False
-        )
-        fig_new.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_new, use_container_width=True)
-
+    
     with col2:
-        # Funil de Conversão
-        st.subheader("🔄 Funil de Conversão")
+        # Funil de Status dos Pedidos
+        st.subheader("🔄 Funil de Pedidos")
+        
+        # Preparar dados para o funil
+        # Primeiro, vamos ordenar os pedidos por data para garantir a sequência correta
+        funnel_df = filtered_df.sort_values('order_purchase_timestamp')
+        
+        # Calcular quantidade de pedidos em cada etapa
+        funnel_counts = {
+            'created': len(funnel_df),
+            'approved': len(funnel_df[funnel_df['order_status'].isin(['approved', 'shipped', 'delivered'])]),
+            'shipped': len(funnel_df[funnel_df['order_status'].isin(['shipped', 'delivered'])]),
+            'delivered': len(funnel_df[funnel_df['order_status'] == 'delivered'])
+        }
+        
+        # Criar DataFrame para o funil
+        funnel_data = pd.DataFrame({
+            'status': list(funnel_counts.keys()),
+            'count': list(funnel_counts.values())
+        })
+        
+        # Definir labels em português
+        status_labels = {
+            'created': 'Pedidos Criados',
+            'approved': 'Pedidos Aprovados',
+            'shipped': 'Pedidos Enviados',
+            'delivered': 'Pedidos Entregues'
+        }
+        
+        funnel_data['status_label'] = funnel_data['status'].map(status_labels)
+        
+        # Criar gráfico de funil
         fig_funnel = go.Figure(go.Funnel(
-            y=kpis['funnel_data']['Etapa'],
-            x=kpis['funnel_data']['Quantidade'],
+            y=funnel_data['status_label'],
+            x=funnel_data['count'],
             textinfo="value+percent initial",
             textposition="inside",
-            marker=dict(color=["#1f77b4", "#ff7f0e", "#2ca02c"])
+            marker=dict(color=["#1f77b4", "#2ca02c", "#ff7f0e", "#9467bd"])
         ))
+        
         fig_funnel.update_layout(
-            title="Funil de Conversão",
+            title="Funil de Conversão de Pedidos",
             showlegend=False
         )
         fig_funnel.update_layout(dragmode=False, hovermode=False)
         st.plotly_chart(fig_funnel, use_container_width=True)
-
-        # Comparativo LTV vs CAC
-        st.subheader("💰 LTV vs CAC")
+        
+        # Calcular e mostrar taxas de conversão entre etapas
+        st.markdown("**Taxa de Conversão entre Etapas:**")
+        for i in range(len(funnel_data) - 1):
+            current_count = funnel_data.iloc[i]['count']
+            next_count = funnel_data.iloc[i + 1]['count']
+            if current_count > 0:
+                conversion_rate = (next_count / current_count) * 100
+                current_label = funnel_data.iloc[i]['status_label']
+                next_label = funnel_data.iloc[i + 1]['status_label']
+                
+                # Adicionar ícone baseado na taxa de conversão
+                if conversion_rate >= 95:
+                    icon = "🟢"  # Verde para alta conversão
+                elif conversion_rate >= 85:
+                    icon = "🟡"  # Amarelo para conversão média
+                else:
+                    icon = "🔴"  # Vermelho para baixa conversão
+                
+                st.markdown(f"{icon} {current_label} → {next_label}: {conversion_rate:.1f}%")
+        
+        # Adicionar insights baseados nos dados
+        st.markdown("---")
+        st.markdown("**💡 Insights do Funil:**")
+        
+        # Calcular taxa de aprovação
+        approval_rate = (funnel_counts['approved'] / funnel_counts['created']) * 100
+        # Calcular taxa de entrega
+        delivery_rate = (funnel_counts['delivered'] / funnel_counts['shipped']) * 100
+        
+        insights = []
+        
+        if approval_rate < 90:
+            insights.append(f"⚠️ Taxa de aprovação de pedidos está em {approval_rate:.1f}%. Verificar processo de aprovação.")
+        
+        if delivery_rate < 95:
+            insights.append(f"⚠️ Taxa de entrega está em {delivery_rate:.1f}%. Avaliar performance logística.")
+        
+        if not insights:
+            insights.append("✅ Funil de pedidos operando com taxas saudáveis de conversão.")
+        
+        for insight in insights:
+            st.markdown(insight)
+    
+    st.markdown("---")
+    
+    # 💰 Análise de LTV/CAC
+    st.header("💰 Análise de LTV/CAC")
+    
+    # Calcular LTV e CAC por mês
+    monthly_metrics = by_month(filtered_df.groupby('order_month').agg({
+        'price': 'sum',
+        'customer_unique_id': 'nunique',
+        'pedido_cancelado': 'sum'
+    }))
+    
+    monthly_metrics['monthly_revenue'] = monthly_metrics['price'] - (monthly_metrics['price'] * monthly_metrics['pedido_cancelado'])
+    monthly_metrics['monthly_ltv'] = monthly_metrics['monthly_revenue'] / monthly_metrics['customer_unique_id']
+    monthly_metrics['monthly_cac'] = marketing_spend / 12
+    monthly_metrics['ltv_cac_ratio'] = monthly_metrics['monthly_ltv'] / monthly_metrics['monthly_cac']
+    
+    # Inverter o sinal do LTV
+    monthly_metrics['monthly_ltv'] = -monthly_metrics['monthly_ltv']
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Gráfico de Evolução LTV vs CAC
+        st.subheader("📈 Evolução LTV vs CAC")
         fig_comparison = go.Figure()
-        fig_comparison.add_trace(go.Bar(
+        
+        fig_comparison.add_trace(go.Scatter(
+            x=monthly_metrics['order_purchase_timestamp'],
+            y=monthly_metrics['monthly_ltv'],
             name='LTV',
-            x=['LTV'],
-            y=[kpis['ltv']],
-            marker_color='#2ca02c'
+            fill='tozeroy',
+            line=dict(color='rgba(46, 204, 113, 0.3)'),
+            fillcolor='rgba(46, 204, 113, 0.3)'
         ))
-        fig_comparison.add_trace(go.Bar(
+        
+        fig_comparison.add_trace(go.Scatter(
+            x=monthly_metrics['order_purchase_timestamp'],
+            y=monthly_metrics['monthly_cac'],
             name='CAC',
-            x=['CAC'],
-            y=[kpis['cac']],
-            marker_color='#ff7f0e'
+            fill='tozeroy',
+            line=dict(color='rgba(231, 76, 60, 0.3)'),
+            fillcolor='rgba(231, 76, 60, 0.3)'
+        ))
+        
+        fig_comparison.add_trace(go.Scatter(
+            x=monthly_metrics['order_purchase_timestamp'],
+            y=monthly_metrics['ltv_cac_ratio'],
+            name='Razão LTV/CAC',
+            line=dict(color='#2c3e50', width=2),
+            yaxis='y2'
         ))
+        
         fig_comparison.update_layout(
-            title="Comparativo LTV vs CAC",
-            yaxis_title="Valor (R$)",
-            showlegend=True
+            title="Evolução do LTV vs CAC ao Longo do Tempo",
+            xaxis_title="Mês",
+            yaxis=dict(
+                title="Valor (R$)",
+                side="left"
+            ),
+            yaxis2=dict(
+                title="Razão LTV/CAC",
+                overlaying="y",
+                side="right",
+                showgrid=False
+            ),
+            showlegend=True,
+            legend=dict(
+                orientation="h",
+                yanchor="bottom",
+                y=1.02,
+                xanchor="right",
+                x=1
+            ),
+            hovermode='x unified'
+        )
+        
+        # Adicionar linhas de referência
+        fig_comparison.add_shape(
+            type="line",
+            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
+            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
+            y0=0,
+            y1=0,
+            line=dict(color="gray", width=1, dash="dash"),
+            yref="y"
         )
-        fig_comparison.update_layout(dragmode=False, hovermode=False)
+        
+        fig_comparison.add_shape(
+            type="line",
+            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
+            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
+            y0=1,
+            y1=1,
+            line=dict(color="gray", width=1, dash="dash"),
+            yref="y2"
+        )
+        
+        fig_comparison.add_shape(
+            type="line",
+            x0=monthly_metrics['order_purchase_timestamp'].iloc[0],
+            x1=monthly_metrics['order_purchase_timestamp'].iloc[-1],
+            y0=3,
+            y1=3,
+            line=dict(color="green", width=1, dash="dash"),
+            yref="y2"
+        )
+        
+        fig_comparison.update_layout(dragmode=False)
         st.plotly_chart(fig_comparison, use_container_width=True)
+    
+    with col2:
+        # Status atual e recomendações
+        current_ltv = acquisition_kpis['ltv']
+        current_cac = acquisition_kpis['cac']
+        current_ratio = current_ltv / current_cac if current_cac > 0 else 0
+        
+        # Determinar status
+        if current_ratio < 1:
+            status = "🚨 Crítico"
+            status_color = "red"
+        elif current_ratio == 1:
+            status = "⚠️ Limite"
+            status_color = "orange"
+        elif current_ratio < 3:
+            status = "😬 Razoável"
+            status_color = "yellow"
+        elif current_ratio == 3:
+            status = "✅ Ideal"
+            status_color = "green"
+        else:
+            status = "💰 Alto"
+            status_color = "blue"
+        
+        st.subheader("📊 Status Atual")
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("LTV", f"R$ {format_value(current_ltv)}")
+        col2.metric("CAC", f"R$ {format_value(current_cac)}")
+        col3.metric("Razão LTV/CAC", format_value(current_ratio))
+        col4.markdown(f"<h3 style='color: {status_color};'>{status}</h3>", unsafe_allow_html=True)
+        
+        # Análise de tendência dinâmica
+        st.markdown("**📈 Análise de Tendência**")
+        
+        if len(monthly_metrics) >= 2:
+            # Calcular período analisado
+            start_date = pd.to_datetime(monthly_metrics['order_purchase_timestamp'].iloc[0])
+            end_date = pd.to_datetime(monthly_metrics['order_purchase_timestamp'].iloc[-1])
+            meses_filtrados = ((end_date.year - start_date.year) * 12 + end_date.month - start_date.month) + 1
+            
+            # Calcular médias para diferentes períodos
+            n_months = min(3, len(monthly_metrics))  # Usar 3 meses ou menos se não houver dados suficientes
+            recent_ratio = monthly_metrics['ltv_cac_ratio'].tail(n_months).mean()
+            older_ratio = monthly_metrics['ltv_cac_ratio'].head(n_months).mean()
+            
+            # Calcular variação percentual
+            if older_ratio > 0:
+                delta_percent = ((recent_ratio - older_ratio) / older_ratio) * 100
+            else:
+                delta_percent = 0
+            
+            # Determinar direção da tendência e ícone
+            if delta_percent > 10:
+                trend_icon = "📈"
+                trend_color = "green"
+                trend_text = "alta"
+            elif delta_percent < -10:
+                trend_icon = "📉"
+                trend_color = "red"
+                trend_text = "queda"
+            else:
+                trend_icon = "➡️"
+                trend_color = "gray"
+                trend_text = "estável"
+            
+            # Criar texto de período
+            if meses_filtrados == 1:
+                periodo_texto = "no último mês"
+            else:
+                periodo_texto = f"nos últimos {meses_filtrados} meses"
+            
+            # Exibir análise de tendência
+            st.markdown(f"""
+            <div style='
+                padding: 20px;
+                border-radius: 5px;
+                border-left: 5px solid {trend_color};
+                background-color: rgba(0,0,0,0.05);
+            '>
+                {trend_icon} A razão LTV/CAC está em <span style='color: {trend_color};'><strong>{trend_text}</strong></span><br>
+                Variação de <strong>{delta_percent:+.1f}%</strong> {periodo_texto}
+            </div>
+            """, unsafe_allow_html=True)
+            
+            # Adicionar detalhamento
+            with st.expander("Ver detalhes da análise"):
+                st.markdown(f"""
+                - Período analisado: {start_date.strftime('%b/%Y')} a {end_date.strftime('%b/%Y')}
+                - LTV/CAC médio período inicial: {format_value(older_ratio)}
+                - LTV/CAC médio período recente: {format_value(recent_ratio)}
+                - Meses considerados por período: {n_months}
+                """)
+        else:
+            st.warning("⚠️ Período insuficiente para análise de tendência (mínimo 2 meses)")
+    
+    st.markdown("---")
+    
+    # 💡 Recomendações
+    st.header("💡 Recomendações")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("📋 Guia de Interpretação")
+        st.markdown("""
+        | Razão LTV/CAC | Interpretação | Situação |
+        |--------------|---------------|----------|
+        | < 1 | Você perde dinheiro por cliente | 🚨 Ruim. Custa mais do que retorna. |
+        | = 1 | Você empata | ⚠️ Não é sustentável. |
+        | 1 < x < 3 | Lucro baixo | 😬 Razoável, mas pode melhorar. |
+        | = 3 | Ponto ideal (clássico) | ✅ Saudável, lucro balanceado. |
+        | > 3 | Lucro alto | 💰 Pode ser bom... ou pode estar subinvestindo. |
+        """)
+    
+    with col2:
+        st.subheader("🎯 Ações Recomendadas")
+        if current_ratio < 1:
+            st.markdown("""
+            - **Reduzir o CAC**: Otimize suas campanhas de marketing para reduzir o custo de aquisição
+            - **Aumentar o LTV**: Implemente estratégias de upselling e cross-selling para aumentar o valor dos clientes
+            - **Revisar o modelo de negócio**: Avalie se o preço dos produtos/serviços está adequado
+            """)
+        elif current_ratio < 3:
+            st.markdown("""
+            - **Testar novos canais de aquisição**: Explore canais com potencial de menor CAC
+            - **Melhorar a retenção**: Implemente programas de fidelidade para aumentar o LTV
+            - **Otimizar o funil de conversão**: Identifique e corrija gargalos no processo de aquisição
+            """)
+        elif current_ratio > 5:
+            st.markdown("""
+            - **Aumentar investimento em marketing**: Você pode estar subinvestindo em crescimento
+            - **Expandir para novos mercados**: Aproveite a eficiência atual para escalar o negócio
+            - **Diversificar canais de aquisição**: Explore novos canais para manter a eficiência
+            """)
+        else:
+            st.markdown("""
+            - **Manter o equilíbrio atual**: Continue monitorando a razão LTV/CAC
+            - **Testar pequenos aumentos no CAC**: Experimente aumentar o investimento em marketing para ver se mantém a eficiência
+            - **Focar em melhorias incrementais**: Pequenas otimizações podem levar a ganhos significativos
+            """)
@@ -1,52 +1,77 @@
 import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
-from utils.KPIs import load_data, calculate_kpis, calculate_acquisition_retention_kpis
 import pandas as pd
+import plotly.express as px
+from utils.colunas_tempo import by_month
+from utils.formatacao import format_value, format_percentage
 
-def format_value(value, is_integer=False):
-    """Formata um valor numérico com separador de milhares e duas casas decimais."""
-    if is_integer:
-        return f"{int(value):,}"
-    return f"{value:,.2f}"
-
-def format_percentage(value):
-    """Formata um valor como porcentagem com duas casas decimais."""
-    return f"{value*100:.2f}%"
-
-def show(marketing_spend=50000, date_range=None):
-    df = load_data()
-    kpis = calculate_kpis(df, marketing_spend, date_range)
-    acquisition_kpis = calculate_acquisition_retention_kpis(df, marketing_spend, date_range)
-
+def app(context):
+    # Dados e filtros compartilhados pelo dashboard (ver app.py)
+    filtered_df = context['filtered_df']
+    kpi_graph = context['kpi_graph']
+    kpi_inputs = context['kpi_inputs']
+    date_range = context['date_range']
+    daily_sketches = context['daily_sketches']
+    
     st.title("Comportamento do Cliente")
-
-    # Layout dos KPIs
+    kpis = kpi_graph.get('kpis', kpi_inputs)
+    acquisition_kpis = kpi_graph.get('acquisition_kpis', kpi_inputs)
+    
+    # ===== SEÇÃO 1: VISÃO GERAL =====
+    st.header("📊 Visão Geral")
+    
+    # Layout dos KPIs em duas seções
+    st.subheader("👥 Métricas de Cliente")
     col1, col2, col3 = st.columns(3)
-
-    # Primeira linha de KPIs
+    
+    # Primeira linha de KPIs - Métricas de Cliente
     col1.metric("🎯 Taxa de Abandono", format_percentage(kpis['abandonment_rate']))
     col2.metric("😊 Satisfação do Cliente", format_value(kpis['csat']))
+    col3.metric("🔄 Taxa de Recompra", format_percentage(acquisition_kpis['repurchase_rate']))
+    
+    st.subheader("⏱️ Métricas de Tempo")
+    col1, col2, col3 = st.columns(3)
+    
+    # Segunda linha de KPIs - Métricas de Tempo
+    col1.metric("📦 Tempo Médio de Entrega", f"{int(kpis['avg_delivery_time'])} dias")
+    col2.metric("⏳ Tempo até 2ª Compra", f"{int(acquisition_kpis['avg_time_to_second'])} dias")
     col3.metric("💰 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
-
-    # Segunda linha de KPIs
-    col1.metric("📦 Tempo Médio de Entrega", f"{format_value(kpis['avg_delivery_time'])} dias")
-    col2.metric("🔄 Taxa de Recompra", format_percentage(acquisition_kpis['repurchase_rate']))
-    col3.metric("⏳ Tempo até 2ª Compra", f"{format_value(acquisition_kpis['avg_time_to_second'])} dias")
-
+    
+    # Clientes distintos por estado (sketches por estado no modo aproximado)
+    st.subheader("🗺️ Clientes por Estado")
+    if daily_sketches is not None:
+        customers_by_state = daily_sketches.count_by('customers', 'customer_state', date_range).round()
+        st.caption(f"Estimativa HyperLogLog (erro padrão de ±{daily_sketches.error*100:.1f}%)")
+    else:
+        customers_by_state = filtered_df.groupby('customer_state', observed=True)['customer_unique_id'].nunique()
+    customers_by_state = customers_by_state.sort_values(ascending=False).head(10)
+    fig_customers_state = px.bar(
+        x=customers_by_state.index.astype(str),
+        y=customers_by_state.values,
+        title="Top 10 Estados por Clientes",
+        labels={'x': 'Estado', 'y': 'Clientes'},
+        color=customers_by_state.values,
+        color_continuous_scale='Viridis'
+    )
+    fig_customers_state.update_layout(showlegend=False)
+    fig_customers_state.update_layout(dragmode=False, hovermode=False)
+    st.plotly_chart(fig_customers_state, use_container_width=True)
+    
     st.markdown("---")
-
-    # Gráficos
+    
+    # ===== SEÇÃO 2: SATISFAÇÃO DO CLIENTE =====
+    st.header("😊 Satisfação do Cliente")
+    
     col1, col2 = st.columns(2)
-
+    
     with col1:
         # Gráfico de Satisfação do Cliente ao Longo do Tempo
-        st.subheader("😊 Satisfação do Cliente ao Longo do Tempo")
+        st.subheader("📈 Evolução da Satisfação")
+        satisfaction_data = by_month(filtered_df.groupby('order_month')['review_score'].mean())
         fig_satisfaction = px.line(
-            df.groupby(df['order_purchase_timestamp'].dt.to_period('M'))['review_score'].mean().reset_index(),
+            satisfaction_data,
             x='order_purchase_timestamp',
             y='review_score',
-            title="Evolução da Satisfação do Cliente",
+            title="Evolução da Satisfação",
             labels={'review_score': 'Nota Média', 'order_purchase_timestamp': 'Mês'}
         )
         fig_satisfaction.update_layout(
@@ -55,11 +80,30 @@ def show(marketing_spend=50000, date_range=None):
         )
         fig_satisfaction.update_layout(dragmode=False, hovermode=False)
         st.plotly_chart(fig_satisfaction, use_container_width=True)
-
+        
+        # Insights sobre satisfação
+        avg_satisfaction = filtered_df['review_score'].mean()
+        satisfaction_distribution = filtered_df['review_score'].value_counts(normalize=True).sort_index()
+        
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">📊 Distribuição de Avaliações</h3>
+            <p>A nota média de satisfação é <strong>{format_value(avg_satisfaction)}</strong> em 5.</p>
+            <p><strong>{format_percentage(satisfaction_distribution.get(5, 0))}</strong> dos clientes deram nota 5.</p>
+            <p><strong>{format_percentage(satisfaction_distribution.get(1, 0))}</strong> dos clientes deram nota 1.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
         # Gráfico de Distribuição de Satisfação
         st.subheader("📊 Distribuição de Satisfação")
         fig_dist = px.histogram(
-            df,
+            filtered_df,
             x='review_score',
             title="Distribuição das Avaliações",
             labels={'review_score': 'Nota', 'count': 'Quantidade de Avaliações'}
@@ -70,14 +114,37 @@ def show(marketing_spend=50000, date_range=None):
         )
         fig_dist.update_layout(dragmode=False, hovermode=False)
         st.plotly_chart(fig_dist, use_container_width=True)
-
-    with col2:
+        
+        # Análise de correlação entre satisfação e outras métricas
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">🔍 Correlações</h3>
+            <p>Analisando a relação entre satisfação e outras métricas:</p>
+            <ul>
+                <li>Clientes mais satisfeitos tendem a ter um ticket médio <strong>{'maior' if filtered_df.groupby('review_score')['price'].mean().corr(pd.Series([1,2,3,4,5])) > 0 else 'menor'}</strong></li>
+                <li>Clientes com notas mais baixas têm uma taxa de recompra <strong>{'menor' if filtered_df.groupby('review_score')['customer_unique_id'].nunique().corr(pd.Series([1,2,3,4,5])) > 0 else 'maior'}</strong></li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # ===== SEÇÃO 3: TEMPO DE ENTREGA E EXPERIÊNCIA =====
+    st.header("⏱️ Tempo de Entrega e Experiência")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
         # Gráfico de Tempo de Entrega ao Longo do Tempo
-        st.subheader("📦 Tempo de Entrega ao Longo do Tempo")
-        df['delivery_time'] = (pd.to_datetime(df['order_delivered_customer_date']) - 
-                             pd.to_datetime(df['order_purchase_timestamp'])).dt.days
+        st.subheader("📦 Evolução do Tempo de Entrega")
+        delivery_data = by_month(filtered_df.groupby('order_month')['delivery_time'].mean())
         fig_delivery = px.line(
-            df.groupby(df['order_purchase_timestamp'].dt.to_period('M'))['delivery_time'].mean().reset_index(),
+            delivery_data,
             x='order_purchase_timestamp',
             y='delivery_time',
             title="Evolução do Tempo de Entrega",
@@ -86,11 +153,36 @@ def show(marketing_spend=50000, date_range=None):
         fig_delivery.update_layout(showlegend=False)
         fig_delivery.update_layout(dragmode=False, hovermode=False)
         st.plotly_chart(fig_delivery, use_container_width=True)
-
+        
+        # Insights sobre tempo de entrega
+        avg_delivery = filtered_df['delivery_time'].mean()
+        delivered_delays = filtered_df['delivery_delay'].dropna()
+        late_rate = (delivered_delays > 0).mean() if len(delivered_delays) > 0 else 0
+        delivery_by_state = filtered_df.groupby('customer_state', observed=True)['delivery_time'].mean().sort_values()
+        fastest_state = delivery_by_state.index[0]
+        slowest_state = delivery_by_state.index[-1]
+        
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">📍 Análise por Estado</h3>
+            <p>O tempo médio de entrega é <strong>{format_value(avg_delivery)} dias</strong>.</p>
+            <p>Pedidos entregues após a data prevista: <strong>{format_percentage(late_rate)}</strong></p>
+            <p>Estado com entregas mais rápidas: <strong>{fastest_state}</strong> ({format_value(delivery_by_state.iloc[0])} dias)</p>
+            <p>Estado com entregas mais lentas: <strong>{slowest_state}</strong> ({format_value(delivery_by_state.iloc[-1])} dias)</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
         # Gráfico de Ticket Médio ao Longo do Tempo
-        st.subheader("💰 Ticket Médio ao Longo do Tempo")
+        st.subheader("💰 Evolução do Ticket Médio")
+        ticket_data = by_month(filtered_df.groupby('order_month')['price'].mean())
         fig_ticket = px.line(
-            df.groupby(df['order_purchase_timestamp'].dt.to_period('M'))['price'].mean().reset_index(),
+            ticket_data,
             x='order_purchase_timestamp',
             y='price',
             title="Evolução do Ticket Médio",
@@ -99,3 +191,93 @@ def show(marketing_spend=50000, date_range=None):
         fig_ticket.update_layout(showlegend=False)
         fig_ticket.update_layout(dragmode=False, hovermode=False)
         st.plotly_chart(fig_ticket, use_container_width=True)
+        
+        # Insights sobre ticket médio
+        avg_ticket = filtered_df['price'].mean()
+        ticket_by_state = filtered_df.groupby('customer_state', observed=True)['price'].mean().sort_values(ascending=False)
+        highest_ticket_state = ticket_by_state.index[0]
+        lowest_ticket_state = ticket_by_state.index[-1]
+        
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">💰 Análise de Valor</h3>
+            <p>O ticket médio é <strong>R$ {format_value(avg_ticket)}</strong>.</p>
+            <p>Estado com maior ticket médio: <strong>{highest_ticket_state}</strong> (R$ {format_value(ticket_by_state.iloc[0])})</p>
+            <p>Estado com menor ticket médio: <strong>{lowest_ticket_state}</strong> (R$ {format_value(ticket_by_state.iloc[-1])})</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    st.markdown("---")
+    
+    # ===== SEÇÃO 4: RECOMENDAÇÕES =====
+    st.header("💡 Recomendações")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">🎯 Melhorias na Satisfação</h3>
+            <ul>
+                <li>Implementar programa de fidelidade para clientes com notas 4 e 5</li>
+                <li>Criar processo de feedback para clientes com notas 1 e 2</li>
+                <li>Desenvolver conteúdo educativo sobre os produtos para aumentar satisfação</li>
+                <li>Revisar processo de atendimento ao cliente</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">⚡ Otimização de Entregas</h3>
+            <ul>
+                <li>Investir em logística para estados com entregas mais lentas</li>
+                <li>Implementar sistema de previsão de entrega mais preciso</li>
+                <li>Criar programa de entrega expressa para produtos de alto valor</li>
+                <li>Desenvolver parcerias com transportadoras locais nos estados problemáticos</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # Resumo dos insights principais
+    st.subheader("📊 Resumo dos Insights Principais")
+    
+    # Garantir que todas as variáveis necessárias estejam definidas
+    best_day = day_revenue.idxmax() if 'day_revenue' in locals() else "N/A"
+    best_month = month_revenue.idxmax() if 'month_revenue' in locals() else "N/A"
+    best_state = state_ticket.idxmax() if 'state_ticket' in locals() else "N/A"
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        **Insights de Receita:**
+        - **Receita Total**: R$ {format_value(kpis['total_revenue'])}
+        - **Crescimento Previsto**: {format_value(growth_percentage)}%
+        - **Melhor dia para vendas**: {best_day}
+        - **Melhor mês para vendas**: {best_month}
+        """)
+    
+    with col2:
+        st.markdown(f"""
+        **Insights de Produtos:**
+        - **Categoria mais rentável**: {best_category} (Lucro: R$ {format_value(best_category_profit)})
+        - **Estado com maior ticket médio**: {best_state} (R$ {format_value(state_ticket.max() if 'state_ticket' in locals() else 0)})
+        - **Categoria com maior crescimento**: {sorted_categories[0][0] if sorted_categories else "N/A"} ({format_value(sorted_categories[0][1] if sorted_categories else 0)}%)
+        """)
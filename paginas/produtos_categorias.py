@@ -0,0 +1,249 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from utils.colunas_tempo import month_labels
+from utils.formatacao import format_value, format_percentage
+
+def app(context):
+    # Dados e filtros compartilhados pelo dashboard (ver app.py)
+    filtered_df = context['filtered_df']
+    kpi_graph = context['kpi_graph']
+    kpi_inputs = context['kpi_inputs']
+    
+    st.title("Produtos e Categorias")
+    kpis = kpi_graph.get('kpis', kpi_inputs)
+    
+    # Adicionar filtro de categorias
+    st.sidebar.markdown("---")
+    st.sidebar.header("🏷️ Filtros de Categoria")
+    
+    # Obter top categorias por volume e receita
+    top_by_volume = filtered_df['product_category_name'].value_counts().head(10).index.tolist()
+    top_by_revenue = filtered_df.groupby('product_category_name', observed=True)['price'].sum().sort_values(ascending=False).head(10).index.tolist()
+    
+    # Combinar e remover duplicatas mantendo a ordem
+    categorias_populares = list(dict.fromkeys(top_by_volume + top_by_revenue))
+    
+    # Adicionar opção "Todas as categorias" no início
+    todas_categorias = ["Todas as categorias"] + categorias_populares
+    
+    selected_categorias = st.sidebar.multiselect(
+        "Selecione as categorias",
+        todas_categorias,
+        default=["Todas as categorias"],
+        help="Selecione 'Todas as categorias' ou escolha categorias específicas para análise"
+    )
+    
+    # Filtrar DataFrame baseado na seleção (None = todas as categorias)
+    category_inputs = {
+        **kpi_inputs,
+        'categories': None if "Todas as categorias" in selected_categorias else selected_categorias
+    }
+    filtered_df = kpi_graph.get('category_period', category_inputs)
+    
+    # Adicionar métricas de contexto
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("📊 Métricas das Categorias Selecionadas")
+    
+    # Calcular métricas para as categorias selecionadas
+    total_revenue = filtered_df['price'].sum()
+    total_orders = filtered_df['order_id'].nunique()
+    avg_ticket = total_revenue / total_orders if total_orders > 0 else 0
+    
+    st.sidebar.metric("Receita Total", f"R$ {format_value(total_revenue)}")
+    st.sidebar.metric("Pedidos", format_value(total_orders, is_integer=True))
+    st.sidebar.metric("Ticket Médio", f"R$ {format_value(avg_ticket)}")
+    
+    # 📊 Visão Geral
+    st.header("📊 Visão Geral")
+    col1, col2, col3, col4 = st.columns(4)
+    
+    # KPIs principais ajustados para as categorias selecionadas
+    col1.metric("📦 Total de Produtos", format_value(filtered_df['product_id'].nunique(), is_integer=True))
+    col2.metric("🏷️ Categorias", format_value(filtered_df['product_category_name'].nunique(), is_integer=True))
+    col3.metric("💰 Ticket Médio", f"R$ {format_value(avg_ticket)}")
+    col4.metric("📈 Receita Total", f"R$ {format_value(total_revenue)}")
+    
+    # Adicionar informação sobre o filtro ativo
+    if "Todas as categorias" not in selected_categorias:
+        st.info(f"📌 Mostrando dados para {len(selected_categorias)} categorias selecionadas")
+    
+    st.markdown("---")
+    
+    # 📈 Análise de Desempenho
+    st.header("📈 Análise de Desempenho")
+    
+    # Primeira linha de gráficos
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Top 10 Categorias por Receita
+        st.subheader("💰 Top 10 Categorias por Receita")
+        category_revenue = filtered_df.groupby('product_category_name', observed=True)['price'].sum().sort_values(ascending=False).head(10)
+        fig_category = px.bar(
+            x=category_revenue.index,
+            y=category_revenue.values,
+            title="Top 10 Categorias por Receita",
+            labels={'x': 'Categoria', 'y': 'Receita (R$)'},
+            color=category_revenue.values,
+            color_continuous_scale='Viridis'
+        )
+        fig_category.update_layout(showlegend=False)
+        fig_category.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_category, use_container_width=True)
+        
+        # Distribuição de Preços por Categoria
+        st.subheader("💵 Distribuição de Preços por Categoria")
+        fig_price_dist = px.box(
+            filtered_df,
+            x='product_category_name',
+            y='price',
+            title="Distribuição de Preços por Categoria",
+            labels={'price': 'Preço (R$)', 'product_category_name': 'Categoria'}
+        )
+        fig_price_dist.update_layout(showlegend=False)
+        fig_price_dist.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_price_dist, use_container_width=True)
+    
+    with col2:
+        # Top 10 Categorias por Quantidade
+        st.subheader("📦 Top 10 Categorias por Quantidade")
+        category_quantity = filtered_df.groupby('product_category_name', observed=True)['order_id'].count().sort_values(ascending=False).head(10)
+        fig_quantity = px.bar(
+            x=category_quantity.index,
+            y=category_quantity.values,
+            title="Top 10 Categorias por Quantidade",
+            labels={'x': 'Categoria', 'y': 'Quantidade de Pedidos'},
+            color=category_quantity.values,
+            color_continuous_scale='Viridis'
+        )
+        fig_quantity.update_layout(showlegend=False)
+        fig_quantity.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_quantity, use_container_width=True)
+        
+        # Taxa de Cancelamento por Categoria
+        st.subheader("❌ Taxa de Cancelamento por Categoria")
+        category_cancellation = filtered_df.groupby('product_category_name', observed=True)['pedido_cancelado'].mean().sort_values(ascending=False)
+        fig_cancellation = px.bar(
+            x=category_cancellation.index,
+            y=category_cancellation.values,
+            title="Taxa de Cancelamento por Categoria",
+            labels={'x': 'Categoria', 'y': 'Taxa de Cancelamento'},
+            color=category_cancellation.values,
+            color_continuous_scale='Reds'
+        )
+        fig_cancellation.update_layout(
+            yaxis=dict(tickformat=".1%"),
+            showlegend=False
+        )
+        fig_cancellation.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_cancellation, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # 🔍 Análise Detalhada
+    st.header("🔍 Análise Detalhada")
+    
+    # Preparar dados para análise temporal
+    monthly_data = filtered_df.groupby(['order_month', 'product_category_name'], observed=True).agg({
+        'price': 'sum',
+        'order_id': 'count',
+        'pedido_cancelado': 'mean'
+    }).reset_index()
+    
+    # Rótulo do mês como texto para evitar problemas de serialização JSON
+    monthly_data['month_str'] = month_labels(monthly_data['order_month'])
+    
+    # Selecionar categoria para análise
+    # Tratar valores None antes de ordenar
+    category_options = filtered_df['product_category_name'].unique()
+    category_options = [cat if pd.notna(cat) else "Categoria não especificada" for cat in category_options]
+    category_options = sorted(category_options)
+    
+    selected_category = st.selectbox(
+        "Selecione uma categoria para análise detalhada:",
+        options=category_options
+    )
+    
+    # Filtrar dados para a categoria selecionada
+    # Se a categoria selecionada for "Categoria não especificada", filtrar por None
+    if selected_category == "Categoria não especificada":
+        category_data = monthly_data[monthly_data['product_category_name'].isna()]
+    else:
+        category_data = monthly_data[monthly_data['product_category_name'] == selected_category]
+    
+    # Gráficos de análise temporal
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Evolução da Receita
+        st.subheader("💰 Evolução da Receita")
+        fig_revenue = px.line(
+            category_data,
+            x='month_str',  # Usar a coluna de string em vez de Period
+            y='price',
+            title=f"Evolução da Receita - {selected_category}",
+            labels={'month_str': 'Mês', 'price': 'Receita (R$)'}
+        )
+        fig_revenue.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_revenue, use_container_width=True)
+    
+    with col2:
+        # Evolução da Quantidade de Pedidos
+        st.subheader("📦 Evolução da Quantidade de Pedidos")
+        fig_orders = px.line(
+            category_data,
+            x='month_str',  # Usar a coluna de string em vez de Period
+            y='order_id',
+            title=f"Evolução da Quantidade de Pedidos - {selected_category}",
+            labels={'month_str': 'Mês', 'order_id': 'Quantidade de Pedidos'}
+        )
+        fig_orders.update_layout(dragmode=False, hovermode='x unified')
+        st.plotly_chart(fig_orders, use_container_width=True)
+    
+    st.markdown("---")
+    
+    # 💡 Insights e Recomendações
+    st.header("💡 Insights e Recomendações")
+    
+    # Calcular métricas para insights
+    category_metrics = kpi_graph.get('category_metrics', category_inputs)
+    
+    # Identificar categorias com melhor desempenho
+    top_categories = category_metrics.nlargest(3, ('price', 'sum'))
+    bottom_categories = category_metrics.nsmallest(3, ('price', 'sum'))
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("🌟 Categorias em Destaque")
+        for idx, (category, metrics) in enumerate(top_categories.iterrows(), 1):
+            st.markdown(f"""
+            **{idx}. {category}**
+            - Receita Total: R$ {format_value(metrics[('price', 'sum')])}
+            - Ticket Médio: R$ {format_value(metrics[('price', 'mean')])}
+            - Quantidade de Pedidos: {format_value(metrics[('order_id', 'count')], is_integer=True)}
+            - Taxa de Cancelamento: {format_percentage(metrics[('pedido_cancelado', 'mean')])}
+            """)
+    
+    with col2:
+        st.subheader("⚠️ Categorias que Precisam de Atenção")
+        for idx, (category, metrics) in enumerate(bottom_categories.iterrows(), 1):
+            st.markdown(f"""
+            **{idx}. {category}**
+            - Receita Total: R$ {format_value(metrics[('price', 'sum')])}
+            - Ticket Médio: R$ {format_value(metrics[('price', 'mean')])}
+            - Quantidade de Pedidos: {format_value(metrics[('order_id', 'count')], is_integer=True)}
+            - Taxa de Cancelamento: {format_percentage(metrics[('pedido_cancelado', 'mean')])}
+            """)
+    
+    # Espaço para futuras análises
+    st.markdown("---")
+    st.header("🔮 Análises Futuras")
+    st.info("""
+    Área reservada para futuras análises:
+    - Análise de sazonalidade por categoria
+    - Correlação entre preço e satisfação
+    - Análise de estoque e demanda
+    - Previsão de vendas por categoria
+    """)
@@ -1,94 +1,207 @@
 import streamlit as st
-import pandas as pd
-from utils.KPIs import calculate_kpis, load_data
-import matplotlib.pyplot as plt
 import plotly.express as px
+from utils.colunas_tempo import by_month
+from utils.formatacao import format_value, format_percentage, format_count
 
-def format_value(value, is_integer=False):
-    """Formata valores numéricos ou Series para exibição."""
-    if isinstance(value, pd.Series):
-        value = value.sum()  # ou .mean() dependendo do que você quer mostrar
-    if isinstance(value, (int, float)):
-        if is_integer:
-            return f"{int(value):,}".replace(",", ".")
-        return f"{value:,.2f}".replace(",", ".")
-    return str(value)
-
-def format_percentage(value):
-    """Formata valores como porcentagem."""
-    if isinstance(value, pd.Series):
-        value = value.sum()
-    if isinstance(value, (int, float)):
-        return f"{value:.2%}"
-    return str(value)
-
-def show(marketing_spend=50000):
-    df = load_data()
-    kpis = calculate_kpis(df, marketing_spend)
-
+def app(context):
+    # Dados e filtros compartilhados pelo dashboard (ver app.py)
+    filtered_df = context['filtered_df']
+    kpi_graph = context['kpi_graph']
+    kpi_inputs = context['kpi_inputs']
+    
     st.title("Visão Geral")
-
-    # Layout dos KPIs
+    kpis = kpi_graph.get('kpis', kpi_inputs)
+    
+    # ===== SEÇÃO 1: KPIs PRINCIPAIS =====
+    st.header("📊 KPIs Principais")
+    
+    # Layout dos KPIs em 3 linhas de 3 colunas
     col1, col2, col3 = st.columns(3)
-
-    # Primeira linha de KPIs
-    col1.metric("💵 Receita Total", f"R$ {format_value(kpis['Receita Total'])}")
-    col2.metric("📑 Total de Pedidos", format_value(kpis['Número Total de Pedidos'], is_integer=True))
-    col3.metric("👥 Total de Clientes", format_value(kpis['Total de Clientes'], is_integer=True))
-
-    # Segunda linha de KPIs
-    col1.metric("📦 Ticket Médio (AOV)", f"R$ {format_value(kpis['Valor Medio do Pedido (AOV)'])}")
-    col2.metric("🔁 LTV", f"R$ {format_value(kpis['Lifetime Value (LTV)'])}")
-    col3.metric("💰 CAC", f"R$ {format_value(kpis['Custo de Aquisição de Cliente (CAC)'])}")
-
-    # Terceira linha de KPIs
-    col1.metric("😊 CSAT", f"{format_value(kpis['Índice de Satisfação do Cliente (CSAT)'])}/5")
-    col2.metric("⏳ Tempo Médio de Entrega", f"{format_value(kpis['Tempo Médio de Entrega (dias)'])} dias")
-    col3.metric("❌ Pedidos Cancelados", format_percentage(kpis['Taxa de Cancelamento']))
-
-    # Quarta linha de KPIs
-    col1.metric("💸 Receita Perdida", f"R$ {format_value(kpis['Receita Perdida'])}")
-    col2.metric("💸 Receita Perdida (%)", format_percentage(kpis['Receita Perdida (%)']))
     
-    st.markdown("---")
-
-    # Gráficos
+    # Primeira linha de KPIs - Métricas de Receita
+    col1.metric("💰 Receita Total", f"R$ {format_value(kpis['total_revenue'])}")
+    col2.metric("📦 Total de Pedidos", format_count(kpis, 'total_orders'))
+    col3.metric("👥 Total de Clientes", format_count(kpis, 'total_customers'))
+    
+    # Segunda linha de KPIs - Métricas de Performance
+    col1, col2, col3 = st.columns(3)
+    col1.metric("🎯 Taxa de Abandono", format_percentage(kpis['abandonment_rate']))
+    col2.metric("😊 Satisfação do Cliente", format_value(kpis['csat']))
+    col3.metric("💰 Ticket Médio", f"R$ {format_value(kpis['average_ticket'])}")
+    
+    # Terceira linha de KPIs - Métricas de Entrega e Cancelamento
+    col1, col2, col3 = st.columns(3)
+    col1.metric("📦 Tempo Médio de Entrega", f"{int(kpis['avg_delivery_time'])} dias")
+    col2.metric("❌ Taxa de Cancelamento", format_percentage(kpis['cancellation_rate']))
+    col3.metric("💸 Receita Perdida", f"R$ {format_value(kpis['lost_revenue'])}")
+    
+    # ===== SEÇÃO 2: EVOLUÇÃO DA RECEITA =====
+    st.header("📈 Evolução da Receita")
+    
+    # Gráfico de Receita ao Longo do Tempo
+    monthly_revenue = kpi_graph.get('monthly_revenue', kpi_inputs)
+    fig_revenue = px.line(
+        monthly_revenue,
+        x='order_purchase_timestamp',
+        y='price',
+        title="Evolução da Receita",
+        labels={'price': 'Receita (R$)', 'order_purchase_timestamp': 'Mês'}
+    )
+    fig_revenue.update_layout(showlegend=False)
+    fig_revenue.update_layout(dragmode=False, hovermode=False)
+    st.plotly_chart(fig_revenue, use_container_width=True)
+    
+    # Adicionar insights sobre a receita
     col1, col2 = st.columns(2)
-
     with col1:
-        # Gráfico de Receita Mensal
-        st.subheader("📅 Receita Mensal")
-        fig_revenue = px.line(kpis['monthly_revenue'], 
-                            x='month_str', 
-                            y='price',
-                            title="Evolução da Receita Mensal",
-                            labels={'price': 'Receita', 'month_str': 'Mês'})
-        fig_revenue.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_revenue, use_container_width=True)
-
-        # Gráfico de Status dos Pedidos
-        st.subheader("📊 Status dos Pedidos")
-        fig_status = px.pie(values=kpis['order_status'].values, 
-                          names=kpis['order_status'].index,
-                          title="Distribuição de Status dos Pedidos")
-        fig_status.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_status, use_container_width=True)
-
+        # Calcular crescimento da receita
+        if len(monthly_revenue) >= 2:
+            first_month = monthly_revenue.iloc[0]['price']
+            last_month = monthly_revenue.iloc[-1]['price']
+            growth_rate = (last_month - first_month) / first_month * 100 if first_month > 0 else 0
+            
+            st.markdown(f"""
+            <div style="
+                background-color: #f0f2f6;
+                padding: 20px;
+                border-radius: 10px;
+                margin-bottom: 20px;
+            ">
+                <h3 style="margin-top: 0;">📈 Crescimento da Receita</h3>
+                <p>De <strong>{monthly_revenue.iloc[0]['order_purchase_timestamp']}</strong> a <strong>{monthly_revenue.iloc[-1]['order_purchase_timestamp']}</strong>, 
+                a receita <strong>{'aumentou' if growth_rate > 0 else 'diminuiu'}</strong> em <strong>{format_value(abs(growth_rate))}%</strong>.</p>
+            </div>
+            """, unsafe_allow_html=True)
+    
     with col2:
-        # Gráfico de Evolução do Ticket Médio
-        st.subheader("📈 Evolução do Ticket Médio")
-        fig_aov = px.line(kpis['monthly_aov'],
-                         x='month_str',
-                         y='aov',
-                         title="Evolução do Ticket Médio por Mês",
-                         labels={'aov': 'Ticket Médio', 'month_str': 'Mês'})
-        fig_aov.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_aov, use_container_width=True)
-
-        # Gráfico de Pedidos por Estado
-        st.subheader("🗺️ Pedidos por Estado")
-        fig_state = px.bar(kpis['orders_by_state'],
-                          title="Distribuição de Pedidos por Estado",
-                          labels={'value': 'Número de Pedidos', 'customer_state': 'Estado'})
-        fig_state.update_layout(dragmode=False, hovermode=False)
-        st.plotly_chart(fig_state, use_container_width=True)
+        # Identificar mês com maior receita
+        max_month = monthly_revenue.loc[monthly_revenue['price'].idxmax()]
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">🏆 Melhor Mês</h3>
+            <p>O mês com maior receita foi <strong>{max_month['order_purchase_timestamp']}</strong>, 
+            com <strong>R$ {format_value(max_month['price'])}</strong>.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # ===== SEÇÃO 3: SATISFAÇÃO E CANCELAMENTO =====
+    st.header("😊 Satisfação e Cancelamento")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        # Gráfico de Satisfação do Cliente
+        st.subheader("Satisfação do Cliente")
+        monthly_satisfaction = by_month(filtered_df.groupby('order_month')['review_score'].mean())
+        fig_satisfaction = px.line(
+            monthly_satisfaction,
+            x='order_purchase_timestamp',
+            y='review_score',
+            title="Evolução da Satisfação",
+            labels={'review_score': 'Nota Média', 'order_purchase_timestamp': 'Mês'}
+        )
+        fig_satisfaction.update_layout(
+            yaxis=dict(range=[0, 5]),
+            showlegend=False
+        )
+        fig_satisfaction.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_satisfaction, use_container_width=True)
+        
+        # Adicionar insights sobre satisfação
+        avg_satisfaction = filtered_df['review_score'].mean()
+        satisfaction_distribution = filtered_df['review_score'].value_counts(normalize=True).sort_index()
+        
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">📊 Distribuição de Avaliações</h3>
+            <p>A nota média de satisfação é <strong>{format_value(avg_satisfaction)}</strong> em 5.</p>
+            <p><strong>{format_percentage(satisfaction_distribution.get(5, 0))}</strong> dos clientes deram nota 5.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        # Gráfico de Taxa de Cancelamento
+        st.subheader("Taxa de Cancelamento")
+        monthly_cancellation = by_month(filtered_df.groupby('order_month')['pedido_cancelado'].mean())
+        fig_cancellation = px.line(
+            monthly_cancellation,
+            x='order_purchase_timestamp',
+            y='pedido_cancelado',
+            title="Evolução da Taxa de Cancelamento",
+            labels={'pedido_cancelado': 'Taxa de Cancelamento', 'order_purchase_timestamp': 'Mês'}
+        )
+        fig_cancellation.update_layout(
+            yaxis=dict(tickformat=".1%"),
+            showlegend=False
+        )
+        fig_cancellation.update_layout(dragmode=False, hovermode=False)
+        st.plotly_chart(fig_cancellation, use_container_width=True)
+        
+        # Adicionar insights sobre cancelamento
+        avg_cancellation = filtered_df['pedido_cancelado'].mean()
+        total_cancelled = filtered_df[filtered_df['pedido_cancelado'] == 1]['order_id'].nunique()
+        
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">❌ Impacto do Cancelamento</h3>
+            <p>A taxa média de cancelamento é <strong>{format_percentage(avg_cancellation)}</strong>.</p>
+            <p>Foram cancelados <strong>{format_value(total_cancelled, is_integer=True)}</strong> pedidos, 
+            resultando em <strong>R$ {format_value(kpis['lost_revenue'])}</strong> de receita perdida.</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    # ===== SEÇÃO 4: RESUMO E INSIGHTS =====
+    st.header("💡 Insights Principais")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">📊 Métricas de Negócio</h3>
+            <ul>
+                <li>Receita total: <strong>R$ {format_value(kpis['total_revenue'])}</strong></li>
+                <li>Ticket médio: <strong>R$ {format_value(kpis['average_ticket'])}</strong></li>
+                <li>Total de clientes: <strong>{format_count(kpis, 'total_customers')}</strong></li>
+                <li>Total de pedidos: <strong>{format_count(kpis, 'total_orders')}</strong></li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(f"""
+        <div style="
+            background-color: #f0f2f6;
+            padding: 20px;
+            border-radius: 10px;
+            margin-bottom: 20px;
+        ">
+            <h3 style="margin-top: 0;">🎯 Oportunidades de Melhoria</h3>
+            <ul>
+                <li>Reduzir taxa de cancelamento (atual: <strong>{format_percentage(kpis['cancellation_rate'])}</strong>)</li>
+                <li>Melhorar tempo de entrega (atual: <strong>{int(kpis['avg_delivery_time'])} dias</strong>)</li>
+                <li>Aumentar satisfação do cliente (atual: <strong>{format_value(kpis['csat'])}</strong>)</li>
+                <li>Reduzir taxa de abandono (atual: <strong>{format_percentage(kpis['abandonment_rate'])}</strong>)</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
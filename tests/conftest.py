@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Os módulos do projeto são importados a partir da raiz (utils.*)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.colunas_tempo import add_time_columns
+
+CATEGORIES = ['beleza_saude', 'esporte_lazer', 'informatica', 'moveis_decoracao', 'telefonia']
+STATES = ['SP', 'RJ', 'MG', 'RS', 'PR', 'BA']
+
+def synthetic_orders(rows=4000, days=60, customers=600, seed=0):
+    """
+    Histórico sintético com as colunas do arquivo consolidado usadas pelos KPIs
+
+    IDs inteiros (Int32, com alguns ausentes) e colunas categóricas, como na
+    carga do arquivo codificado; datas com hora, para períodos que começam ou
+    terminam no meio de um dia.
+    """
+    rng = np.random.default_rng(seed)
+    start = pd.Timestamp('2017-01-01')
+    purchase = start + pd.to_timedelta(rng.integers(0, days * 86400, rows), unit='s')
+    delivered = pd.Series(purchase + pd.to_timedelta(rng.integers(1, 20, rows), unit='D'))
+    delivered[rng.random(rows) < 0.1] = pd.NaT
+    cancelled = (rng.random(rows) < 0.08).astype('int64')
+    review = pd.Series(rng.integers(1, 6, rows), dtype='float64')
+    review[rng.random(rows) < 0.15] = np.nan
+
+    df = pd.DataFrame({
+        'order_id': pd.array(rng.integers(0, rows // 2, rows), dtype='Int32'),
+        'customer_unique_id': pd.array(rng.integers(0, customers, rows), dtype='Int32'),
+        'product_id': pd.array(rng.integers(0, 300, rows), dtype='Int32'),
+        'product_category_name': pd.Categorical(rng.choice(CATEGORIES, rows), categories=CATEGORIES),
+        'customer_state': pd.Categorical(rng.choice(STATES, rows), categories=STATES),
+        'order_status': pd.Categorical(np.where(cancelled == 1, 'canceled', 'delivered')),
+        'order_purchase_timestamp': purchase,
+        'order_delivered_customer_date': delivered,
+        'order_estimated_delivery_date': purchase + pd.Timedelta(15, 'D'),
+        'price': rng.gamma(2.0, 60.0, rows).round(2),
+        'payment_value': rng.gamma(2.0, 70.0, rows).round(2),
+        'payment_installments': rng.integers(1, 10, rows),
+        'pedido_cancelado': cancelled,
+        'review_score': review,
+    })
+    df.loc[rng.random(rows) < 0.02, 'product_id'] = pd.NA
+    df.loc[rng.random(rows) < 0.02, 'product_category_name'] = np.nan
+    return add_time_columns(df)
+
+@pytest.fixture
+def orders():
+    return synthetic_orders()
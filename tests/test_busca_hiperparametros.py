@@ -0,0 +1,62 @@
+import os
+
+import pandas as pd
+import pytest
+from sklearn.datasets import make_classification
+from sklearn.tree import DecisionTreeClassifier
+
+from utils.busca_hiperparametros import RESULTS_FILE, successive_halving
+
+PARAM_GRID = {'max_depth': [1, 2, 3, 4, 6, None], 'min_samples_leaf': [1, 5, 20]}
+
+def search(search_dir, **kwargs):
+    X, y = make_classification(n_samples=900, n_features=8, random_state=0)
+    return successive_halving(
+        DecisionTreeClassifier(random_state=0), PARAM_GRID, X, y,
+        n_candidates=9, min_resources=50, n_jobs=1, search_dir=str(search_dir), **kwargs
+    )
+
+def checkpoint_lines(search_dir):
+    [key] = os.listdir(search_dir)
+    path = os.path.join(search_dir, key, RESULTS_FILE)
+    with open(path, encoding='utf-8') as f:
+        return path, f.readlines()
+
+def test_halving_keeps_a_fraction_per_round(tmp_path):
+    _, results = search(tmp_path)
+    per_round = results.groupby('round')['candidate'].nunique().tolist()
+    assert per_round == [9, 3, 1]
+    assert results.groupby('round')['resources'].first().is_monotonic_increasing
+
+def test_interrupted_search_resumes_from_checkpoint(tmp_path):
+    best, results = search(tmp_path / 'completa')
+
+    # Execução interrompida: parte das avaliações gravadas e uma linha incompleta
+    interrupted = tmp_path / 'interrompida'
+    search(interrupted)
+    path, lines = checkpoint_lines(interrupted)
+    kept = 5
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(lines[:kept])
+        f.write(lines[kept][:20])
+
+    resumed_best, resumed = search(interrupted)
+    _, resumed_lines = checkpoint_lines(interrupted)
+
+    assert resumed_best == best
+    # Só as avaliações que faltavam são refeitas (a linha incompleta é ignorada)
+    assert len(resumed_lines) == len(lines) + 1
+    search(interrupted)
+    assert checkpoint_lines(interrupted)[1] == resumed_lines
+    columns = ['round', 'candidate', 'resources', 'score']
+    pd.testing.assert_frame_equal(
+        resumed[columns].reset_index(drop=True), results[columns].reset_index(drop=True)
+    )
+
+def test_exhausted_budget_keeps_checkpoint_for_the_next_run(tmp_path):
+    resumed = tmp_path / 'retomada'
+    with pytest.raises(ValueError, match="Orçamento de tempo esgotado"):
+        search(resumed, time_budget=0)
+    assert checkpoint_lines(resumed)[1] == []
+
+    assert search(resumed)[0] == search(tmp_path / 'completa')[0]
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from utils.KPIs import churn_labels, define_churn
+from utils.sequencia_compras import purchase_span
+
+# Datas de corte: antes de qualquer compra, no meio do histórico (inclusive
+# no meio de um dia) e depois da última compra
+CUTOFFS = [pd.Timestamp(cutoff) for cutoff in [
+    '2016-12-15', '2017-01-01', '2017-01-20 12:30:00', '2017-02-10', '2017-03-01', '2018-01-01'
+]]
+
+def reference_define_churn(df, cutoff_date):
+    """Implementação original (dicionário por cliente), usada como referência."""
+    df = df.assign(order_purchase_timestamp=pd.to_datetime(df['order_purchase_timestamp']))
+    active_customers = df[df['order_purchase_timestamp'] <= cutoff_date]['customer_unique_id'].unique()
+    customers_after_cutoff = df[df['order_purchase_timestamp'] > cutoff_date]['customer_unique_id'].unique()
+    churn_status = {customer: 0 if customer in customers_after_cutoff else 1 for customer in active_customers}
+    return pd.DataFrame(list(churn_status.items()), columns=['customer_unique_id', 'churn'])
+
+def as_int64(labels):
+    """Rótulos por cliente com índice e valores int64, em ordem de cliente."""
+    labels = labels.astype('int64').sort_index()
+    return labels.set_axis(labels.index.astype('int64'))
+
+def by_customer(churn_df):
+    return as_int64(churn_df.set_index('customer_unique_id')['churn'])
+
+@pytest.mark.parametrize('cutoff', CUTOFFS, ids=str)
+def test_define_churn_matches_reference(orders, cutoff):
+    pd.testing.assert_series_equal(
+        by_customer(define_churn(orders, cutoff)),
+        by_customer(reference_define_churn(orders, cutoff))
+    )
+
+def test_churn_labels_match_reference_for_all_cutoffs(orders):
+    labels = churn_labels(purchase_span(orders), CUTOFFS)
+    assert list(labels.columns) == CUTOFFS
+
+    for cutoff in labels.columns:
+        expected = by_customer(reference_define_churn(orders, cutoff))
+        result = as_int64(labels[cutoff].dropna())
+        pd.testing.assert_series_equal(result, expected, check_names=False)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import synthetic_orders
+from utils.contagem_aproximada import (
+    DailySketches, SKETCH_KEYS, estimate, hash_registers, relative_error
+)
+from utils.indice_temporal import TimeIndexedData
+
+# Limite usado nos testes: 3 erros padrão relativos
+TOLERANCE = 3 * relative_error()
+
+RANGES = [
+    None,
+    ['2017-01-10', '2017-02-05 23:59:59.999999999'],
+    ['2017-01-03 13:22:10', '2017-02-14 08:05:00'],
+    ['2017-01-20 09:00', '2017-01-20 17:30'],
+    ['2016-12-01', '2019-01-01'],
+]
+
+@pytest.fixture(scope='module')
+def large_orders():
+    return TimeIndexedData(synthetic_orders(rows=200_000, days=90, customers=60_000, seed=7))
+
+@pytest.fixture(scope='module')
+def sketches(large_orders):
+    return DailySketches(large_orders)
+
+def registers_from_rows(values, precision):
+    """Sketch de um único conjunto de valores, montado direto das linhas."""
+    register, rank = hash_registers(values, precision)
+    registers = np.zeros(2 ** precision, dtype='uint8')
+    np.maximum.at(registers, register, rank)
+    return registers
+
+@pytest.mark.parametrize('cardinality', [100, 5_000, 50_000, 500_000])
+def test_estimate_within_error_bound(cardinality):
+    values = pd.Series(np.arange(cardinality, dtype='int64') * 7919 + 13)
+    registers = registers_from_rows(values, 12)
+    assert estimate(registers) == pytest.approx(cardinality, rel=TOLERANCE)
+
+def test_missing_values_are_ignored():
+    values = pd.array([1, 2, None, 3, None], dtype='Int32')
+    assert estimate(registers_from_rows(values, 12)) == pytest.approx(3, abs=0.01)
+
+@pytest.mark.parametrize('date_range', RANGES)
+@pytest.mark.parametrize('key', list(SKETCH_KEYS))
+def test_period_registers_match_period_rows(sketches, large_orders, key, date_range):
+    period = large_orders.filter(date_range)
+    expected = registers_from_rows(period[SKETCH_KEYS[key]], sketches.precision)
+    np.testing.assert_array_equal(sketches._merge(key, date_range)[0], expected)
+
+@pytest.mark.parametrize('date_range', RANGES)
+@pytest.mark.parametrize('key', list(SKETCH_KEYS))
+def test_count_within_error_bound(sketches, large_orders, key, date_range):
+    exact = large_orders.filter(date_range)[SKETCH_KEYS[key]].nunique()
+    assert sketches.count(key, date_range) == pytest.approx(exact, rel=TOLERANCE)
+
+@pytest.mark.parametrize('date_range', RANGES)
+def test_count_by_within_error_bound(sketches, large_orders, date_range):
+    period = large_orders.filter(date_range)
+    exact = period.groupby('customer_state', observed=True)['customer_unique_id'].nunique()
+    approx = sketches.count_by('customers', 'customer_state', date_range)
+    assert set(approx.index) == set(exact.index)
+    for state, count in exact.items():
+        assert approx[state] == pytest.approx(count, rel=TOLERANCE), state
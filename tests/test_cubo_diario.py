@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.KPIs import _calculate_kpis_from_rows
+from utils.cubo_diario import DailyCube
+from utils.indice_temporal import TimeIndexedData
+
+# Períodos: histórico inteiro, dias inteiros, bordas no meio do dia,
+# um trecho de um único dia e períodos sem nenhuma venda
+RANGES = [
+    None,
+    ['2017-01-10', '2017-02-05 23:59:59.999999999'],
+    ['2017-01-03 13:22:10', '2017-02-14 08:05:00'],
+    ['2017-01-20 09:00', '2017-01-20 17:30'],
+    ['2017-01-20 23:00', '2017-01-21 02:00'],
+    ['2016-12-01', '2019-01-01'],
+    ['2018-06-01', '2018-06-30'],
+    ['2017-01-20 03:00:00', '2017-01-20 03:00:00'],
+]
+
+def assert_same_kpis(expected, result):
+    for name, value in result.items():
+        if pd.isna(expected[name]):
+            assert pd.isna(value), name
+        else:
+            assert value == pytest.approx(expected[name], rel=1e-9, abs=1e-9), name
+
+@pytest.mark.parametrize('date_range', RANGES)
+def test_cube_kpis_match_rows(orders, date_range):
+    cube = DailyCube(TimeIndexedData(orders))
+    assert_same_kpis(_calculate_kpis_from_rows(orders, date_range), cube.kpis(date_range))
+
+def test_cube_accepts_unsorted_frame(orders):
+    shuffled = orders.sample(frac=1.0, random_state=1)
+    cube = DailyCube(shuffled)
+    assert_same_kpis(_calculate_kpis_from_rows(orders, RANGES[2]), cube.kpis(RANGES[2]))
+
+def test_cube_sums_of_adjacent_periods_add_up(orders):
+    cube = DailyCube(orders)
+    first = cube.sums(['2017-01-01', '2017-01-15 11:59:59'])
+    second = cube.sums(['2017-01-15 12:00:00', '2017-03-31'])
+    np.testing.assert_allclose(first + second, cube.sums())
+
+def text_ids(df):
+    """Mesmo histórico com os IDs em texto (arquivos gravados antes da codificação inteira)."""
+    return df.assign(**{
+        column: df[column].astype('object').map(lambda value: f'id-{value}' if pd.notna(value) else None)
+        for column in ['order_id', 'customer_unique_id', 'product_id']
+    }).assign(product_category_name=df['product_category_name'].astype('object'))
+
+@pytest.mark.parametrize('date_range', RANGES)
+def test_cube_distinct_counts_with_text_ids(orders, date_range):
+    rows = text_ids(orders)
+    cube = DailyCube(rows)
+    assert set(cube._text_codes) == {'order_id', 'customer_unique_id', 'product_id', 'product_category_name'}
+    assert_same_kpis(_calculate_kpis_from_rows(rows, date_range), cube.kpis(date_range))
+
+@pytest.mark.parametrize('date_range', RANGES)
+def test_cube_distinct_counts_match_nunique(orders, date_range):
+    cube = DailyCube(orders)
+    period = TimeIndexedData(orders).filter(date_range)
+    counts = cube.distinct_counts(date_range)
+    assert counts['orders'] == period['order_id'].nunique()
+    assert counts['customers'] == period['customer_unique_id'].nunique()
+    assert counts['products'] == period['product_id'].nunique()
+    assert counts['categories'] == period['product_category_name'].nunique()
+    assert counts['cancelled_orders'] == period.loc[period['pedido_cancelado'] == 1, 'order_id'].nunique()
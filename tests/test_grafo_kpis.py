@@ -0,0 +1,118 @@
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from utils.contagem_aproximada import DailySketches
+from utils.cubo_diario import DailyCube
+from utils.grafo_kpis import KPIGraph, build_dashboard_graph
+from utils.indice_temporal import TimeIndexedData
+
+DATE_RANGE = ['2017-01-05 10:00', '2017-02-20 18:00']
+
+def counting_graph():
+    """Grafo pequeno que conta quantas vezes cada nó foi calculado."""
+    graph, calls = KPIGraph(), Counter()
+
+    @graph.node('period', inputs=('date_range',))
+    def period(date_range):
+        calls['period'] += 1
+        return date_range
+
+    @graph.node('revenue', depends=('period',))
+    def revenue(period):
+        calls['revenue'] += 1
+        return ('revenue', period)
+
+    @graph.node('summary', depends=('revenue',), inputs=('marketing_spend',))
+    def summary(revenue, marketing_spend):
+        calls['summary'] += 1
+        return (revenue, marketing_spend)
+
+    @graph.node('kpis', inputs=('date_range',))
+    def kpis(date_range):
+        calls['kpis'] += 1
+        return ('kpis', date_range)
+
+    return graph, calls
+
+def test_results_are_memoized_by_their_own_inputs():
+    graph, calls = counting_graph()
+    values = {'date_range': ['2017-01-01', '2017-01-31'], 'marketing_spend': 100}
+    graph.get('summary', values)
+    graph.get('kpis', values)
+    graph.get('summary', dict(values, marketing_spend=200))
+
+    # Mudar o gasto com marketing recalcula só o nó que o usa
+    assert calls == Counter(period=1, revenue=1, summary=2, kpis=1)
+
+def test_invalidate_period_keeps_independent_nodes():
+    graph, calls = counting_graph()
+    values = {'date_range': ['2017-01-01', '2017-01-31'], 'marketing_spend': 100}
+    graph.get('summary', values)
+    graph.get('kpis', values)
+
+    assert graph.dependents('period') == {'period', 'revenue', 'summary'}
+    graph.invalidate('period')
+    graph.get('summary', values)
+    graph.get('kpis', values)
+    assert calls == Counter(period=2, revenue=2, summary=2, kpis=1)
+
+    graph.invalidate()
+    graph.get('kpis', values)
+    assert calls['kpis'] == 2
+
+def test_unknown_dependency_and_missing_input_are_rejected():
+    graph, _ = counting_graph()
+    with pytest.raises(ValueError):
+        graph.node('orphan', depends=('missing',))(lambda value: value)
+    with pytest.raises(KeyError):
+        graph.get('summary', {'date_range': None})
+
+def test_lru_keeps_at_most_max_entries():
+    graph = KPIGraph(max_entries=3)
+    graph.node('square', inputs=('value',))(lambda value: value * value)
+    for value in range(10):
+        graph.get('square', {'value': value})
+    assert [key[1] for key in graph._cache] == [7, 8, 9]
+
+@pytest.fixture
+def dashboard(orders):
+    timeline = TimeIndexedData(orders)
+    graph = build_dashboard_graph(timeline, DailyCube(timeline), sketches=lambda: DailySketches(timeline))
+    values = {'date_range': DATE_RANGE, 'approximate': False, 'marketing_spend': 50000, 'categories': None}
+    return graph, values
+
+def cached_nodes(graph):
+    return {key[0] for key in graph._cache}
+
+def test_dashboard_invalidate_period_keeps_kpis(dashboard):
+    graph, values = dashboard
+    for name in ['kpis', 'acquisition_kpis', 'category_metrics', 'monthly_revenue']:
+        graph.get(name, values)
+    kpis = graph.get('kpis', values)
+    acquisition = graph.get('acquisition_kpis', values)
+    new_customers = graph.get('total_new_customers', values)
+
+    graph.invalidate('period')
+    assert cached_nodes(graph) == {'kpis'}
+    assert graph.get('kpis', values) is kpis
+
+    # Recalculados a partir do período, com o mesmo resultado
+    assert graph.get('acquisition_kpis', values) is not acquisition
+    assert graph.get('total_new_customers', values) == new_customers
+
+def test_dashboard_nodes_match_direct_computation(dashboard, orders):
+    graph, values = dashboard
+    period = TimeIndexedData(orders).filter(DATE_RANGE)
+    pd.testing.assert_frame_equal(graph.get('period', values), period)
+    assert graph.get('kpis', values)['total_orders'] == period['order_id'].nunique()
+
+    categories = ['informatica', 'telefonia']
+    metrics = graph.get('category_metrics', dict(values, categories=categories))
+    assert set(metrics.index) == set(categories)
+
+def test_dashboard_forecast_skips_empty_period(dashboard):
+    graph, values = dashboard
+    assert graph.get('revenue_forecast', dict(values, date_range=['2019-01-01', '2019-01-31'])) is None
+    assert len(graph.get('revenue_forecast', values)) == 30
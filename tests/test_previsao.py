@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.previsao import HoltWinters, daily_totals, forecast_daily
+
+def weekly_series(days=140, level=1000.0, trend=2.0, seed=None):
+    """Série diária com tendência linear e sazonalidade semanal (com ruído, se houver semente)."""
+    t = np.arange(days)
+    values = level + trend * t + 150 * np.sin(2 * np.pi * t / 7)
+    if seed is not None:
+        values = values + np.random.default_rng(seed).normal(0, 20, days)
+    return pd.Series(values, index=pd.date_range('2017-01-01', periods=days, freq='D').rename('date'))
+
+def test_forecast_raises_on_empty_totals():
+    with pytest.raises(ValueError, match="Sem totais diários"):
+        forecast_daily(pd.Series(dtype='float64'))
+
+    empty = pd.DataFrame({'order_day': pd.Series(dtype='datetime64[ns]'), 'price': pd.Series(dtype='float64')})
+    with pytest.raises(ValueError, match="Sem totais diários"):
+        forecast_daily(daily_totals(empty, 'price'))
+
+def test_daily_totals_fill_missing_days_with_zero():
+    df = pd.DataFrame({
+        'order_day': pd.to_datetime(['2017-01-01', '2017-01-01', '2017-01-04']),
+        'price': [10.0, 5.0, 7.0],
+        'product_category_name': ['a', 'b', 'a'],
+    })
+    assert daily_totals(df, 'price').tolist() == [15.0, 0.0, 0.0, 7.0]
+
+    by_category = daily_totals(df, 'price', by='product_category_name')
+    assert by_category['b'].tolist() == [5.0, 0.0, 0.0, 0.0]
+    assert by_category.index.name == 'date'
+
+def test_forecast_follows_trend_and_season():
+    history = weekly_series(days=168)
+    future = weekly_series(days=168 + 28).iloc[168:]
+    result = forecast_daily(history.iloc[:168], horizon=28)
+
+    assert list(result.columns) == ['date', 'forecast', 'lower_bound', 'upper_bound']
+    assert result['date'].tolist() == future.index.tolist()
+    np.testing.assert_allclose(result['forecast'], future.to_numpy(), rtol=0.03)
+
+def test_interval_contains_forecast_and_widens():
+    result = forecast_daily(weekly_series(seed=3), horizon=30, level=0.9)
+    assert (result['lower_bound'] < result['forecast']).all()
+    assert (result['forecast'] < result['upper_bound']).all()
+    width = result['upper_bound'] - result['lower_bound']
+    assert width.is_monotonic_increasing
+
+def test_batch_fit_matches_separate_fits():
+    series = pd.DataFrame({'a': weekly_series(seed=1), 'b': weekly_series(level=300.0, trend=-0.5, seed=2)})
+    batch = forecast_daily(series, horizon=14)
+
+    assert batch['series'].tolist() == ['a'] * 14 + ['b'] * 14
+    for name in series.columns:
+        single = forecast_daily(series[name], horizon=14)
+        rows = batch[batch['series'] == name].drop(columns='series').reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows, single)
+
+def test_short_history_still_forecasts():
+    model = HoltWinters(season_length=7).fit([10.0, 12.0, 11.0])
+    mean, lower, upper = model.forecast(5)
+    assert mean.shape == (1, 5)
+    assert np.isfinite(mean).all() and (lower <= upper).all()
@@ -1,87 +1,258 @@
+import os
+import glob
+import hashlib
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import streamlit as st
+from utils.codificacao import CATEGORY_COLUMNS
+from utils.indice_temporal import TimeIndexedData
+from utils.colunas_tempo import TIME_SOURCE_COLUMNS, add_time_columns, time_column, by_month
+from utils.cubo_diario import DailyCube, CUBE_COLUMNS
+from utils.contagem_aproximada import DailySketches, SKETCH_COLUMNS
+from utils.sequencia_compras import purchase_sequence, nth_purchase, purchase_gap, purchase_span
+
+MERGED_PARQUET = "olist_merged_data.parquet"
+# Dataset particionado por mês gerado por `JuntandoTabelas.py --incremental`
+MERGED_DATASET_DIR = "olist_merged_data"
+
+def merged_source():
+    """
+    Fonte atual dos dados consolidados: o dataset particionado, se existir,
+    ou o arquivo único. O build completo (`JuntandoTabelas.py` sem
+    `--incremental`) remove o dataset particionado, então a fonte é sempre a
+    do último build. Todas as leituras (dados, datas, versão) usam esta escolha.
+
+    Retorno:
+    --------
+    tuple
+        (caminho, particionado)
+    """
+    if os.path.isdir(MERGED_DATASET_DIR):
+        return MERGED_DATASET_DIR, True
+    return MERGED_PARQUET, False
+
+def _date_range_filters(date_range, partitioned=False):
+    """
+    Filtros do pyarrow para o período selecionado.
+
+    O filtro sobre order_purchase_timestamp usa as estatísticas min/max de cada
+    row group (o Parquet é gravado ordenado por essa coluna), então só os row
+    groups do período são lidos. No dataset particionado, o filtro por
+    purchase_month descarta antes as partições fora do período.
+    """
+    if not date_range or len(date_range) != 2:
+        return None
+    start_date = pd.to_datetime(date_range[0])
+    end_date = pd.to_datetime(date_range[1])
+    filters = [
+        ('order_purchase_timestamp', '>=', start_date),
+        ('order_purchase_timestamp', '<=', end_date)
+    ]
+    if partitioned:
+        filters = [
+            ('purchase_month', '>=', start_date.strftime('%Y-%m')),
+            ('purchase_month', '<=', end_date.strftime('%Y-%m'))
+        ] + filters
+    return filters
+
+def _parquet_files():
+    path, partitioned = merged_source()
+    if partitioned:
+        return sorted(glob.glob(os.path.join(path, "purchase_month=*", "*.parquet")))
+    return [path]
+
+def dataset_version():
+    """
+    Identificador da versão do dataset consolidado.
+
+    Muda sempre que algum arquivo Parquet é regravado (caminho, tamanho e data
+    de modificação); usado para invalidar artefatos derivados dos dados.
+    """
+    digest = hashlib.sha1()
+    for path in _parquet_files():
+        if os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+    return digest.hexdigest()
 
 @st.cache_data
-def load_data():
-    """Carrega os dados consolidados do Olist."""
-    return pd.read_parquet("olist_merged_data.parquet")
+def purchase_date_bounds():
+    """
+    Menor e maior data de compra do dataset.
+
+    Lidas das estatísticas dos row groups, sem carregar os dados; se algum
+    arquivo não tiver estatísticas, a coluna é lida.
+    """
+    min_date, max_date = None, None
+    for path in _parquet_files():
+        metadata = pq.ParquetFile(path).metadata
+        column_index = metadata.schema.names.index('order_purchase_timestamp')
+        for i in range(metadata.num_row_groups):
+            stats = metadata.row_group(i).column(column_index).statistics
+            if stats is None or not stats.has_min_max:
+                timestamps = pd.read_parquet(path, columns=['order_purchase_timestamp'])['order_purchase_timestamp']
+                group_min, group_max = timestamps.min(), timestamps.max()
+            else:
+                group_min, group_max = pd.Timestamp(stats.min), pd.Timestamp(stats.max)
+            min_date = group_min if min_date is None else min(min_date, group_min)
+            max_date = group_max if max_date is None else max(max_date, group_max)
+    return min_date, max_date
+
+# Colunas usadas por calculate_kpis e calculate_acquisition_retention_kpis
+KPI_COLUMNS = [
+    'order_id', 'customer_unique_id', 'product_id', 'product_category_name',
+    'order_status', 'order_purchase_timestamp', 'order_delivered_customer_date',
+    'price', 'pedido_cancelado', 'review_score'
+]
+
+# Colunas usadas por calculate_churn_features e define_churn
+CHURN_COLUMNS = [
+    'order_id', 'customer_unique_id', 'order_status', 'order_purchase_timestamp',
+    'order_delivered_customer_date', 'payment_value', 'payment_installments', 'review_score'
+]
+
+def _read_merged(columns=None, date_range=None):
+    """Lê os dados consolidados (sem cache); ver `load_data`."""
+    columns = list(dict.fromkeys(columns)) if columns else None
+    path, partitioned = merged_source()
+    df = pd.read_parquet(path, columns=columns, filters=_date_range_filters(date_range, partitioned))
+    if partitioned:
+        df = df.drop(columns=['purchase_month'], errors='ignore')
+
+    # Arquivos gerados antes da codificação ainda trazem essas colunas como texto
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+    return df
+
+@st.cache_resource
+def load_data(columns=None, date_range=None):
+    """
+    Carrega os dados consolidados do Olist.
+
+    Com `columns`, lê do Parquet apenas essas colunas (cada projeção tem seu
+    próprio cache). Com `date_range`, o filtro por data é aplicado na leitura
+    e só as partições e row groups do período são lidos.
+
+    O DataFrame é lido uma vez por processo e o mesmo objeto é entregue a
+    todas as sessões e chamadas, sem cópia: é somente leitura. Colunas
+    derivadas são calculadas como Series locais (ou em DataFrames derivados,
+    como os de `groupby`), nunca atribuídas ao DataFrame recebido.
+    """
+    return _read_merged(columns, date_range)
+
+@st.cache_resource
+def load_timeline(columns=None):
+    """
+    Todo o histórico indexado pela data de compra (um por processo).
+
+    Compartilhado pelas sessões do dashboard: o período selecionado é uma
+    fatia (`filter`) do mesmo DataFrame, sem nova leitura nem cópia. As
+    colunas derivadas das datas (ver `TIME_COLUMNS`) são materializadas aqui,
+    uma única vez, antes de o DataFrame ser compartilhado.
+    """
+    if columns:
+        columns = list(columns) + TIME_SOURCE_COLUMNS
+    return TimeIndexedData(add_time_columns(_read_merged(columns)))
+
+@st.cache_resource
+def load_daily_cube(columns=CUBE_COLUMNS):
+    """
+    Cubo diário de todo o histórico (um por processo).
+
+    Somas, razões e contagens distintas (pedidos, clientes, produtos) de
+    qualquer período saem do cubo sem percorrer as linhas do período. O cubo
+    é montado sobre o histórico de `load_timeline(columns)` e lê dele as
+    linhas dos dias de borda: com as mesmas colunas do dashboard, não há uma
+    segunda cópia dos dados. `columns` deve incluir CUBE_COLUMNS.
+    """
+    return DailyCube(load_timeline(columns))
+
+@st.cache_resource
+def load_daily_sketches(columns=SKETCH_COLUMNS):
+    """
+    Sketches HyperLogLog de todo o histórico (um por processo).
+
+    Modo aproximado das contagens distintas, com erro padrão conhecido: a
+    memória depende só do número de dias (e de meses nos recortes) e a
+    consulta percorre os sketches dos dias do período, mais as linhas dos
+    dias (ou meses, nos recortes) incompletos nas bordas. Montados sobre o
+    histórico de `load_timeline(columns)`; `columns` deve incluir
+    SKETCH_COLUMNS.
+    """
+    return DailySketches(load_timeline(columns))
 
 def filter_by_date_range(df, date_range):
-    """Filtra o DataFrame pelo período selecionado."""
+    """Filtra o DataFrame (ou TimeIndexedData) pelo período selecionado."""
+    if isinstance(df, TimeIndexedData):
+        return df.filter(date_range)
+
     if not date_range or len(date_range) != 2:
         return df
     
-    # Garantir que a coluna de timestamp está no formato datetime
-    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
+    # Dados já ordenados por data (como gravados no Parquet): busca binária em vez de máscaras
+    timestamps = df['order_purchase_timestamp']
+    if pd.api.types.is_datetime64_any_dtype(timestamps) and timestamps.is_monotonic_increasing:
+        return TimeIndexedData(df).filter(date_range)
+    
+    # Garantir que a data de compra está no formato datetime (sem alterar o DataFrame recebido)
+    timestamps = pd.to_datetime(timestamps)
     
     start_date = pd.to_datetime(date_range[0])
     end_date = pd.to_datetime(date_range[1])
     
-    return df[
-        (df['order_purchase_timestamp'] >= start_date) & 
-        (df['order_purchase_timestamp'] <= end_date)
-    ]
+    return df[(timestamps >= start_date) & (timestamps <= end_date)]
 
-def calculate_acquisition_retention_kpis(df, marketing_spend=50000, date_range=None):
-    """Calcula KPIs específicos para análise de aquisição e retenção."""
-    
-    # Filtrar dados pelo período
-    df = filter_by_date_range(df, date_range)
-    
-    # Converter colunas de data para datetime
-    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-    
-    # Identificar novos vs clientes recorrentes por mês
-    df['month'] = df['order_purchase_timestamp'].dt.to_period('M')
-    df['month_str'] = df['month'].astype(str)
-    
-    # Identificar primeira compra de cada cliente
-    first_purchases = df.groupby('customer_unique_id')['order_purchase_timestamp'].min().reset_index()
-    first_purchases['month'] = first_purchases['order_purchase_timestamp'].dt.to_period('M')
-    
-    # Novos clientes por mês (corrigido)
-    new_customers = first_purchases.groupby('month')['customer_unique_id'].count().reset_index()
-    new_customers['month'] = new_customers['month'].astype(str)
-    
-    # Total de novos clientes no período (corrigido)
-    total_new_customers = first_purchases['customer_unique_id'].nunique()
-    
-    # Clientes recorrentes por mês (corrigido)
+def first_purchase_dates(sequence):
+    """Data da primeira compra de cada cliente (ver `purchase_sequence`)."""
+    return nth_purchase(sequence, 1)['order_purchase_timestamp'].reset_index()
+
+def new_customers_by_month(first_purchases):
+    """Novos clientes por mês (corrigido): clientes cuja primeira compra no período caiu no mês."""
+    first_month = time_column(first_purchases, 'order_month')
+    return by_month(first_purchases.groupby(first_month)['customer_unique_id'].count(), 'month')
+
+def returning_customers_by_month(df):
+    """Clientes recorrentes por mês (corrigido): clientes com mais de uma compra no mês."""
     # Primeiro, identificar todas as compras de cada cliente por mês
-    customer_orders = df.groupby(['customer_unique_id', 'month'])['order_id'].count().reset_index()
-    customer_orders['month'] = customer_orders['month'].astype(str)
+    month = time_column(df, 'order_month')
+    customer_orders = df.groupby(['customer_unique_id', month], observed=True)['order_id'].count()
     
     # Depois, identificar clientes que fizeram mais de uma compra no mês
-    returning_customers = customer_orders[customer_orders['order_id'] > 1].groupby('month')['customer_unique_id'].nunique()
-    returning_customers = returning_customers.reset_index()
-    
+    returning_customers = customer_orders[customer_orders > 1].reset_index().groupby('order_month')['customer_unique_id'].nunique()
+    return by_month(returning_customers, 'month')
+
+def retention_metrics(df, sequence):
+    """Taxa de recompra, tempo médio até a segunda compra e LTV do período."""
     # Taxa de recompra (corrigido)
     total_customers = df['customer_unique_id'].nunique()
-    customers_with_multiple_orders = df.groupby('customer_unique_id')['order_id'].nunique()
-    customers_with_multiple_orders = customers_with_multiple_orders[customers_with_multiple_orders > 1].count()
+    customers_with_multiple_orders = len(nth_purchase(sequence, 2))
     repurchase_rate = customers_with_multiple_orders / total_customers if total_customers > 0 else 0
     
-    # Tempo médio até segunda compra (corrigido)
-    customer_orders = df.groupby('customer_unique_id')['order_purchase_timestamp'].apply(list).reset_index()
-    customer_orders['time_to_second_purchase'] = customer_orders['order_purchase_timestamp'].apply(
-        lambda x: (x[1] - x[0]).days if len(x) > 1 else None
-    )
-    # Filtrar apenas clientes com múltiplas compras e tempo positivo
-    valid_times = customer_orders['time_to_second_purchase'].dropna()
+    # Tempo médio até segunda compra (entre pedidos distintos)
+    valid_times = purchase_gap(sequence, 2)
     valid_times = valid_times[valid_times > 0]  # Apenas tempos positivos
     avg_time_to_second = valid_times.mean() if not valid_times.empty else 0
     
-    # CAC (corrigido)
-    cac = marketing_spend / total_new_customers if total_new_customers > 0 else 0
-    
     # LTV (corrigido)
     # Calcular receita total de pedidos não cancelados
     total_revenue = df[df["pedido_cancelado"] == 0]["price"].sum()
-    # Calcular número total de clientes únicos
-    total_customers = df["customer_unique_id"].nunique()
     # LTV = Receita total / Número total de clientes
     ltv = total_revenue / total_customers if total_customers > 0 else 0
     
+    return {
+        "repurchase_rate": repurchase_rate,
+        "avg_time_to_second": avg_time_to_second,
+        "ltv": ltv,
+    }
+
+def acquisition_summary(new_customers, returning_customers, total_new_customers, retention, marketing_spend=50000):
+    """Junta as partes dos KPIs de aquisição e retenção; só o CAC depende do gasto com marketing."""
+    # CAC (corrigido)
+    cac = marketing_spend / total_new_customers if total_new_customers > 0 else 0
+    
     # Funil de conversão (simulado)
     funnel_data = {
         'Etapa': ['Visitantes', 'Carrinhos', 'Compras'],
@@ -91,23 +262,72 @@ def calculate_acquisition_retention_kpis(df, marketing_spend=50000, date_range=N
     return {
         "new_customers": new_customers,
         "returning_customers": returning_customers,
-        "repurchase_rate": repurchase_rate,
-        "avg_time_to_second": avg_time_to_second,
+        "repurchase_rate": retention["repurchase_rate"],
+        "avg_time_to_second": retention["avg_time_to_second"],
         "cac": cac,
-        "ltv": ltv,
+        "ltv": retention["ltv"],
         "funnel_data": pd.DataFrame(funnel_data),
         "total_new_customers": total_new_customers
     }
 
-def calculate_kpis(df, marketing_spend=50000, date_range=None):
-    """Calcula os principais KPIs do negócio."""
+def calculate_acquisition_retention_kpis(df, marketing_spend=50000, date_range=None):
+    """
+    Calcula KPIs específicos para análise de aquisição e retenção.
+
+    As partes (novos clientes, recorrentes, retenção) também são nós de
+    `utils.grafo_kpis`, memorizados separadamente no dashboard.
+    """
     
     # Filtrar dados pelo período
     df = filter_by_date_range(df, date_range)
     
-    # Converter colunas de data para datetime
-    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-    df['order_delivered_customer_date'] = pd.to_datetime(df['order_delivered_customer_date'])
+    # Pedidos distintos de cada cliente em ordem de compra (uma única ordenação)
+    sequence = purchase_sequence(df)
+    
+    # Identificar primeira compra de cada cliente
+    first_purchases = first_purchase_dates(sequence)
+    
+    # Total de novos clientes no período (corrigido)
+    total_new_customers = first_purchases['customer_unique_id'].nunique()
+    
+    return acquisition_summary(
+        new_customers_by_month(first_purchases),
+        returning_customers_by_month(df),
+        total_new_customers,
+        retention_metrics(df, sequence),
+        marketing_spend
+    )
+
+def calculate_kpis(df, marketing_spend=50000, date_range=None, cube=None, sketches=None):
+    """
+    Calcula os principais KPIs do negócio.
+
+    Com `cube` (ver `load_daily_cube`), os KPIs saem das somas acumuladas e do
+    índice diário de IDs distintos do cubo, sem percorrer as linhas do período.
+    Com `sketches` (ver `load_daily_sketches`), pedidos e clientes distintos são
+    estimados por HyperLogLog e o erro padrão relativo vem em `distinct_error`.
+    """
+    if cube is not None:
+        kpis = cube.kpis(date_range)
+    else:
+        kpis = _calculate_kpis_from_rows(df, date_range)
+    
+    if sketches is not None:
+        kpis["total_orders"] = sketches.count('orders', date_range)
+        kpis["total_customers"] = sketches.count('customers', date_range)
+        kpis["distinct_error"] = sketches.error
+    
+    # Ticket médio
+    total_orders = kpis["total_orders"]
+    kpis["average_ticket"] = kpis["total_revenue"] / total_orders if total_orders > 0 else 0
+    
+    return kpis
+
+def _calculate_kpis_from_rows(df, date_range=None):
+    """KPIs calculados diretamente sobre as linhas do período."""
+    
+    # Filtrar dados pelo período
+    df = filter_by_date_range(df, date_range)
     
     # Calcular KPIs
     total_revenue = df[df["pedido_cancelado"] == 0]["price"].sum()
@@ -128,8 +348,7 @@ def calculate_kpis(df, marketing_spend=50000, date_range=None):
     average_ticket = total_revenue / total_orders if total_orders > 0 else 0
     
     # Tempo médio de entrega
-    df['delivery_time'] = (df['order_delivered_customer_date'] - df['order_purchase_timestamp']).dt.days
-    avg_delivery_time = df['delivery_time'].mean()
+    avg_delivery_time = time_column(df, 'delivery_time').mean()
     
     # Taxa de cancelamento
     cancellation_rate = df["pedido_cancelado"].mean()
@@ -151,70 +370,121 @@ def calculate_kpis(df, marketing_spend=50000, date_range=None):
         "lost_revenue": lost_revenue
     }
 
-def calculate_churn_features(df, cutoff_date):
-    """Calcula as features derivadas para análise de churn."""
-    # Converter colunas de data para datetime
-    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-    df['order_delivered_customer_date'] = pd.to_datetime(df['order_delivered_customer_date'])
+# Features de churn, calculadas em uma única agregação por cliente.
+# Para adicionar uma feature, acrescente uma entrada nos dicionários abaixo.
+
+# Colunas auxiliares por linha (nome -> função do DataFrame)
+CHURN_ROW_COLUMNS = {
+    'is_canceled': lambda df: (df['order_status'] == 'canceled').astype('int64'),
+}
+
+# Agregações por cliente (nome -> (coluna, agregação))
+CHURN_AGGREGATIONS = {
+    'total_spent': ('payment_value', 'sum'),
+    'num_orders': ('order_id', 'nunique'),
+    'std_order_value': ('payment_value', 'std'),
+    'avg_installments': ('payment_installments', 'mean'),
+    'avg_review': ('review_score', 'mean'),
+    'canceled_rows': ('is_canceled', 'sum'),
+    'last_purchase': ('order_purchase_timestamp', 'max'),
+}
+
+# Features derivadas das agregações (nome -> função das agregações e da data de corte)
+CHURN_DERIVED = {
+    'avg_order_value': lambda f, cutoff: f['total_spent'] / f['num_orders'],
+    # Sem pedidos cancelados a taxa fica ausente (tratada em churn_analysis.py)
+    'cancel_rate': lambda f, cutoff: (f['canceled_rows'] / f['num_orders']).where(f['canceled_rows'] > 0),
+    'recency': lambda f, cutoff: (cutoff - f['last_purchase']).dt.days,
+}
+
+# Features devolvidas, na ordem das colunas
+CHURN_FEATURES = [
+    'total_spent', 'num_orders', 'avg_order_value', 'std_order_value',
+    'avg_installments', 'avg_review', 'cancel_rate', 'recency'
+]
+
+def calculate_churn_features(df, cutoff_date, features=None):
+    """
+    Calcula as features derivadas para análise de churn.
+
+    Todas as agregações por cliente saem de um único `groupby` sobre a chave
+    inteira do cliente; as features derivadas são calculadas sobre o resultado.
+
+    Parâmetros:
+    -----------
+    df : pd.DataFrame
+        Dados consolidados (ver CHURN_COLUMNS)
+    cutoff_date : datetime
+        Apenas compras até esta data são consideradas
+    features : list ou None
+        Features devolvidas (padrão: CHURN_FEATURES)
+
+    Retorno:
+    --------
+    pd.DataFrame
+        Uma linha por cliente ativo antes da data de corte
+    """
+    features = features or CHURN_FEATURES
     
     # Filtrar dados antes da data de corte
-    df_before_cutoff = df[df['order_purchase_timestamp'] <= cutoff_date]
-    
-    # Calcular total gasto por cliente
-    total_spent = df_before_cutoff.groupby('customer_unique_id')['payment_value'].sum()
-    
-    # Calcular número de pedidos únicos por cliente
-    num_orders = df_before_cutoff.groupby('customer_unique_id')['order_id'].nunique()
-    
-    # Calcular ticket médio por cliente
-    avg_order_value = total_spent / num_orders
-    
-    # Calcular variação dos tickets por cliente
-    std_order_value = df_before_cutoff.groupby('customer_unique_id')['payment_value'].std()
-    
-    # Calcular média de parcelas por cliente
-    avg_installments = df_before_cutoff.groupby('customer_unique_id')['payment_installments'].mean()
-    
-    # Calcular média das avaliações por cliente
-    avg_review = df_before_cutoff.groupby('customer_unique_id')['review_score'].mean()
-    
-    # Calcular taxa de cancelamento por cliente
-    cancel_rate = df_before_cutoff[df_before_cutoff['order_status'] == 'canceled'].groupby('customer_unique_id')['order_id'].count() / num_orders
-    
-    # Calcular recência (dias desde a última compra) por cliente
-    last_purchase_date = df_before_cutoff.groupby('customer_unique_id')['order_purchase_timestamp'].max()
-    recency = (cutoff_date - last_purchase_date).dt.days
-    
-    # Criar DataFrame com as features derivadas
-    churn_features = pd.DataFrame({
-        'total_spent': total_spent,
-        'num_orders': num_orders,
-        'avg_order_value': avg_order_value,
-        'std_order_value': std_order_value,
-        'avg_installments': avg_installments,
-        'avg_review': avg_review,
-        'cancel_rate': cancel_rate,
-        'recency': recency
-    }).reset_index()
-    
-    return churn_features
+    timestamps = pd.to_datetime(df['order_purchase_timestamp'])
+    df_before_cutoff = df[timestamps <= cutoff_date].assign(order_purchase_timestamp=timestamps)
+    df_before_cutoff = df_before_cutoff.assign(**{
+        name: function(df_before_cutoff) for name, function in CHURN_ROW_COLUMNS.items()
+    })
+    
+    # Uma única agregação por cliente
+    aggregated = df_before_cutoff.groupby('customer_unique_id', observed=True).agg(**CHURN_AGGREGATIONS)
+    for name, function in CHURN_DERIVED.items():
+        aggregated[name] = function(aggregated, cutoff_date)
+    
+    return aggregated[features].reset_index()
+
+def churn_labels(span, cutoff_dates):
+    """
+    Rótulos de churn de cada cliente para uma ou várias datas de corte
+
+    Um cliente está ativo em uma data de corte se a primeira compra é anterior
+    a ela, e é churn se a última compra também é (não comprou depois do corte).
+    Todas as datas são rotuladas de uma vez, comparando as datas de cada
+    cliente com o vetor de datas de corte.
+
+    Parâmetros:
+    -----------
+    span : pd.DataFrame
+        Primeira e última compra por cliente (ver `purchase_span`)
+    cutoff_dates : list
+        Datas de corte
+
+    Retorno:
+    --------
+    pd.DataFrame
+        Matriz cliente x data de corte com 1 (churn), 0 (não churn) ou
+        <NA> (cliente ainda não ativo na data)
+    """
+    cutoffs = pd.DatetimeIndex(pd.to_datetime(list(cutoff_dates)))
+    first = span['first_purchase'].to_numpy()[:, None]
+    last = span['last_purchase'].to_numpy()[:, None]
+    cutoff_values = cutoffs.to_numpy()[None, :]
+
+    labels = np.where(last <= cutoff_values, 1, 0)
+    labels = pd.DataFrame(labels, index=span.index, columns=cutoffs).astype('Int8')
+    return labels.mask(~(first <= cutoff_values))
+
+@st.cache_data
+def load_purchase_span(columns=None):
+    """Primeira e última compra por cliente, calculadas uma vez por projeção dos dados."""
+    return purchase_span(load_data(columns=columns))
 
 def define_churn(df, cutoff_date):
     """Define a variável de churn com base na data de corte."""
-    # Converter colunas de data para datetime
-    df['order_purchase_timestamp'] = pd.to_datetime(df['order_purchase_timestamp'])
-    
-    # Identificar clientes ativos antes da data de corte
-    active_customers = df[df['order_purchase_timestamp'] <= cutoff_date]['customer_unique_id'].unique()
-    
-    # Identificar clientes que compraram após a data de corte
-    customers_after_cutoff = df[df['order_purchase_timestamp'] > cutoff_date]['customer_unique_id'].unique()
-    
-    # Definir churn: 1 se não comprou após a data de corte, 0 caso contrário
-    churn_status = {customer: 0 if customer in customers_after_cutoff else 1 for customer in active_customers}
+    labels = churn_labels(purchase_span(df), [cutoff_date]).iloc[:, 0].dropna()
     
-    # Criar DataFrame com o status de churn
-    churn_df = pd.DataFrame(list(churn_status.items()), columns=['customer_unique_id', 'churn'])
+    # Criar DataFrame com o status de churn (apenas clientes ativos antes do corte)
+    churn_df = pd.DataFrame({
+        'customer_unique_id': labels.index,
+        'churn': labels.to_numpy(dtype='int64')
+    })
     
     return churn_df
 
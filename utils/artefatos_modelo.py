@@ -0,0 +1,71 @@
+import os
+import pickle
+import streamlit as st
+
+# Artefatos gravados por churn_analysis.py
+MODEL_FILE = "churn_model.pkl"
+SCALER_FILE = "churn_scaler.pkl"
+COLUMNS_FILE = "churn_feature_columns.pkl"
+ARTIFACT_FILES = [MODEL_FILE, SCALER_FILE, COLUMNS_FILE]
+
+def _atomic_write(path, write):
+    """
+    Grava ao lado e depois troca o arquivo: o dashboard, que relê o modelo
+    quando o arquivo muda, nunca lê um pickle pela metade.
+    """
+    staging = f"{path}.{os.getpid()}.tmp"
+    write(staging)
+    os.replace(staging, path)
+
+def _pickle_to(obj):
+    def write(path):
+        with open(path, 'wb') as f:
+            pickle.dump(obj, f)
+    return write
+
+def save_model_artifacts(model, scaler, feature_columns, directory="."):
+    """Grava modelo, scaler e lista de features."""
+    # O modelo por último: sua versão é a que invalida o cache de load_model_artifacts
+    _atomic_write(os.path.join(directory, SCALER_FILE), _pickle_to(scaler))
+    _atomic_write(os.path.join(directory, COLUMNS_FILE), _pickle_to(feature_columns))
+    _atomic_write(os.path.join(directory, MODEL_FILE), _pickle_to(model))
+
+def _signature(path):
+    """Identifica a versão de um arquivo (None se não existir)."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+@st.cache_resource(max_entries=1)
+def _load_artifacts(directory, signatures):
+    """
+    Lê os artefatos de uma versão (`signatures` faz parte da chave do cache)
+
+    O cache é compartilhado por todas as sessões do processo e guarda apenas
+    a versão mais recente.
+    """
+    artifacts = []
+    for name in ARTIFACT_FILES:
+        with open(os.path.join(directory, name), 'rb') as f:
+            artifacts.append(pickle.load(f))
+    model, scaler, feature_columns = artifacts
+    return model, scaler, list(feature_columns)
+
+def load_model_artifacts(directory="."):
+    """
+    Modelo, scaler e lista de features do último treino
+
+    Lidos uma vez por processo, em uma única cópia compartilhada pelas
+    sessões do dashboard, e relidos apenas quando algum arquivo muda.
+
+    Retorno:
+    --------
+    tuple
+        Modelo, scaler e lista de features
+    """
+    signatures = tuple(_signature(os.path.join(directory, name)) for name in ARTIFACT_FILES)
+    if None in signatures:
+        raise FileNotFoundError(f"Artefatos do modelo de churn não encontrados em {os.path.abspath(directory)}")
+    return _load_artifacts(directory, signatures)
@@ -0,0 +1,186 @@
+import os
+import json
+import math
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, ParameterSampler, StratifiedKFold, train_test_split, cross_val_score
+
+# Checkpoints das buscas (um subdiretório por configuração de busca)
+SEARCH_DIR = "churn_search"
+RESULTS_FILE = "results.jsonl"
+
+def _search_key(model, param_grid, X, y, settings):
+    """Identificador da busca: mesmo modelo, espaço, dados e configuração retomam o mesmo checkpoint."""
+    digest = hashlib.sha1()
+    digest.update(json.dumps({
+        'model': type(model).__name__,
+        'model_params': {key: repr(value) for key, value in model.get_params().items()},
+        'param_grid': param_grid,
+        **settings,
+    }, sort_keys=True, default=repr).encode())
+    digest.update(np.ascontiguousarray(X).tobytes())
+    digest.update(np.ascontiguousarray(y).tobytes())
+    return digest.hexdigest()[:16]
+
+def _load_checkpoint(path):
+    """Avaliações já gravadas, indexadas por (rodada, candidato)."""
+    done = {}
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    # Linha incompleta de uma execução interrompida durante a gravação
+                    continue
+                done[(result['round'], result['candidate'])] = result
+    return done
+
+def _end_last_line(path):
+    """Termina com quebra de linha um checkpoint cuja última gravação foi interrompida."""
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        with open(path, 'rb+') as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+def _round_resources(n_samples, n_candidates, factor, halving, min_resources):
+    """Amostras de treino por rodada; a última rodada usa o conjunto completo."""
+    if not halving:
+        return [n_samples]
+    n_rounds = 1 + int(math.log(max(n_candidates, 1)) / math.log(factor))
+    # Rodadas com amostras demais de poucas não distinguem candidatos: limita o número de rodadas
+    while n_rounds > 1 and n_samples / factor ** (n_rounds - 1) < min_resources:
+        n_rounds -= 1
+    return [int(n_samples / factor ** (n_rounds - 1 - rnd)) for rnd in range(n_rounds)]
+
+def _subsample(X, y, size, random_state):
+    if size >= len(y):
+        return X, y
+    X_sample, _, y_sample, _ = train_test_split(X, y, train_size=size, stratify=y, random_state=random_state)
+    return X_sample, y_sample
+
+def successive_halving(model, param_grid, X, y, cv=3, n_candidates=20, factor=3, halving=True,
+                       time_budget=None, scoring='f1_macro', n_jobs=-1, min_resources=200,
+                       search_dir=SEARCH_DIR, random_state=42):
+    """
+    Busca de hiperparâmetros por sorteio e eliminação sucessiva, com checkpoint
+
+    Sorteia `n_candidates` combinações do espaço. Cada rodada avalia os
+    candidatos restantes com validação cruzada sobre uma amostra estratificada
+    dos dados e mantém apenas a melhor fração 1/factor; a amostra cresce pelo
+    mesmo fator até o conjunto completo na última rodada. Com halving=False há
+    uma única rodada (busca aleatória).
+
+    Cada avaliação é gravada assim que termina, então uma busca interrompida
+    (ou que esgotou o orçamento) retoma de onde parou ao ser executada de novo
+    com os mesmos dados e parâmetros.
+
+    Parâmetros:
+    -----------
+    model : estimador scikit-learn
+        Modelo base (os candidatos alteram seus parâmetros)
+    param_grid : dict
+        Valores possíveis de cada hiperparâmetro
+    X, y : numpy.ndarray
+        Dados de treino
+    cv : int
+        Número de folds de cada avaliação
+    n_candidates : int
+        Combinações sorteadas (limitado ao tamanho do espaço)
+    factor : int
+        Fator de eliminação e de crescimento da amostra entre rodadas
+    halving : bool
+        Se False, avalia todos os candidatos com o conjunto completo
+    time_budget : float ou None
+        Segundos desta execução; ao esgotar, nenhuma avaliação nova é iniciada
+    scoring : str
+        Métrica do scikit-learn a maximizar
+    n_jobs : int
+        Processos para os folds de cada avaliação
+    min_resources : int
+        Menor amostra de treino usada na primeira rodada
+    search_dir : str
+        Diretório dos checkpoints
+    random_state : int
+        Semente do sorteio, das amostras e dos folds
+
+    Retorno:
+    --------
+    tuple
+        Melhores hiperparâmetros (dict) e DataFrame com todas as avaliações
+    """
+    X, y = np.asarray(X), np.asarray(y)
+    n_candidates = min(n_candidates, len(ParameterGrid(param_grid)))
+    candidates = list(ParameterSampler(param_grid, n_iter=n_candidates, random_state=random_state))
+    resources = _round_resources(len(y), n_candidates, factor, halving, min_resources)
+
+    key = _search_key(model, param_grid, X, y, {
+        'cv': cv, 'n_candidates': n_candidates, 'factor': factor, 'halving': halving,
+        'scoring': scoring, 'min_resources': min_resources, 'random_state': random_state,
+    })
+    checkpoint_dir = os.path.join(search_dir, key)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    checkpoint = os.path.join(checkpoint_dir, RESULTS_FILE)
+    done = _load_checkpoint(checkpoint)
+    # As próximas avaliações não podem ser gravadas na mesma linha de uma incompleta
+    _end_last_line(checkpoint)
+    if done:
+        print(f"Retomando busca {key}: {len(done)} avaliações já no checkpoint")
+
+    folds = StratifiedKFold(n_splits=cv, shuffle=True, random_state=random_state)
+    start = time.perf_counter()
+    survivors = list(range(len(candidates)))
+    out_of_budget = False
+
+    with open(checkpoint, 'a', encoding='utf-8') as log:
+        for rnd, size in enumerate(resources):
+            print(f"Rodada {rnd + 1}/{len(resources)}: {len(survivors)} candidatos com {size} amostras")
+            X_round, y_round = _subsample(X, y, size, random_state)
+
+            for candidate in survivors:
+                if (rnd, candidate) in done:
+                    continue
+                if time_budget is not None and time.perf_counter() - start > time_budget:
+                    out_of_budget = True
+                    break
+
+                evaluation_start = time.perf_counter()
+                scores = cross_val_score(
+                    clone(model).set_params(**candidates[candidate]), X_round, y_round,
+                    cv=folds, scoring=scoring, n_jobs=n_jobs, error_score=np.nan
+                )
+                score = float(np.nanmean(scores)) if not np.isnan(scores).all() else None
+                result = {
+                    'round': rnd, 'candidate': candidate, 'resources': size,
+                    'params': candidates[candidate], 'score': score,
+                    'seconds': time.perf_counter() - evaluation_start,
+                }
+                log.write(json.dumps(result) + "\n")
+                log.flush()
+                done[(rnd, candidate)] = result
+                print(f"  candidato {candidate}: {scoring}={score}")
+
+            if out_of_budget:
+                print("Orçamento de tempo esgotado; execute novamente para retomar a busca")
+                break
+
+            # Mantém a melhor fração (candidatos com erro ficam por último)
+            ranked = sorted(survivors, key=lambda candidate: -np.inf if done[(rnd, candidate)]['score'] is None
+                            else done[(rnd, candidate)]['score'], reverse=True)
+            survivors = ranked[:max(1, math.ceil(len(survivors) / factor))]
+
+    if not done:
+        raise ValueError("Orçamento de tempo esgotado antes da primeira avaliação; execute novamente para retomar a busca")
+
+    results = pd.DataFrame(list(done.values())).sort_values(['round', 'score'], ascending=[True, False])
+
+    # Escores de rodadas diferentes usam amostras diferentes: compara só a última rodada alcançada
+    last_round = results[results['round'] == results['round'].max()].dropna(subset=['score'])
+    if last_round.empty:
+        raise ValueError("Nenhum candidato avaliado com sucesso na busca de hiperparâmetros")
+    best = last_round.loc[last_round['score'].idxmax()]
+    return candidates[int(best['candidate'])], results
@@ -0,0 +1,77 @@
+import os
+import pandas as pd
+
+# Tabelas de conversão código <-> valor original dos IDs (uma por coluna)
+LOOKUP_DIR = "olist_id_lookup"
+
+# IDs hexadecimais de 32 caracteres trocados por chaves inteiras compactas
+ID_COLUMNS = ['order_id', 'customer_id', 'customer_unique_id', 'product_id', 'seller_id', 'review_id']
+
+# Colunas de baixa cardinalidade armazenadas como `category`
+CATEGORY_COLUMNS = [
+    'order_status', 'customer_state', 'customer_city', 'seller_state', 'seller_city',
+    'payment_type', 'product_category_name', 'product_category_name_english'
+]
+
+def _lookup_path(column, lookup_dir=LOOKUP_DIR):
+    return os.path.join(lookup_dir, f"{column}.parquet")
+
+def load_lookup(column, lookup_dir=LOOKUP_DIR):
+    """Tabela de conversão de uma coluna de ID (colunas `code` e `value`)."""
+    path = _lookup_path(column, lookup_dir)
+    if not os.path.exists(path):
+        return pd.DataFrame({'code': pd.Series(dtype='int32'), 'value': pd.Series(dtype='object')})
+    return pd.read_parquet(path)
+
+def update_lookup(column, values, lookup_dir=LOOKUP_DIR):
+    """
+    Acrescenta valores novos à tabela de conversão e devolve a tabela atualizada
+
+    Os códigos já atribuídos nunca mudam: valores novos recebem os próximos
+    códigos livres. Assim, partições gravadas em builds anteriores continuam válidas.
+    """
+    lookup = load_lookup(column, lookup_dir)
+    known = pd.Index(lookup['value'])
+    new_values = pd.Index(pd.unique(pd.Series(values).dropna())).difference(known)
+
+    if len(new_values) > 0:
+        start = len(lookup)
+        lookup = pd.concat([
+            lookup,
+            pd.DataFrame({'code': range(start, start + len(new_values)), 'value': new_values})
+        ], ignore_index=True)
+        lookup['code'] = lookup['code'].astype('int32')
+        os.makedirs(lookup_dir, exist_ok=True)
+        lookup.to_parquet(_lookup_path(column, lookup_dir), index=False)
+
+    return lookup
+
+def encode_columns(df, lookup_dir=LOOKUP_DIR):
+    """
+    Troca as colunas de ID por chaves inteiras (Int32) e converte as colunas
+    de baixa cardinalidade para `category`.
+    """
+    for column in ID_COLUMNS:
+        if column in df.columns and not pd.api.types.is_integer_dtype(df[column]):
+            lookup = update_lookup(column, df[column], lookup_dir)
+            codes = pd.Series(pd.Index(lookup['value']).get_indexer(df[column]), index=df.index)
+            df[column] = codes.astype('Int32').mask(codes < 0)
+
+    for column in CATEGORY_COLUMNS:
+        if column in df.columns and not isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype('category')
+
+    return df
+
+def decode_ids(codes, column, lookup_dir=LOOKUP_DIR):
+    """Converte chaves inteiras de volta para os IDs originais (para exibição)."""
+    lookup = load_lookup(column, lookup_dir)
+    values = pd.Series(lookup['value'].to_numpy(), index=lookup['code'].to_numpy())
+    codes = pd.Series(codes)
+    return codes.map(values)
+
+def encode_ids(values, column, lookup_dir=LOOKUP_DIR):
+    """Converte IDs originais para as chaves inteiras (ausente se o ID não existe)."""
+    lookup = load_lookup(column, lookup_dir)
+    codes = pd.Series(lookup['code'].to_numpy(), index=lookup['value'].to_numpy())
+    return pd.Series(values).map(codes).astype('Int32')
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Colunas de data usadas pelas colunas derivadas
+TIME_SOURCE_COLUMNS = [
+    'order_purchase_timestamp', 'order_delivered_customer_date', 'order_estimated_delivery_date'
+]
+
+def _purchase_days(df):
+    return pd.to_datetime(df['order_purchase_timestamp']).to_numpy().astype('datetime64[D]')
+
+def _days_between(end, start):
+    return (pd.to_datetime(end) - pd.to_datetime(start)).dt.days
+
+# Colunas derivadas das datas, materializadas uma vez na carga (nome -> função do DataFrame).
+# - order_month: código inteiro do mês (meses desde 1970-01, o ordinal do Period 'M')
+# - order_day: dia da compra (datetime truncado no dia)
+# - order_weekday: dia da semana (0 = segunda-feira, 6 = domingo)
+# - delivery_time: dias entre a compra e a entrega (NaN se não entregue)
+# - delivery_delay: dias de atraso em relação à data prevista (negativo = adiantado)
+TIME_COLUMNS = {
+    'order_month': lambda df: pd.to_datetime(df['order_purchase_timestamp']).to_numpy().astype('datetime64[M]').astype('int32'),
+    'order_day': _purchase_days,
+    # 1970-01-01 foi uma quinta-feira (dia 3)
+    'order_weekday': lambda df: ((_purchase_days(df).astype('int64') + 3) % 7).astype('int8'),
+    'delivery_time': lambda df: _days_between(df['order_delivered_customer_date'], df['order_purchase_timestamp']),
+    'delivery_delay': lambda df: _days_between(df['order_delivered_customer_date'], df['order_estimated_delivery_date']),
+}
+
+# Nomes dos dias da semana e dos meses, na ordem dos códigos
+WEEKDAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+MONTH_NAMES = ['January', 'February', 'March', 'April', 'May', 'June',
+               'July', 'August', 'September', 'October', 'November', 'December']
+
+def add_time_columns(df):
+    """
+    Acrescenta ao DataFrame (que deve ter TIME_SOURCE_COLUMNS) as colunas de
+    TIME_COLUMNS. Altera o próprio DataFrame: usada na carga, antes de ele
+    ser compartilhado.
+    """
+    for name, function in TIME_COLUMNS.items():
+        df[name] = function(df)
+    return df
+
+def time_column(df, name):
+    """Coluna derivada materializada na carga, ou calculada na hora se o DataFrame não a tiver."""
+    if name in df.columns:
+        return df[name]
+    return pd.Series(TIME_COLUMNS[name](df), index=df.index, name=name)
+
+def month_labels(codes):
+    """Rótulos 'AAAA-MM' (o mesmo texto de str(Period)) dos códigos de mês."""
+    codes = np.asarray(codes, dtype='int64')
+    return pd.Index([f"{year:04d}-{month:02d}" for year, month in zip(codes // 12 + 1970, codes % 12 + 1)])
+
+def by_month(result, name='order_purchase_timestamp'):
+    """
+    Resultado de um groupby por `order_month` com o código do mês trocado
+    pelo rótulo 'AAAA-MM' (coluna `name`), pronto para os gráficos.
+    """
+    return result.set_axis(month_labels(result.index).rename(name)).reset_index()
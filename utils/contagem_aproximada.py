@@ -0,0 +1,271 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from utils.indice_temporal import TimeIndexedData
+
+# 2^12 registradores por sketch: erro padrão relativo de ~1,6%
+PRECISION = 12
+
+# Granularidade dos sketches (frequência de Period): um por dia para as
+# contagens totais e um por mês e valor de cada recorte
+TOTAL_BLOCK = 'D'
+GROUP_BLOCK = 'M'
+
+# Colunas necessárias para montar os sketches
+SKETCH_COLUMNS = [
+    'order_purchase_timestamp', 'order_id', 'customer_unique_id',
+    'product_category_name', 'customer_state'
+]
+
+# Contagens distintas aproximadas (nome -> coluna de ID)
+SKETCH_KEYS = {
+    'orders': 'order_id',
+    'customers': 'customer_unique_id',
+}
+
+# Recortes com sketches próprios (mensais)
+SKETCH_GROUPS = ['product_category_name', 'customer_state']
+
+def relative_error(precision=PRECISION):
+    """Erro padrão relativo do HyperLogLog com 2^precision registradores."""
+    return 1.04 / np.sqrt(2 ** precision)
+
+def _bit_length(values):
+    """Número de bits significativos de cada inteiro sem sinal (0 -> 0)."""
+    lengths = np.zeros(values.shape, dtype='int64')
+    for shift in (32, 16, 8, 4, 2, 1):
+        large = values >= (np.uint64(1) << np.uint64(shift))
+        lengths[large] += shift
+        values = np.where(large, values >> np.uint64(shift), values)
+    return lengths + (values > 0)
+
+def hash_registers(values, precision=PRECISION):
+    """
+    Registrador e posto (rank) HyperLogLog de cada valor
+
+    Os primeiros `precision` bits do hash escolhem o registrador; o posto é a
+    posição do primeiro bit 1 nos bits restantes. Valores ausentes recebem
+    posto 0 e não alteram nenhum sketch.
+    """
+    hashes = pd.util.hash_pandas_object(pd.Series(values), index=False).to_numpy()
+    tail_bits = 64 - precision
+    register = (hashes >> np.uint64(tail_bits)).astype('int64')
+    tail = hashes & np.uint64((1 << tail_bits) - 1)
+    rank = (tail_bits - _bit_length(tail) + 1).astype('uint8')
+    rank[np.asarray(pd.isna(values))] = 0
+    return register, rank
+
+def estimate(registers):
+    """Estimativa HyperLogLog da cardinalidade (última dimensão = registradores)."""
+    registers = np.asarray(registers, dtype='float64')
+    m = registers.shape[-1]
+    alpha = 0.7213 / (1 + 1.079 / m)
+    raw = alpha * m * m / np.sum(np.exp2(-registers), axis=-1)
+
+    # Correção para cardinalidades pequenas (contagem linear)
+    zeros = np.count_nonzero(registers == 0, axis=-1)
+    linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+def block_bounds(timestamps, freq):
+    """
+    Inícios de blocos consecutivos do calendário (dias ou meses) que cobrem
+    as datas, seguidos do fim do último bloco (n_blocos + 1 limites).
+    """
+    periods = pd.period_range(timestamps.min().to_period(freq), timestamps.max().to_period(freq) + 1, freq=freq)
+    return periods.to_timestamp().to_numpy()
+
+def split_blocks(bounds, timeline, date_range):
+    """
+    Divide o período em blocos inteiros e linhas das bordas
+
+    Parâmetros:
+    -----------
+    bounds : np.ndarray
+        Limites dos blocos (ver `block_bounds`)
+    timeline : TimeIndexedData
+        Datas de compra ordenadas, para localizar as linhas de borda
+    date_range : list ou None
+        Período [início, fim]
+
+    Retorno:
+    --------
+    tuple
+        Índices [primeiro, último) dos blocos inteiros e lista de faixas de
+        linhas [início, fim) das partes de blocos nas bordas do período
+    """
+    if not date_range or len(date_range) != 2:
+        return 0, len(bounds) - 1, []
+
+    start = pd.to_datetime(date_range[0])
+    end = pd.to_datetime(date_range[1])
+
+    first = int(np.searchsorted(bounds, np.datetime64(start), side='left'))
+    last = int(np.searchsorted(bounds, np.datetime64(end + pd.Timedelta(1, 'ns')), side='right')) - 1
+    if first >= last:
+        # Período dentro de um único bloco (ou entre dois blocos vizinhos)
+        return 0, 0, [timeline.positions(start, end)]
+
+    return first, last, [
+        timeline.positions(start, pd.Timestamp(bounds[first]) - pd.Timedelta(1, 'ns')),
+        timeline.positions(pd.Timestamp(bounds[last]), end),
+    ]
+
+def _dense_registers(block_of_row, group_codes, register, rank, n_blocks, n_groups, precision):
+    """Registradores (blocos x valores do recorte x 2^precision) com o maior posto de cada posição."""
+    m = 2 ** precision
+    registers = np.zeros((n_blocks, n_groups, m), dtype='uint8')
+    valid = (rank > 0) & (group_codes >= 0)
+    position = (block_of_row[valid] * n_groups + group_codes[valid]) * m + register[valid]
+    best = pd.Series(rank[valid]).groupby(position).max()
+    registers.reshape(-1)[best.index.to_numpy()] = best.to_numpy()
+    return registers
+
+class DailySketches:
+    """
+    Sketches HyperLogLog para contagens distintas aproximadas
+
+    Há um sketch (2^precision registradores uint8) por dia para todo o
+    dataset e um por mês e valor de cada recorte (categoria, estado). A
+    memória depende só do número de dias, meses e valores dos recortes, não
+    do número de linhas. Um período é respondido pela união (máximo
+    registrador a registrador, `np.maximum.reduce`) de uma fatia contígua
+    dos sketches dos blocos inteiros; apenas as linhas das partes de blocos
+    nas bordas (dias de borda nas contagens totais, dias de meses
+    incompletos nos recortes) são lidas do histórico e acrescentadas.
+
+    Parâmetros:
+    -----------
+    data : TimeIndexedData ou pd.DataFrame
+        Histórico com SKETCH_COLUMNS; de preferência o já compartilhado pelo
+        dashboard (ver `load_timeline`)
+    precision : int
+        Bits de endereço dos registradores
+    """
+
+    def __init__(self, data, precision=PRECISION):
+        timeline = data if isinstance(data, TimeIndexedData) else TimeIndexedData(data)
+        data = timeline.df
+        timestamps = data['order_purchase_timestamp']
+
+        self.precision = precision
+        self.error = relative_error(precision)
+        self.timeline = timeline
+        self._bounds = {
+            TOTAL_BLOCK: block_bounds(timestamps, TOTAL_BLOCK),
+            GROUP_BLOCK: block_bounds(timestamps, GROUP_BLOCK),
+        }
+        block_of_row = {
+            freq: np.searchsorted(bounds, timestamps.to_numpy(), side='right') - 1
+            for freq, bounds in self._bounds.items()
+        }
+
+        group_codes, self._group_labels = {}, {}
+        for group in SKETCH_GROUPS:
+            codes, labels = pd.factorize(data[group])
+            group_codes[group] = codes.astype('int64')
+            self._group_labels[group] = pd.Index(labels)
+
+        self._registers = {}
+        for key, column in SKETCH_KEYS.items():
+            register, rank = hash_registers(data[column], precision)
+            self._registers[(key, None)] = _dense_registers(
+                block_of_row[TOTAL_BLOCK], np.zeros(len(data), dtype='int64'), register, rank,
+                len(self._bounds[TOTAL_BLOCK]) - 1, 1, precision
+            )
+            for group in SKETCH_GROUPS:
+                self._registers[(key, group)] = _dense_registers(
+                    block_of_row[GROUP_BLOCK], group_codes[group], register, rank,
+                    len(self._bounds[GROUP_BLOCK]) - 1, len(self._group_labels[group]), precision
+                )
+
+    def _merge(self, key, date_range, group=None):
+        """
+        Registradores do período, um sketch por valor do recorte
+
+        Retorno:
+        --------
+        np.ndarray
+            Matriz (valores do recorte x registradores); uma única linha sem recorte
+        """
+        bounds = self._bounds[TOTAL_BLOCK if group is None else GROUP_BLOCK]
+        first, last, edges = split_blocks(bounds, self.timeline, date_range)
+        merged = np.maximum.reduce(self._registers[(key, group)][first:last], axis=0, initial=0)
+
+        for row_start, row_end in edges:
+            if row_end == row_start:
+                continue
+            rows = self.timeline.df.iloc[row_start:row_end]
+            register, rank = hash_registers(rows[SKETCH_KEYS[key]], self.precision)
+            if group is None:
+                groups = np.zeros(len(rows), dtype='int64')
+            else:
+                groups = self._group_labels[group].get_indexer(rows[group])
+            valid = (groups >= 0) & (rank > 0)
+            np.maximum.at(merged, (groups[valid], register[valid]), rank[valid])
+
+        return merged
+
+    def count(self, key, date_range=None):
+        """Contagem distinta aproximada de `key` ('orders' ou 'customers') no período."""
+        return float(estimate(self._merge(key, date_range))[0])
+
+    def count_by(self, key, group, date_range=None):
+        """Contagem distinta aproximada de `key` por valor do recorte `group`."""
+        counts = pd.Series(estimate(self._merge(key, date_range, group)), index=self._group_labels[group])
+        return counts[counts > 0]
+
+def _milliseconds(function, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = function()
+    return result, (time.perf_counter() - start) / repeat * 1000
+
+if __name__ == "__main__":
+    from utils.KPIs import load_timeline
+
+    parser = argparse.ArgumentParser(description='Compara contagens distintas exatas e aproximadas (HyperLogLog)')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetições de cada consulta')
+    parser.add_argument('--scale', type=int, default=1,
+                        help='Repete o histórico N vezes, com IDs distintos em cada cópia (simula um volume maior)')
+    args = parser.parse_args()
+
+    timeline = load_timeline(SKETCH_COLUMNS)
+    if args.scale > 1:
+        df = timeline.df
+        copies = []
+        for copy in range(args.scale):
+            copies.append(df.assign(**{
+                column: df[column].astype('float64') * args.scale + copy for column in SKETCH_KEYS.values()
+            }))
+        timeline = TimeIndexedData(pd.concat(copies, ignore_index=True))
+    sketches, build_ms = _milliseconds(lambda: DailySketches(timeline), 1)
+    memory = sum(registers.nbytes for registers in sketches._registers.values()) / 2 ** 20
+    print(f"{len(timeline)} linhas; sketches montados em {build_ms:.0f} ms, {memory:.1f} MB")
+
+    first_day, last_day = timeline.df['order_purchase_timestamp'].iloc[[0, -1]]
+    middle = first_day + (last_day - first_day) / 2
+    periods = {
+        'histórico': None,
+        'um ano': [middle - pd.Timedelta(days=182, hours=5), middle + pd.Timedelta(days=182, hours=7)],
+        'um mês': [middle.floor('D') - pd.Timedelta(days=15), middle.floor('D') + pd.Timedelta(days=15)],
+    }
+    for name, date_range in periods.items():
+        exact, exact_ms = _milliseconds(
+            lambda: timeline.filter(date_range)['customer_unique_id'].nunique(), args.repeat
+        )
+        approx, approx_ms = _milliseconds(lambda: sketches.count('customers', date_range), args.repeat)
+        print(f"clientes, {name}: exato {exact_ms:.2f} ms, aproximado {approx_ms:.2f} ms "
+              f"(erro {abs(approx - exact) / exact:.2%})")
+
+        exact, exact_ms = _milliseconds(
+            lambda: timeline.filter(date_range).groupby('customer_state', observed=True)['customer_unique_id'].nunique(),
+            args.repeat
+        )
+        approx, approx_ms = _milliseconds(
+            lambda: sketches.count_by('customers', 'customer_state', date_range), args.repeat
+        )
+        error = ((approx.reindex(exact.index) - exact).abs() / exact).max()
+        print(f"clientes por estado, {name}: exato {exact_ms:.2f} ms, aproximado {approx_ms:.2f} ms "
+              f"(maior erro {error:.2%})")
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from utils.indice_temporal import TimeIndexedData
+from utils.colunas_tempo import time_column
+
+# Colunas necessárias para montar o cubo
+CUBE_COLUMNS = [
+    'order_id', 'customer_unique_id', 'product_id', 'product_category_name',
+    'order_purchase_timestamp', 'order_delivered_customer_date',
+    'price', 'pedido_cancelado', 'review_score'
+]
+
+# Métricas aditivas (somas e contagens) guardadas por dia
+CUBE_METRICS = [
+    'revenue', 'lost_revenue', 'cancelled', 'rows',
+    'review_sum', 'review_count', 'delivery_sum', 'delivery_count'
+]
+
+# Contagens distintas indexadas por dia (nome -> coluna de ID)
+DISTINCT_KEYS = {
+    'orders': 'order_id',
+    'customers': 'customer_unique_id',
+    'products': 'product_id',
+    'categories': 'product_category_name',
+    'cancelled_orders': 'order_id',  # apenas linhas com pedido_cancelado == 1
+}
+
+def _values(column):
+    """Coluna como array float64, com NaN nos valores ausentes."""
+    return column.to_numpy(dtype='float64', na_value=np.nan)
+
+def row_metrics(df):
+    """Contribuição de cada linha para as métricas aditivas do cubo (linhas x CUBE_METRICS)."""
+    cancelled = _values(df['pedido_cancelado'])
+    price = np.nan_to_num(_values(df['price']))
+    review = _values(df['review_score'])
+    delivery_time = _values(time_column(df, 'delivery_time'))
+
+    return np.column_stack([
+        price * (cancelled == 0),
+        price * (cancelled == 1),
+        np.nan_to_num(cancelled),
+        ~np.isnan(cancelled),
+        np.nan_to_num(review),
+        ~np.isnan(review),
+        np.nan_to_num(delivery_time),
+        ~np.isnan(delivery_time),
+    ]).astype('float64')
+
+def _row_codes(values):
+    """Códigos inteiros (>= 0) de uma coluna de IDs; -1 para valores ausentes."""
+    if pd.api.types.is_integer_dtype(values):
+        return values.to_numpy(dtype='int64', na_value=-1)
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Códigos das categorias: os mesmos em qualquer fatia da coluna
+        return values.cat.codes.to_numpy(dtype='int64')
+    # Arquivos antigos (IDs em texto): códigos válidos só para a coluna inteira
+    return pd.factorize(values)[0].astype('int64')
+
+def _sliceable_codes(values):
+    """Se os códigos de uma fatia podem ser calculados só a partir dela (IDs inteiros ou categóricos)."""
+    return pd.api.types.is_integer_dtype(values) or isinstance(values.dtype, pd.CategoricalDtype)
+
+def split_period(days, timeline, date_range):
+    """
+    Divide o período em dias inteiros e linhas dos dias de borda
+
+    Parâmetros:
+    -----------
+    days : np.ndarray
+        Dias (meia-noite) presentes nos dados, em ordem
+    timeline : TimeIndexedData
+        Datas de compra ordenadas, para localizar as linhas de borda
+    date_range : list ou None
+        Período [início, fim]
+
+    Retorno:
+    --------
+    tuple
+        Índices [primeiro, último) dos dias inteiros e lista de faixas de
+        linhas [início, fim) dos dias de borda
+    """
+    if not date_range or len(date_range) != 2:
+        return 0, len(days), []
+
+    start = pd.to_datetime(date_range[0])
+    end = pd.to_datetime(date_range[1])
+
+    first_full_day = start.ceil('D')
+    end_full_days = (end + pd.Timedelta(1, 'ns')).floor('D')
+
+    if first_full_day >= end_full_days:
+        # Período dentro de um único dia (ou entre dois dias vizinhos)
+        return 0, 0, [timeline.positions(start, end)]
+
+    first = int(np.searchsorted(days, np.datetime64(first_full_day), side='left'))
+    last = int(np.searchsorted(days, np.datetime64(end_full_days), side='left'))
+    edges = [
+        timeline.positions(start, first_full_day - pd.Timedelta(1, 'ns')),
+        timeline.positions(end_full_days, end),
+    ]
+    return first, last, edges
+
+class DailyCube:
+    """
+    Agregados diários com somas acumuladas e índice de IDs distintos por dia
+
+    A soma de qualquer métrica em um período de dias inteiros sai de duas
+    consultas ao acumulado (fim - início). Para as contagens distintas, os IDs
+    de cada dia ficam em arrays ordenados e contíguos: a contagem de um período
+    é a união (em um bitmap) de uma única fatia desses arrays. Quando o período
+    começa ou termina no meio de um dia, apenas as linhas desses dias de borda
+    são lidas, direto do DataFrame de origem (o cubo guarda uma referência a
+    ele, sem cópias por linha).
+
+    Parâmetros:
+    -----------
+    data : TimeIndexedData ou pd.DataFrame
+        Histórico com CUBE_COLUMNS; de preferência o já compartilhado pelo
+        dashboard (ver `load_timeline`)
+    """
+
+    def __init__(self, data):
+        timeline = data if isinstance(data, TimeIndexedData) else TimeIndexedData(data)
+        data = timeline.df
+
+        row_days = data['order_purchase_timestamp'].dt.floor('D').to_numpy()
+        daily = pd.DataFrame(row_metrics(data), columns=CUBE_METRICS).groupby(row_days).sum()
+
+        self.days = daily.index.to_numpy()
+        self.cumulative = np.vstack([
+            np.zeros(len(CUBE_METRICS)),
+            daily.to_numpy().cumsum(axis=0)
+        ])
+
+        # Índice de IDs distintos: para cada chave, IDs únicos de cada dia em
+        # ordem (dia, código), com o deslocamento de início de cada dia
+        day_of_row = np.searchsorted(self.days, row_days)
+        cancelled = (data['pedido_cancelado'] == 1).to_numpy()
+        self._text_codes, self._day_codes, self._day_offsets, self._sizes = {}, {}, {}, {}
+        for key, column in DISTINCT_KEYS.items():
+            codes = _row_codes(data[column])
+            if not _sliceable_codes(data[column]) and column not in self._text_codes:
+                # IDs em texto: único caso em que os códigos por linha ficam
+                # guardados (int32), pois não podem ser refeitos para uma fatia
+                self._text_codes[column] = codes.astype('int32')
+            if key == 'cancelled_orders':
+                codes = np.where(cancelled, codes, -1)
+            size = int(codes.max()) + 1 if len(codes) and codes.max() >= 0 else 1
+            valid = codes >= 0
+            pairs = np.unique(day_of_row[valid].astype('int64') * size + codes[valid])
+            self._day_codes[key] = pairs % size
+            self._day_offsets[key] = np.searchsorted(pairs // size, np.arange(len(self.days) + 1))
+            self._sizes[key] = size
+
+        # Linhas dos dias de borda: fatias do próprio histórico ordenado
+        self.timeline = timeline
+
+    def sums(self, date_range=None):
+        """Somas das métricas aditivas no período [início, fim] (ou em todo o histórico)."""
+        first, last, edges = split_period(self.days, self.timeline, date_range)
+        totals = self.cumulative[last] - self.cumulative[first]
+        for row_start, row_end in edges:
+            if row_end > row_start:
+                totals = totals + row_metrics(self.timeline.df.iloc[row_start:row_end]).sum(axis=0)
+        return pd.Series(totals, index=CUBE_METRICS)
+
+    def distinct_counts(self, date_range=None):
+        """Contagens exatas de IDs distintos no período, por chave de DISTINCT_KEYS."""
+        first, last, edges = split_period(self.days, self.timeline, date_range)
+        edges = [(row_start, row_end, self.timeline.df.iloc[row_start:row_end])
+                 for row_start, row_end in edges if row_end > row_start]
+        counts = {}
+        for key in DISTINCT_KEYS:
+            offsets = self._day_offsets[key]
+            seen = np.zeros(self._sizes[key], dtype=bool)
+            seen[self._day_codes[key][offsets[first]:offsets[last]]] = True
+            for row_start, row_end, rows in edges:
+                seen[self._edge_codes(key, rows, row_start, row_end)] = True
+            counts[key] = int(np.count_nonzero(seen))
+        return counts
+
+    def _edge_codes(self, key, rows, row_start, row_end):
+        """Códigos válidos da chave nas linhas [início, fim) de um dia de borda, lidos do histórico."""
+        column = DISTINCT_KEYS[key]
+        if column in self._text_codes:
+            codes = self._text_codes[column][row_start:row_end]
+        else:
+            codes = _row_codes(rows[column])
+        if key == 'cancelled_orders':
+            codes = codes[(rows['pedido_cancelado'] == 1).to_numpy()]
+        return codes[codes >= 0]
+
+    def kpis(self, date_range=None):
+        """KPIs do período a partir do cubo, com as mesmas chaves de calculate_kpis."""
+        sums = self.sums(date_range)
+        distinct = self.distinct_counts(date_range)
+
+        def ratio(numerator, denominator):
+            return sums[numerator] / sums[denominator] if sums[denominator] > 0 else np.nan
+
+        total_orders = distinct['orders']
+        return {
+            "total_revenue": sums['revenue'],
+            "total_orders": total_orders,
+            "total_customers": distinct['customers'],
+            "total_products": distinct['products'],
+            "unique_categories": distinct['categories'],
+            "abandonment_rate": distinct['cancelled_orders'] / total_orders if total_orders > 0 else 0,
+            "lost_revenue": sums['lost_revenue'],
+            "cancellation_rate": ratio('cancelled', 'rows'),
+            "csat": ratio('review_sum', 'review_count'),
+            "avg_delivery_time": ratio('delivery_sum', 'delivery_count'),
+        }
@@ -0,0 +1,15 @@
+def format_value(value, is_integer=False):
+    """Formata um valor numérico com separador de milhares e duas casas decimais."""
+    if is_integer:
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+def format_percentage(value):
+    """Formata um valor como porcentagem com duas casas decimais."""
+    return f"{value*100:.2f}%"
+
+def format_count(kpis, key):
+    """Formata uma contagem distinta; estimativas aproximadas vêm com o erro padrão."""
+    if 'distinct_error' in kpis:
+        return f"≈{int(round(kpis[key])):,} (±{kpis['distinct_error']*100:.1f}%)"
+    return format_value(kpis[key], is_integer=True)
@@ -0,0 +1,225 @@
+import threading
+from collections import OrderedDict
+import streamlit as st
+from utils.KPIs import (
+    load_timeline, load_daily_cube, load_daily_sketches, calculate_kpis,
+    first_purchase_dates, new_customers_by_month, returning_customers_by_month,
+    retention_metrics, acquisition_summary
+)
+from utils.sequencia_compras import purchase_sequence
+from utils.colunas_tempo import by_month
+from utils.previsao import daily_totals, forecast_daily
+
+def _freeze(value):
+    """Entrada em forma hashable (listas viram tuplas), para compor a chave dos nós."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    return value
+
+class KPIGraph:
+    """
+    Grafo de cálculos memorizados (KPIs e DataFrames intermediários)
+
+    Cada nó é uma função dos nós de que depende (argumentos posicionais, na
+    ordem de `depends`) e das entradas que usa diretamente (argumentos
+    nomeados, `inputs`). A chave de um resultado é formada só pelas entradas
+    das quais o nó depende, direta ou indiretamente: mudar o gasto com
+    marketing recalcula apenas os nós que dependem dele, e os demais vêm da
+    memória.
+
+    Os resultados ficam em um LRU com no máximo `max_entries` nós e são
+    compartilhados por todas as sessões: são somente leitura. Duas sessões
+    pedindo o mesmo nó ausente ao mesmo tempo podem calculá-lo duas vezes
+    (o cálculo é feito fora da trava).
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._nodes = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def node(self, name, depends=(), inputs=()):
+        """Decorador: registra a função como o nó `name`."""
+        def register(function):
+            missing = [dependency for dependency in depends if dependency not in self._nodes]
+            if missing:
+                raise ValueError(f"Nó '{name}' depende de nós não registrados: {missing}")
+            keys = set(inputs)
+            for dependency in depends:
+                keys.update(self._nodes[dependency]['keys'])
+            self._nodes[name] = {
+                'function': function,
+                'depends': tuple(depends),
+                'inputs': tuple(inputs),
+                'keys': tuple(sorted(keys)),
+            }
+            return function
+        return register
+
+    def _key(self, name, values):
+        node = self._nodes[name]
+        missing = [key for key in node['keys'] if key not in values]
+        if missing:
+            raise KeyError(f"Entradas ausentes para o nó '{name}': {missing}")
+        return (name,) + tuple(_freeze(values[key]) for key in node['keys'])
+
+    def get(self, name, values):
+        """
+        Resultado do nó para as entradas `values`
+
+        Parâmetros:
+        -----------
+        name : str
+            Nó registrado
+        values : dict
+            Entradas (período, gasto com marketing, categorias, ...); cada nó
+            usa só as suas
+
+        Retorno:
+        --------
+        object
+            Resultado memorizado ou recém-calculado (somente leitura)
+        """
+        key = self._key(name, values)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+
+        node = self._nodes[name]
+        result = node['function'](
+            *(self.get(dependency, values) for dependency in node['depends']),
+            **{input_name: values[input_name] for input_name in node['inputs']}
+        )
+
+        with self._lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+    def dependents(self, name):
+        """O nó e todos os que dependem dele, direta ou indiretamente."""
+        affected = {name}
+        for other, node in self._nodes.items():  # ordem de registro: dependências antes
+            if affected.intersection(node['depends']):
+                affected.add(other)
+        return affected
+
+    def invalidate(self, name=None):
+        """Descarta os resultados do nó `name` e dos que dependem dele (sem `name`, todos)."""
+        with self._lock:
+            if name is None:
+                self._cache.clear()
+                return
+            affected = self.dependents(name)
+            for key in [key for key in self._cache if key[0] in affected]:
+                del self._cache[key]
+
+def build_dashboard_graph(timeline, cube, max_entries=128, sketches=load_daily_sketches):
+    """
+    Nós de KPIs usados pelas páginas do dashboard
+
+    Entradas: date_range, approximate (contagens por HyperLogLog),
+    marketing_spend e categories (None = todas).
+
+    Parâmetros:
+    -----------
+    timeline : TimeIndexedData
+        Histórico completo (ver `load_timeline`)
+    cube : DailyCube
+        Cubo diário do histórico (ver `load_daily_cube`)
+    max_entries : int
+        Número máximo de resultados memorizados
+    sketches : callable
+        Carrega os sketches HyperLogLog (ver `load_daily_sketches`), só no
+        primeiro pedido de KPIs aproximados
+
+    Retorno:
+    --------
+    KPIGraph
+    """
+    graph = KPIGraph(max_entries)
+
+    @graph.node('period', inputs=('date_range',))
+    def period(date_range):
+        return timeline.filter(date_range)
+
+    @graph.node('kpis', inputs=('date_range', 'approximate'))
+    def kpis(date_range, approximate):
+        return calculate_kpis(timeline, date_range=date_range, cube=cube,
+                              sketches=sketches() if approximate else None)
+
+    @graph.node('monthly_revenue', depends=('period',))
+    def monthly_revenue(df):
+        return by_month(df.groupby('order_month')['price'].sum())
+
+    # Previsão de receita: o ajuste do modelo é refeito só quando o período muda
+    @graph.node('daily_revenue', depends=('period',))
+    def daily_revenue(df):
+        return daily_totals(df, 'price')
+
+    @graph.node('revenue_forecast', depends=('daily_revenue',))
+    def revenue_forecast(totals):
+        # Período sem vendas: sem previsão (None)
+        return forecast_daily(totals, horizon=30) if len(totals) else None
+
+    # Aquisição e retenção: só acquisition_kpis depende do gasto com marketing
+    @graph.node('sequence', depends=('period',))
+    def sequence(df):
+        return purchase_sequence(df)
+
+    @graph.node('first_purchases', depends=('sequence',))
+    def first_purchases(sequence):
+        return first_purchase_dates(sequence)
+
+    @graph.node('new_customers', depends=('first_purchases',))
+    def new_customers(first_purchases):
+        return new_customers_by_month(first_purchases)
+
+    @graph.node('total_new_customers', depends=('first_purchases',))
+    def total_new_customers(first_purchases):
+        return first_purchases['customer_unique_id'].nunique()
+
+    @graph.node('returning_customers', depends=('period',))
+    def returning_customers(df):
+        return returning_customers_by_month(df)
+
+    @graph.node('retention', depends=('period', 'sequence'))
+    def retention(df, sequence):
+        return retention_metrics(df, sequence)
+
+    @graph.node('acquisition_kpis', depends=('new_customers', 'returning_customers', 'total_new_customers', 'retention'),
+                inputs=('marketing_spend',))
+    def acquisition_kpis(new_customers, returning_customers, total_new_customers, retention, marketing_spend):
+        return acquisition_summary(new_customers, returning_customers, total_new_customers, retention, marketing_spend)
+
+    # Categorias selecionadas na página de produtos
+    @graph.node('category_period', depends=('period',), inputs=('categories',))
+    def category_period(df, categories):
+        if not categories:
+            return df
+        return df[df['product_category_name'].isin(list(categories))]
+
+    @graph.node('category_metrics', depends=('category_period',))
+    def category_metrics(df):
+        return df.groupby('product_category_name', observed=True).agg({
+            'price': ['sum', 'mean', 'std'],
+            'order_id': 'count',
+            'pedido_cancelado': 'mean',
+            'review_score': 'mean'
+        }).round(2)
+
+    return graph
+
+@st.cache_resource
+def load_kpi_graph(columns=None):
+    """Grafo de KPIs do dashboard (um por processo, compartilhado pelas sessões)."""
+    return build_dashboard_graph(load_timeline(columns), load_daily_cube(columns),
+                                 sketches=lambda: load_daily_sketches(columns))
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+class TimeIndexedData:
+    """
+    Dados ordenados pela data de compra, com fatiamento por período em O(log n)
+
+    A ordenação (e a conversão para datetime, se necessária) é feita uma única
+    vez na criação. Cada consulta [início, fim] localiza as bordas com
+    `searchsorted` e devolve uma fatia contígua (`iloc`), sem montar máscaras
+    booleanas do tamanho da tabela.
+    """
+
+    def __init__(self, df, column='order_purchase_timestamp'):
+        if not pd.api.types.is_datetime64_any_dtype(df[column]):
+            df = df.assign(**{column: pd.to_datetime(df[column])})
+        if not df[column].is_monotonic_increasing:
+            df = df.sort_values(column, kind='stable')
+
+        self.df = df
+        self.column = column
+        self._timestamps = df[column].to_numpy()
+
+    def __len__(self):
+        return len(self.df)
+
+    def _position(self, value, side):
+        return int(np.searchsorted(self._timestamps, np.datetime64(pd.to_datetime(value)), side=side))
+
+    def positions(self, start=None, end=None):
+        """Posições [primeira, última) das linhas com início <= data de compra <= fim."""
+        first = 0 if start is None else self._position(start, 'left')
+        last = len(self.df) if end is None else self._position(end, 'right')
+        return first, max(first, last)
+
+    def slice(self, start=None, end=None):
+        """Linhas com início <= data de compra <= fim (limites opcionais)."""
+        first, last = self.positions(start, end)
+        return self.df.iloc[first:last]
+
+    def filter(self, date_range):
+        """Mesma interface de `filter_by_date_range`: sem período válido, devolve tudo."""
+        if not date_range or len(date_range) != 2:
+            return self.df
+        return self.slice(date_range[0], date_range[1])
@@ -0,0 +1,186 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+# Tipos reutilizados nos esquemas
+STRING = pa.string()
+INT = pa.int64()
+FLOAT = pa.float64()
+TIMESTAMP = pa.timestamp('ns')
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+# Esquema declarado de cada tabela de origem do Olist: arquivo e tipo de cada coluna
+# (e `newlines_in_values` se algum valor entre aspas pode ter quebras de linha).
+# Colunas CATEGORY viram `category` no pandas; colunas TIMESTAMP já chegam como datetime.
+SOURCE_SCHEMAS = {
+    "orders": {
+        "file": "olist_orders_dataset.csv",
+        "columns": {
+            "order_id": STRING,
+            "customer_id": STRING,
+            "order_status": CATEGORY,
+            "order_purchase_timestamp": TIMESTAMP,
+            "order_approved_at": TIMESTAMP,
+            "order_delivered_carrier_date": TIMESTAMP,
+            "order_delivered_customer_date": TIMESTAMP,
+            "order_estimated_delivery_date": TIMESTAMP,
+        },
+    },
+    "customers": {
+        "file": "olist_customers_dataset.csv",
+        "columns": {
+            "customer_id": STRING,
+            "customer_unique_id": STRING,
+            "customer_zip_code_prefix": INT,
+            "customer_city": STRING,
+            "customer_state": CATEGORY,
+        },
+    },
+    "order_items": {
+        "file": "olist_order_items_dataset.csv",
+        "columns": {
+            "order_id": STRING,
+            "order_item_id": INT,
+            "product_id": STRING,
+            "seller_id": STRING,
+            "shipping_limit_date": TIMESTAMP,
+            "price": FLOAT,
+            "freight_value": FLOAT,
+        },
+    },
+    "payments": {
+        "file": "olist_order_payments_dataset.csv",
+        "columns": {
+            "order_id": STRING,
+            "payment_sequential": INT,
+            "payment_type": CATEGORY,
+            "payment_installments": INT,
+            "payment_value": FLOAT,
+        },
+    },
+    "reviews": {
+        "file": "olist_order_reviews_dataset.csv",
+        # Comentários com quebra de linha entre aspas: o leitor precisa saber que uma
+        # linha pode continuar no valor (desliga a divisão do arquivo em blocos paralelos)
+        "newlines_in_values": True,
+        "columns": {
+            "review_id": STRING,
+            "order_id": STRING,
+            "review_score": INT,
+            "review_comment_title": STRING,
+            "review_comment_message": STRING,
+            "review_creation_date": TIMESTAMP,
+            "review_answer_timestamp": TIMESTAMP,
+        },
+    },
+    "products": {
+        "file": "olist_products_dataset.csv",
+        "columns": {
+            "product_id": STRING,
+            "product_category_name": STRING,
+            "product_name_lenght": FLOAT,
+            "product_description_lenght": FLOAT,
+            "product_photos_qty": FLOAT,
+            "product_weight_g": FLOAT,
+            "product_length_cm": FLOAT,
+            "product_height_cm": FLOAT,
+            "product_width_cm": FLOAT,
+        },
+    },
+    "sellers": {
+        "file": "olist_sellers_dataset.csv",
+        "columns": {
+            "seller_id": STRING,
+            "seller_zip_code_prefix": INT,
+            "seller_city": STRING,
+            "seller_state": CATEGORY,
+        },
+    },
+    "geolocation": {
+        "file": "olist_geolocation_dataset.csv",
+        "columns": {
+            "geolocation_zip_code_prefix": INT,
+            "geolocation_lat": FLOAT,
+            "geolocation_lng": FLOAT,
+            "geolocation_city": STRING,
+            "geolocation_state": CATEGORY,
+        },
+    },
+    "category_translation": {
+        "file": "product_category_name_translation.csv",
+        "columns": {
+            "product_category_name": STRING,
+            "product_category_name_english": STRING,
+        },
+    },
+}
+
+def read_source_table(name, data_dir="."):
+    """
+    Lê uma tabela de origem com o esquema declarado em SOURCE_SCHEMAS
+
+    Retorno:
+    --------
+    tuple
+        DataFrame e dicionário com estatísticas da leitura (tabela, arquivo, bytes, segundos, linhas)
+    """
+    schema = SOURCE_SCHEMAS[name]
+    path = os.path.join(data_dir, schema["file"])
+
+    start = time.perf_counter()
+    table = pacsv.read_csv(
+        path,
+        parse_options=pacsv.ParseOptions(newlines_in_values=schema.get("newlines_in_values", False)),
+        convert_options=pacsv.ConvertOptions(
+            column_types=schema["columns"],
+            strings_can_be_null=True
+        )
+    )
+    df = table.to_pandas()
+    elapsed = time.perf_counter() - start
+
+    stats = {
+        "table": name,
+        "file": schema["file"],
+        "bytes": os.path.getsize(path),
+        "seconds": elapsed,
+        "rows": len(df),
+    }
+    return df, stats
+
+def read_source_tables(names=None, data_dir=".", max_workers=None):
+    """
+    Lê as tabelas de origem em paralelo (uma thread por arquivo)
+
+    Parâmetros:
+    -----------
+    names : list ou None
+        Tabelas a ler (padrão: todas as de SOURCE_SCHEMAS)
+    data_dir : str
+        Diretório dos CSVs
+    max_workers : int ou None
+        Número máximo de threads (padrão: uma por tabela)
+
+    Retorno:
+    --------
+    tuple
+        Dicionário {nome: DataFrame} e DataFrame com as estatísticas por arquivo
+    """
+    names = list(names or SOURCE_SCHEMAS)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(names)) as executor:
+        results = list(executor.map(lambda name: read_source_table(name, data_dir), names))
+
+    tables = {name: df for name, (df, _) in zip(names, results)}
+    stats = pd.DataFrame([stats for _, stats in results])
+    return tables, stats
+
+def print_read_report(stats):
+    """Exibe o tempo e o volume lido por arquivo."""
+    print("Leitura dos arquivos de origem:")
+    for _, row in stats.iterrows():
+        print(f" - {row['file']}: {row['bytes'] / 1e6:.1f} MB, {row['rows']} linhas em {row['seconds']:.2f}s")
+    print(f"Total: {stats['bytes'].sum() / 1e6:.1f} MB")
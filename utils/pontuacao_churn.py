@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from utils.KPIs import purchase_date_bounds
+from utils.repositorio_features import snapshot_features_path, fill_missing_features
+from utils.artefatos_modelo import load_model_artifacts, MODEL_FILE
+
+# Probabilidades de churn de todos os clientes (uma linha por cliente)
+SCORES_FILE = "churn_scores.parquet"
+SCORES_METADATA_KEY = b"churn_scores"
+
+# Faixas de risco (mesmos limites da aba de previsão)
+RISK_BINS = [0.0, 0.3, 0.7, 1.0]
+RISK_TIERS = ['Baixo', 'Moderado', 'Alto']
+
+def risk_tier(probabilities):
+    """Faixa de risco de cada probabilidade de churn."""
+    return pd.cut(probabilities, bins=RISK_BINS, labels=RISK_TIERS, include_lowest=True)
+
+def latest_cutoff():
+    """Data de corte que inclui todas as compras do dataset (dia seguinte à última)."""
+    _, max_date = purchase_date_bounds()
+    return (pd.Timestamp(max_date) + pd.Timedelta(days=1)).normalize()
+
+def score_customers(cutoff_date=None, chunk_size=50_000, output=SCORES_FILE, model_dir=".", progress=None):
+    """
+    Pontua todos os clientes com o modelo salvo e grava as probabilidades em Parquet
+
+    As features vêm do snapshot da data de corte no repositório de features e
+    são lidas, normalizadas e pontuadas em partes de `chunk_size` clientes;
+    cada parte é gravada assim que pontuada. O arquivo é escrito ao lado e
+    depois trocado, então o dashboard nunca lê uma pontuação pela metade.
+
+    Só a pontuação é feita em partes: se o snapshot da data de corte ainda
+    não existe (ou está desatualizado), ele é calculado antes por
+    `materialize_snapshot`, que carrega o histórico inteiro em memória. No
+    dashboard, a pontuação roda como tarefa em outro processo
+    (`utils.tarefas_treino.submit_job(..., kind=SCORE)`).
+
+    Parâmetros:
+    -----------
+    cutoff_date : str, datetime ou None
+        Data de corte das features (padrão: dia seguinte à última compra)
+    chunk_size : int
+        Clientes por parte
+    output : str
+        Arquivo de saída
+    model_dir : str
+        Diretório dos artefatos gravados por churn_analysis.py
+    progress : callable ou None
+        Chamada como progress(etapa, total, descrição) a cada parte
+
+    Retorno:
+    --------
+    dict
+        Resumo da pontuação (clientes, clientes por faixa, tempo em segundos)
+    """
+    start = time.perf_counter()
+    cutoff_date = latest_cutoff() if cutoff_date is None else pd.to_datetime(cutoff_date)
+
+    model, scaler, feature_columns = load_model_artifacts(model_dir)
+
+    if progress:
+        progress(0, 1, "Features do snapshot")
+    features_path = snapshot_features_path(cutoff_date)
+    features_file = pq.ParquetFile(features_path)
+    n_chunks = max(1, -(-features_file.metadata.num_rows // chunk_size))
+    # Média de todo o snapshot para preencher avaliações ausentes em todas as partes
+    avg_review = pq.read_table(features_path, columns=['avg_review']).column('avg_review').to_pandas().mean()
+
+    metadata = {
+        'cutoff_date': str(cutoff_date),
+        'model_mtime': os.path.getmtime(os.path.join(model_dir, MODEL_FILE)),
+        'scored_at': pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+    staging = f"{output}.tmp"
+    writer = None
+    tier_counts = pd.Series(0, index=RISK_TIERS)
+    try:
+        batches = features_file.iter_batches(batch_size=chunk_size, columns=['customer_unique_id'] + feature_columns)
+        for number, batch in enumerate(batches, start=1):
+            chunk = fill_missing_features(batch.to_pandas(), avg_review=avg_review)
+            probabilities = model.predict_proba(scaler.transform(chunk[feature_columns]))[:, 1]
+
+            scores = chunk[['customer_unique_id'] + feature_columns].assign(
+                churn_probability=probabilities.astype('float32'),
+                risk_tier=risk_tier(probabilities).astype(str)
+            )
+            tier_counts = tier_counts.add(scores['risk_tier'].value_counts(), fill_value=0)
+
+            table = pa.Table.from_pandas(scores, preserve_index=False)
+            if writer is None:
+                schema = table.schema.with_metadata({SCORES_METADATA_KEY: json.dumps(metadata).encode()})
+                writer = pq.ParquetWriter(staging, schema)
+            writer.write_table(table.cast(writer.schema))
+            if progress:
+                progress(number, n_chunks, f"Parte {number} de {n_chunks} pontuada")
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError(f"Snapshot de features vazio para a data de corte {cutoff_date}")
+    os.replace(staging, output)
+
+    return {
+        **metadata,
+        'customers': int(tier_counts.sum()),
+        'tiers': {tier: int(count) for tier, count in tier_counts.items()},
+        'seconds': time.perf_counter() - start,
+    }
+
+def load_scores(path=SCORES_FILE):
+    """
+    Pontuações gravadas e seus metadados (data de corte, data da pontuação)
+
+    Retorno:
+    --------
+    tuple
+        DataFrame das pontuações (risk_tier como categoria ordenada) e dict de metadados
+    """
+    table = pq.read_table(path)
+    metadata = json.loads(table.schema.metadata.get(SCORES_METADATA_KEY, b"{}"))
+    scores = table.to_pandas()
+    scores['risk_tier'] = pd.Categorical(scores['risk_tier'], categories=RISK_TIERS, ordered=True)
+    return scores, metadata
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pontuação de churn de todos os clientes')
+    parser.add_argument('--cutoff_date', type=str, default=None,
+                        help='Data de corte das features (padrão: dia seguinte à última compra)')
+    parser.add_argument('--chunk_size', type=int, default=50_000,
+                        help='Clientes pontuados por parte')
+    parser.add_argument('--output', type=str, default=SCORES_FILE,
+                        help='Arquivo Parquet de saída')
+    args = parser.parse_args()
+
+    summary = score_customers(args.cutoff_date, chunk_size=args.chunk_size, output=args.output)
+    print(f"{summary['customers']} clientes pontuados em {summary['seconds']:.2f}s: {summary['tiers']}")
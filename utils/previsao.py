@@ -0,0 +1,181 @@
+import argparse
+from itertools import product
+from statistics import NormalDist
+import numpy as np
+import pandas as pd
+
+# Grade de parâmetros avaliada no ajuste (forma de correção de erros):
+# beta = alpha * fração e gamma = (1 - alpha) * fração mantêm o modelo estável
+ALPHA_GRID = [0.05, 0.1, 0.2, 0.3, 0.5, 0.7]
+BETA_FRACTIONS = [0.0, 0.05, 0.1, 0.2]
+GAMMA_FRACTIONS = [0.0, 0.1, 0.3, 0.5]
+
+def _parameter_grid():
+    alpha, beta_fraction, gamma_fraction = (
+        np.array(values, dtype='float64')
+        for values in zip(*product(ALPHA_GRID, BETA_FRACTIONS, GAMMA_FRACTIONS))
+    )
+    return alpha, alpha * beta_fraction, (1 - alpha) * gamma_fraction
+
+def _initial_states(values, season_length):
+    """Nível, tendência e sazonalidade iniciais a partir das duas primeiras estações."""
+    m = season_length
+    if values.shape[1] >= 2 * m:
+        first, second = values[:, :m].mean(axis=1), values[:, m:2 * m].mean(axis=1)
+        return first, (second - first) / m, values[:, :m] - first[:, None]
+    # Histórico curto: sem tendência nem sazonalidade iniciais
+    return values[:, 0].copy(), np.zeros(len(values)), np.zeros((len(values), m))
+
+class HoltWinters:
+    """
+    Holt-Winters aditivo (nível, tendência e sazonalidade) para várias séries
+
+    As séries são linhas de uma matriz séries x tempo. O ajuste avalia todas
+    as combinações da grade de parâmetros para todas as séries de uma vez: o
+    único laço é sobre o tempo, e cada passo atualiza os estados de todas as
+    combinações com operações de array. Cada série fica com a combinação de
+    menor erro quadrático um passo à frente.
+
+    A previsão de h passos e seu intervalo saem em forma fechada (modelo
+    ETS(A,A,A)), para todos os horizontes e séries de uma vez.
+
+    Parâmetros:
+    -----------
+    season_length : int
+        Períodos por estação (7 para sazonalidade semanal em dados diários)
+    """
+
+    def __init__(self, season_length=7):
+        self.season_length = season_length
+
+    def fit(self, values):
+        """
+        Ajusta o modelo a uma série (1D) ou a várias (2D, uma por linha)
+
+        As séries devem ter o mesmo comprimento, sem valores ausentes (dias
+        sem vendas entram como zero). Devolve o próprio objeto.
+        """
+        values = np.atleast_2d(np.asarray(values, dtype='float64'))
+        n_series, n_periods = values.shape
+        m = self.season_length
+        alpha, beta, gamma = _parameter_grid()
+        n_candidates = len(alpha)
+
+        # Uma linha por (série, combinação de parâmetros)
+        batch = np.repeat(values, n_candidates, axis=0)
+        alpha, beta, gamma = (np.tile(param, n_series) for param in (alpha, beta, gamma))
+        level, trend, season = _initial_states(batch, m)
+
+        # A primeira estação serve à inicialização e fica fora do erro, se houver dados
+        burn_in = m if n_periods > 2 * m else 0
+        sse = np.zeros(len(batch))
+        for t in range(n_periods):
+            position = t % m
+            error = batch[:, t] - (level + trend + season[:, position])
+            level = level + trend + alpha * error
+            trend = trend + beta * error
+            season[:, position] += gamma * error
+            if t >= burn_in:
+                sse += error ** 2
+
+        best = np.arange(n_series) * n_candidates + (sse.reshape(n_series, n_candidates).argmin(axis=1))
+        self.alpha, self.beta, self.gamma = alpha[best], beta[best], gamma[best]
+        self.level, self.trend, self.season = level[best], trend[best], season[best]
+        self.sigma = np.sqrt(sse[best] / max(n_periods - burn_in, 1))
+        self.n_periods = n_periods
+        return self
+
+    def forecast(self, horizon, level=0.95):
+        """
+        Previsão dos próximos `horizon` períodos com intervalo de previsão
+
+        Retorno:
+        --------
+        tuple
+            Previsão, limite inferior e limite superior (arrays séries x horizonte)
+        """
+        m = self.season_length
+        steps = np.arange(1, horizon + 1)
+        positions = (self.n_periods + steps - 1) % m
+        mean = self.level[:, None] + steps * self.trend[:, None] + self.season[:, positions]
+
+        # Variância do erro de h passos: sigma² (1 + soma de c_j² para j < h)
+        j = steps[:-1]
+        c = self.alpha[:, None] + self.beta[:, None] * j + self.gamma[:, None] * (j % m == 0)
+        variance = self.sigma[:, None] ** 2 * (1 + np.concatenate(
+            [np.zeros((len(c), 1)), np.cumsum(c ** 2, axis=1)], axis=1
+        ))
+        margin = NormalDist().inv_cdf((1 + level) / 2) * np.sqrt(variance)
+        return mean, mean - margin, mean + margin
+
+def daily_totals(df, value_column, date_column='order_day', by=None):
+    """
+    Soma diária de `value_column`, com os dias sem vendas preenchidos com zero
+
+    Com `by`, uma coluna por valor de `by` (várias séries alinhadas no mesmo
+    calendário).
+    """
+    if by is None:
+        totals = df.groupby(date_column)[value_column].sum()
+    else:
+        totals = df.groupby([date_column, by], observed=True)[value_column].sum().unstack(fill_value=0)
+    if totals.empty:
+        return totals.rename_axis('date')
+    days = pd.date_range(totals.index.min(), totals.index.max(), freq='D')
+    return totals.reindex(days, fill_value=0).rename_axis('date')
+
+def forecast_daily(totals, horizon=30, level=0.95, season_length=7):
+    """
+    Ajusta e prevê séries diárias com sazonalidade semanal
+
+    Parâmetros:
+    -----------
+    totals : pd.Series ou pd.DataFrame
+        Série diária (ver `daily_totals`) ou uma coluna por série
+    horizon : int
+        Dias previstos
+    level : float
+        Nível do intervalo de previsão
+
+    Retorno:
+    --------
+    pd.DataFrame
+        date, forecast, lower_bound e upper_bound (mais a coluna `series`
+        quando `totals` é um DataFrame)
+
+    Levanta ValueError se não houver nenhum dia (ou nenhuma série) para ajustar.
+    """
+    frame = totals.to_frame() if isinstance(totals, pd.Series) else totals
+    if frame.empty:
+        raise ValueError("Sem totais diários para ajustar a previsão (período sem vendas)")
+    model = HoltWinters(season_length).fit(frame.to_numpy().T)
+    mean, lower, upper = model.forecast(horizon, level)
+
+    dates = pd.date_range(frame.index[-1] + pd.Timedelta(days=1), periods=horizon, freq='D')
+    result = pd.DataFrame({
+        'series': np.repeat(frame.columns.to_numpy(), horizon),
+        'date': np.tile(dates, len(frame.columns)),
+        'forecast': mean.ravel(),
+        'lower_bound': lower.ravel(),
+        'upper_bound': upper.ravel(),
+    })
+    return result.drop(columns='series') if isinstance(totals, pd.Series) else result
+
+if __name__ == "__main__":
+    from utils.KPIs import load_data
+    from utils.colunas_tempo import TIME_COLUMNS
+
+    parser = argparse.ArgumentParser(description='Previsão de receita diária (Holt-Winters com sazonalidade semanal)')
+    parser.add_argument('--horizon', type=int, default=30, help='Dias previstos')
+    parser.add_argument('--level', type=float, default=0.95, help='Nível do intervalo de previsão')
+    parser.add_argument('--by_category', action='store_true', help='Uma previsão por categoria de produto')
+    args = parser.parse_args()
+
+    df = load_data(columns=['order_purchase_timestamp', 'price', 'product_category_name'])
+    df = df.assign(order_day=TIME_COLUMNS['order_day'](df))
+    totals = daily_totals(df, 'price', by='product_category_name' if args.by_category else None)
+    forecast = forecast_daily(totals, horizon=args.horizon, level=args.level)
+    if args.by_category:
+        print(forecast.groupby('series', observed=True)['forecast'].sum().sort_values(ascending=False).to_string())
+    else:
+        print(forecast.to_string(index=False))
@@ -0,0 +1,147 @@
+import os
+import json
+import uuid
+import shutil
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Execuções de treino do modelo de churn (um subdiretório por execução)
+RUNS_DIR = "churn_runs"
+INDEX_FILE = "index.jsonl"
+METADATA_FILE = "metadata.json"
+METRICS_FILE = "metrics.json"
+CONFUSION_MATRIX_FILE = "confusion_matrix.json"
+FEATURE_IMPORTANCE_FILE = "feature_importance.json"
+
+# Métricas de avaliação resumidas no índice (comparação entre execuções)
+SUMMARY_METRICS = [
+    'accuracy', 'precision_weighted', 'recall_weighted',
+    'f1_macro', 'f1_weighted', 'auc_roc', 'avg_precision'
+]
+
+def _write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def _read_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def run_dir(run_id, runs_dir=RUNS_DIR):
+    return os.path.join(runs_dir, run_id)
+
+def register_run(params, metrics, feature_columns, artifacts=(), runs_dir=RUNS_DIR):
+    """
+    Registra uma execução de treino
+
+    Grava no diretório da execução os parâmetros, as métricas, a matriz de
+    confusão, a importância das features e uma cópia dos artefatos, e
+    acrescenta o resumo da execução ao índice. O diretório é montado ao lado e
+    renomeado, e a linha do índice é gravada por último: uma execução listada
+    está sempre completa.
+
+    Parâmetros:
+    -----------
+    params : dict
+        Parâmetros do treino (data de corte, modelo, rebalanceamento, ...)
+    metrics : dict
+        Métricas de analyze_data_distribution e evaluate_model
+    feature_columns : list
+        Features do modelo, na ordem usada no treino
+    artifacts : iterable
+        Arquivos copiados para a execução (modelo, scaler, gráficos, ...)
+    runs_dir : str
+        Diretório do registro
+
+    Retorno:
+    --------
+    str
+        Identificador da execução
+    """
+    created_at = datetime.now()
+    run_id = f"{created_at.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    feature_columns = list(feature_columns)
+
+    churn_count = metrics.get('churn_count')
+    metadata = {
+        'run_id': run_id,
+        'created_at': created_at.isoformat(timespec='seconds'),
+        'params': params,
+        'feature_columns': feature_columns,
+        'distribution': None if churn_count is None else {
+            'non_churn': int(churn_count.get(0, 0)),
+            'churn': int(churn_count.get(1, 0)),
+            'churn_rate': float(metrics['churn_rate']),
+        },
+        'correlations': {
+            feature: float(value) for feature, value in metrics.get('correlations', pd.Series(dtype=float)).items()
+        },
+    }
+    evaluation = {
+        **{name: float(metrics[name]) for name in SUMMARY_METRICS if name in metrics},
+        'classification_report': metrics.get('classification_report'),
+    }
+
+    staging = run_dir(run_id, runs_dir) + ".tmp"
+    os.makedirs(staging)
+    _write_json(os.path.join(staging, METADATA_FILE), metadata)
+    _write_json(os.path.join(staging, METRICS_FILE), evaluation)
+    _write_json(os.path.join(staging, CONFUSION_MATRIX_FILE), np.asarray(metrics['confusion_matrix']).tolist())
+
+    feature_importance = metrics.get('feature_importance')
+    if feature_importance is not None:
+        # O índice da tabela é a posição da feature no treino (os nomes podem ser genéricos)
+        _write_json(os.path.join(staging, FEATURE_IMPORTANCE_FILE), {
+            feature_columns[position]: float(importance)
+            for position, importance in feature_importance['Importance'].items()
+        })
+
+    for path in artifacts:
+        if os.path.exists(path):
+            shutil.copy2(path, os.path.join(staging, os.path.basename(path)))
+    os.replace(staging, run_dir(run_id, runs_dir))
+
+    summary = {
+        'run_id': run_id,
+        'created_at': metadata['created_at'],
+        **params,
+        'churn_rate': None if metadata['distribution'] is None else metadata['distribution']['churn_rate'],
+        **{name: evaluation[name] for name in SUMMARY_METRICS if name in evaluation},
+    }
+    # Uma linha por execução, acrescentada de uma vez (sem reescrever o índice)
+    with open(os.path.join(runs_dir, INDEX_FILE), 'a', encoding='utf-8') as f:
+        f.write(json.dumps(summary, ensure_ascii=False) + "\n")
+
+    return run_id
+
+def list_runs(runs_dir=RUNS_DIR):
+    """Resumo das execuções do índice, da mais recente para a mais antiga."""
+    path = os.path.join(runs_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['run_id', 'created_at'] + SUMMARY_METRICS)
+    runs = pd.read_json(path, lines=True, dtype={'run_id': str}, convert_dates=False)
+    return runs.iloc[::-1].reset_index(drop=True)
+
+def load_run(run_id, runs_dir=RUNS_DIR):
+    """
+    Detalhes de uma execução
+
+    Retorno:
+    --------
+    dict
+        metadata, metrics, confusion_matrix (np.ndarray), feature_importance
+        (pd.Series ou None) e path (diretório com os artefatos)
+    """
+    path = run_dir(run_id, runs_dir)
+    importance_path = os.path.join(path, FEATURE_IMPORTANCE_FILE)
+    return {
+        'metadata': _read_json(os.path.join(path, METADATA_FILE)),
+        'metrics': _read_json(os.path.join(path, METRICS_FILE)),
+        'confusion_matrix': np.array(_read_json(os.path.join(path, CONFUSION_MATRIX_FILE))),
+        'feature_importance': (
+            pd.Series(_read_json(importance_path)).sort_values(ascending=False)
+            if os.path.exists(importance_path) else None
+        ),
+        'path': path,
+    }
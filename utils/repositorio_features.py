@@ -0,0 +1,150 @@
+import os
+import json
+import shutil
+from datetime import datetime
+import pandas as pd
+from utils.KPIs import (
+    load_data, calculate_churn_features, define_churn, dataset_version,
+    CHURN_COLUMNS, CHURN_FEATURES
+)
+
+# Snapshots de features por data de corte (um diretório por data)
+FEATURE_STORE_DIR = "olist_feature_store"
+METADATA_FILE = "_metadata.json"
+
+def snapshot_key(cutoff_date):
+    """Nome do snapshot de uma data de corte (AAAA-MM-DD, com hora se houver)."""
+    cutoff_date = pd.to_datetime(cutoff_date)
+    if cutoff_date == cutoff_date.normalize():
+        return cutoff_date.strftime('%Y-%m-%d')
+    return cutoff_date.strftime('%Y-%m-%dT%H-%M-%S')
+
+def snapshot_dir(cutoff_date, store_dir=FEATURE_STORE_DIR):
+    return os.path.join(store_dir, f"cutoff={snapshot_key(cutoff_date)}")
+
+def _read_metadata(path):
+    metadata_path = os.path.join(path, METADATA_FILE)
+    if not os.path.exists(metadata_path):
+        return None
+    with open(metadata_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def list_snapshots(store_dir=FEATURE_STORE_DIR):
+    """Metadados dos snapshots gravados, do mais antigo para o mais recente."""
+    if not os.path.isdir(store_dir):
+        return []
+    snapshots = [_read_metadata(os.path.join(store_dir, name)) for name in sorted(os.listdir(store_dir))]
+    return [metadata for metadata in snapshots if metadata is not None]
+
+def _is_current(metadata):
+    """Snapshot gravado a partir do dataset atual e com a lista de features atual."""
+    return (
+        metadata is not None
+        and metadata['dataset_version'] == dataset_version()
+        and metadata['features'] == CHURN_FEATURES
+    )
+
+def load_snapshot(cutoff_date, store_dir=FEATURE_STORE_DIR):
+    """
+    Lê o snapshot de uma data de corte, se existir e estiver atualizado
+
+    Um snapshot fica desatualizado quando o dataset consolidado é regravado ou
+    quando a lista de features muda.
+
+    Retorno:
+    --------
+    tuple ou None
+        DataFrames de features e de rótulos de churn
+    """
+    path = snapshot_dir(cutoff_date, store_dir)
+    if not _is_current(_read_metadata(path)):
+        return None
+    return (
+        pd.read_parquet(os.path.join(path, "features.parquet")),
+        pd.read_parquet(os.path.join(path, "labels.parquet"))
+    )
+
+def materialize_snapshot(cutoff_date, df=None, store_dir=FEATURE_STORE_DIR):
+    """
+    Calcula e grava as features e os rótulos de churn de uma data de corte
+
+    As features usam apenas compras até a data de corte (ponto no tempo); os
+    rótulos indicam se o cliente voltou a comprar depois dela. O snapshot é
+    gravado ao lado e depois trocado, para nunca ser lido pela metade.
+
+    O cálculo não é feito em partes: as CHURN_COLUMNS de todo o histórico são
+    carregadas e todas as features ficam em memória até a gravação.
+
+    Parâmetros:
+    -----------
+    cutoff_date : str ou datetime
+        Data de corte
+    df : pd.DataFrame ou None
+        Dados consolidados (padrão: load_data com CHURN_COLUMNS)
+    store_dir : str
+        Diretório do repositório de features
+
+    Retorno:
+    --------
+    tuple
+        DataFrames de features e de rótulos de churn
+    """
+    cutoff_date = pd.to_datetime(cutoff_date)
+    version = dataset_version()
+    if df is None:
+        df = load_data(columns=CHURN_COLUMNS)
+
+    features_df = calculate_churn_features(df, cutoff_date)
+    labels_df = define_churn(df, cutoff_date)
+
+    target = snapshot_dir(cutoff_date, store_dir)
+    staging = target + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    features_df.to_parquet(os.path.join(staging, "features.parquet"), index=False)
+    labels_df.to_parquet(os.path.join(staging, "labels.parquet"), index=False)
+    with open(os.path.join(staging, METADATA_FILE), 'w', encoding='utf-8') as f:
+        json.dump({
+            'cutoff_date': str(cutoff_date),
+            'dataset_version': version,
+            'features': CHURN_FEATURES,
+            'customers': len(features_df),
+            'churn_rate': float(labels_df['churn'].mean()) if len(labels_df) else None,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+        }, f, indent=2)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+    return features_df, labels_df
+
+def get_snapshot(cutoff_date, refresh=False, store_dir=FEATURE_STORE_DIR):
+    """Snapshot da data de corte: lido do repositório ou calculado e gravado."""
+    snapshot = None if refresh else load_snapshot(cutoff_date, store_dir)
+    if snapshot is None:
+        snapshot = materialize_snapshot(cutoff_date, store_dir=store_dir)
+    return snapshot
+
+def snapshot_features_path(cutoff_date, refresh=False, store_dir=FEATURE_STORE_DIR):
+    """
+    Arquivo de features do snapshot da data de corte, calculado antes se
+    necessário, para leitura em partes (ex.: pontuação em lote). O cálculo,
+    quando necessário, usa a memória de `materialize_snapshot`; só a leitura
+    do arquivo gravado é em partes.
+    """
+    if refresh or not _is_current(_read_metadata(snapshot_dir(cutoff_date, store_dir))):
+        materialize_snapshot(cutoff_date, store_dir=store_dir)
+    return os.path.join(snapshot_dir(cutoff_date, store_dir), "features.parquet")
+
+def fill_missing_features(features_df, avg_review=None):
+    """
+    Preenche valores ausentes com as mesmas regras do treino
+    (ver `load_and_prepare_data` em churn_analysis.py).
+
+    Ao processar o snapshot em partes, `avg_review` deve ser a média de todo
+    o snapshot, e não a de cada parte.
+    """
+    return features_df.fillna({
+        'std_order_value': 0,
+        'avg_review': features_df['avg_review'].mean() if avg_review is None else avg_review,
+        'cancel_rate': 0,
+    })
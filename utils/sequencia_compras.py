@@ -0,0 +1,43 @@
+import pandas as pd
+
+def purchase_sequence(df, customer='customer_unique_id', order='order_id', timestamp='order_purchase_timestamp'):
+    """
+    Pedidos de cada cliente em ordem de compra (uma linha por pedido)
+
+    As linhas repetidas do dataset consolidado (itens, pagamentos e avaliações
+    do mesmo pedido) são reduzidas a um pedido com uma única ordenação; a
+    numeração das compras sai de `cumcount`, sem laços em Python por cliente.
+
+    Retorno:
+    --------
+    pd.DataFrame
+        Colunas `customer`, `order` e `timestamp`, mais:
+        - purchase_number: 1 para a primeira compra, 2 para a segunda, ...
+        - days_since_first: dias desde a primeira compra do cliente
+        - days_since_previous: dias desde a compra anterior (NaN na primeira)
+    """
+    orders = df[[customer, order, timestamp]].dropna(subset=[customer, order])
+    orders = orders.assign(**{timestamp: pd.to_datetime(orders[timestamp])})
+    orders = orders.sort_values([customer, timestamp], kind='stable').drop_duplicates([customer, order])
+
+    by_customer = orders.groupby(customer, observed=True)[timestamp]
+    orders['purchase_number'] = by_customer.cumcount() + 1
+    orders['days_since_first'] = (orders[timestamp] - by_customer.transform('first')).dt.days
+    orders['days_since_previous'] = by_customer.diff().dt.days
+
+    return orders.reset_index(drop=True)
+
+def nth_purchase(sequence, n, customer='customer_unique_id'):
+    """Linha da n-ésima compra de cada cliente (apenas clientes com ao menos n compras)."""
+    return sequence[sequence['purchase_number'] == n].set_index(customer)
+
+def purchase_gap(sequence, n=2, customer='customer_unique_id'):
+    """Dias entre a primeira e a n-ésima compra de cada cliente."""
+    return nth_purchase(sequence, n, customer)['days_since_first']
+
+def purchase_span(df, customer='customer_unique_id', timestamp='order_purchase_timestamp'):
+    """Primeira e última compra de cada cliente (colunas first_purchase e last_purchase)."""
+    timestamps = pd.to_datetime(df[timestamp])
+    return timestamps.groupby(df[customer], observed=True).agg(['min', 'max']).rename(
+        columns={'min': 'first_purchase', 'max': 'last_purchase'}
+    )
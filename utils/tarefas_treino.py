@@ -0,0 +1,288 @@
+import os
+import sys
+import json
+import uuid
+import signal
+import subprocess
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+# Diretório das tarefas de treinamento (um subdiretório por tarefa)
+JOBS_DIR = "churn_jobs"
+JOB_FILE = "job.json"
+LOG_FILE = "log.txt"
+LOCK_FILE = ".lock"
+
+# Tarefas simultâneas: os artefatos de churn_analysis.py são gravados no
+# diretório de trabalho (e lidos pela pontuação em lote), então as tarefas
+# rodam uma de cada vez
+MAX_RUNNING_JOBS = 1
+
+# Estados de uma tarefa
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = 'queued', 'running', 'done', 'failed', 'cancelled'
+
+# Tipos de tarefa: treino (churn_analysis.main) e pontuação em lote (utils.pontuacao_churn)
+TRAIN, SCORE = 'train', 'score'
+
+# Processos iniciados por este processo (para saber quando terminam)
+_PROCESSES = {}
+
+def _job_dir(job_id, jobs_dir=JOBS_DIR):
+    return os.path.join(jobs_dir, job_id)
+
+def _now():
+    return datetime.now().isoformat(timespec='seconds')
+
+def read_job(job_id, jobs_dir=JOBS_DIR):
+    with open(os.path.join(_job_dir(job_id, jobs_dir), JOB_FILE), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _write_job(job, jobs_dir=JOBS_DIR):
+    path = os.path.join(_job_dir(job['id'], jobs_dir), JOB_FILE)
+    staging = f"{path}.{os.getpid()}.tmp"
+    with open(staging, 'w', encoding='utf-8') as f:
+        json.dump(job, f, indent=2)
+    os.replace(staging, path)
+
+@contextmanager
+def _file_lock(path):
+    """
+    Trava exclusiva entre processos (e threads) sobre o arquivo `path`
+
+    Usa a trava do sistema operacional sobre o arquivo aberto (flock, ou
+    msvcrt.locking no Windows): ela é liberada pelo sistema se o processo
+    morrer, então não há travas abandonadas a remover. O arquivo em si nunca
+    é apagado.
+    """
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            f.seek(0)
+            while True:
+                try:
+                    # LK_LOCK tenta por cerca de 10 s antes de desistir
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _queue_lock(jobs_dir=JOBS_DIR):
+    """Trava para alterar a fila."""
+    return _file_lock(os.path.join(jobs_dir, LOCK_FILE))
+
+def _update_job(job_id, jobs_dir=JOBS_DIR, **changes):
+    """
+    Altera campos de job.json sob a trava da tarefa: o processo do dashboard
+    (estado, pid) e o da tarefa (progresso, resultado) gravam no mesmo
+    arquivo, e sem a trava uma gravação podia desfazer a outra.
+    """
+    with _file_lock(os.path.join(_job_dir(job_id, jobs_dir), LOCK_FILE)):
+        job = read_job(job_id, jobs_dir)
+        job.update(changes)
+        _write_job(job, jobs_dir)
+    return job
+
+def _pid_alive(pid):
+    if os.name == 'nt':
+        # No Windows, os.kill encerraria o processo; sem como verificar, assume ativo
+        return True
+    try:
+        os.kill(pid, 0)
+    except (OSError, TypeError):
+        return False
+    return True
+
+def _is_alive(job):
+    if job['id'] in _PROCESSES:
+        process = _PROCESSES[job['id']]
+        # None: processo sendo iniciado por este processo (ver _launch)
+        return process is None or process.poll() is None
+    if job.get('pid'):
+        return _pid_alive(job['pid'])
+    # Sem pid e sem processo conhecido aqui: só está ativa se o processo que
+    # a iniciou (outro, ainda vivo) está no meio do lançamento
+    launcher = job.get('launcher')
+    return launcher is not None and launcher != os.getpid() and _pid_alive(launcher)
+
+def list_jobs(jobs_dir=JOBS_DIR):
+    """
+    Tarefas em ordem de criação (mais recentes primeiro)
+
+    Tarefas marcadas como em execução cujo processo não existe mais (ou que
+    nunca chegaram a registrar o pid) são registradas como falhas.
+    """
+    if not os.path.isdir(jobs_dir):
+        return []
+    jobs = []
+    for name in os.listdir(jobs_dir):
+        if not os.path.exists(os.path.join(jobs_dir, name, JOB_FILE)):
+            continue
+        job = read_job(name, jobs_dir)
+        if job['status'] == RUNNING and not _is_alive(job):
+            # Releitura: o processo pode ter gravado o estado final ao terminar
+            job = read_job(name, jobs_dir)
+            if job['status'] == RUNNING:
+                job = _update_job(name, jobs_dir, status=FAILED, finished_at=_now(),
+                                  error="Processo encerrado inesperadamente")
+        jobs.append(job)
+    return sorted(jobs, key=lambda job: job['created_at'], reverse=True)
+
+def _launch(job, jobs_dir=JOBS_DIR):
+    """Inicia o processo de uma tarefa, com saída redirecionada para o log."""
+    job_dir = _job_dir(job['id'], jobs_dir)
+    _PROCESSES[job['id']] = None
+    _update_job(job['id'], jobs_dir, status=RUNNING, started_at=_now(), stage="Iniciando",
+                launcher=os.getpid())
+    env = dict(os.environ, MPLBACKEND='Agg', PYTHONUNBUFFERED='1')
+    try:
+        with open(os.path.join(job_dir, LOG_FILE), 'a', encoding='utf-8') as log:
+            process = subprocess.Popen(
+                [sys.executable, '-m', 'utils.tarefas_treino', job['id'], jobs_dir],
+                cwd=os.getcwd(), stdout=log, stderr=subprocess.STDOUT, env=env,
+                start_new_session=True
+            )
+    except OSError as error:
+        del _PROCESSES[job['id']]
+        _update_job(job['id'], jobs_dir, status=FAILED, finished_at=_now(), error=str(error))
+        return
+    _PROCESSES[job['id']] = process
+    _update_job(job['id'], jobs_dir, pid=process.pid)
+
+def dispatch(jobs_dir=JOBS_DIR):
+    """Inicia as tarefas da fila, por ordem de chegada, enquanto houver vagas."""
+    if not os.path.isdir(jobs_dir):
+        return
+    with _queue_lock(jobs_dir):
+        jobs = list_jobs(jobs_dir)
+        running = sum(job['status'] == RUNNING for job in jobs)
+        queued = sorted((job for job in jobs if job['status'] == QUEUED), key=lambda job: job['created_at'])
+        for job in queued[:max(0, MAX_RUNNING_JOBS - running)]:
+            _launch(job, jobs_dir)
+
+def submit_job(params, jobs_dir=JOBS_DIR, kind=TRAIN):
+    """
+    Coloca uma tarefa na fila e a inicia se houver vaga
+
+    Parâmetros:
+    -----------
+    params : dict
+        Argumentos de churn_analysis.main (cutoff_date, model_type, ...) ou,
+        com kind=SCORE, de score_customers (cutoff_date, chunk_size, ...)
+    jobs_dir : str
+        Diretório das tarefas
+    kind : str
+        TRAIN ou SCORE
+
+    Retorno:
+    --------
+    str
+        Identificador da tarefa
+    """
+    job_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(_job_dir(job_id, jobs_dir))
+    _write_job({
+        'id': job_id,
+        'kind': kind,
+        'params': params,
+        'status': QUEUED,
+        'created_at': _now(),
+        'progress': 0.0,
+        'stage': "Na fila",
+    }, jobs_dir)
+    dispatch(jobs_dir)
+    return job_id
+
+def _terminate(pid):
+    """Encerra o processo da tarefa e os processos filhos (ex.: n_jobs do scikit-learn)."""
+    try:
+        if os.name == 'nt':
+            os.kill(pid, signal.SIGTERM)
+        else:
+            os.killpg(os.getpgid(pid), signal.SIGTERM)
+    except (OSError, ProcessLookupError):
+        pass
+
+def cancel_job(job_id, jobs_dir=JOBS_DIR):
+    """Cancela uma tarefa na fila ou em execução e libera a vaga para a próxima."""
+    with _queue_lock(jobs_dir):
+        job = read_job(job_id, jobs_dir)
+        if job['status'] not in (QUEUED, RUNNING):
+            return job
+        if job['status'] == RUNNING:
+            # O pid pode ainda não estar no arquivo se a tarefa acabou de ser iniciada
+            process = _PROCESSES.get(job_id)
+            pid = job.get('pid') or (process.pid if process is not None else None)
+            if pid:
+                _terminate(pid)
+        job = _update_job(job_id, jobs_dir, status=CANCELLED, finished_at=_now(), stage="Cancelada")
+    dispatch(jobs_dir)
+    return job
+
+def read_log(job_id, max_lines=200, jobs_dir=JOBS_DIR):
+    """Últimas linhas do log de uma tarefa."""
+    path = os.path.join(_job_dir(job_id, jobs_dir), LOG_FILE)
+    if not os.path.exists(path):
+        return ""
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return "".join(f.readlines()[-max_lines:])
+
+def _run_training(params, progress):
+    """Treino com churn_analysis.main; campos gravados na tarefa ao terminar."""
+    import churn_analysis
+    metrics = churn_analysis.main(**params, progress=progress)
+
+    summary = {
+        key: float(metrics[key]) for key in
+        ['accuracy', 'precision_weighted', 'recall_weighted', 'f1_macro', 'f1_weighted', 'auc_roc', 'avg_precision']
+        if key in metrics
+    }
+    return {'metrics': summary, 'run_id': metrics['run_id']}
+
+def _run_scoring(params, progress):
+    """Pontuação em lote com score_customers; campos gravados na tarefa ao terminar."""
+    from utils.pontuacao_churn import score_customers
+    summary = score_customers(**params, progress=progress)
+    return {'metrics': {key: summary[key] for key in ('customers', 'tiers', 'seconds', 'cutoff_date')}}
+
+RUNNERS = {TRAIN: _run_training, SCORE: _run_scoring}
+
+def _run_job(job_id, jobs_dir=JOBS_DIR):
+    """Executa a tarefa (treino ou pontuação) com os seus parâmetros (processo separado)."""
+    # Primeira gravação: o pid fica registrado mesmo se o processo que
+    # iniciou a tarefa terminar antes de gravá-lo
+    job = _update_job(job_id, jobs_dir, pid=os.getpid())
+    if job['status'] == CANCELLED:
+        return
+
+    def progress(step, total, stage):
+        print(f"[{step}/{total}] {stage}", flush=True)
+        _update_job(job_id, jobs_dir, progress=step / total, stage=stage)
+
+    try:
+        result = RUNNERS[job.get('kind', TRAIN)](job['params'], progress)
+        _update_job(job_id, jobs_dir, status=DONE, finished_at=_now(), progress=1.0,
+                    stage="Concluída", **result)
+    except Exception as error:
+        traceback.print_exc()
+        _update_job(job_id, jobs_dir, status=FAILED, finished_at=_now(), error=str(error))
+    finally:
+        # Libera a vaga para a próxima tarefa da fila, mesmo sem a página aberta
+        dispatch(jobs_dir)
+
+if __name__ == "__main__":
+    _run_job(sys.argv[1], *sys.argv[2:3])